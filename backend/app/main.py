@@ -1,23 +1,48 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from .database import engine, Base
+from .database import engine, Base, create_missing_indexes
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from .utils.rate_limit import limiter
-from .routes import auth, quizzes, trending, comments, polls, live, news
+from .utils.live_state import live_state
+from .utils.mcq_bank import mcq_bank
+from .utils.seed_jobs import seed_jobs
+from .utils.mcq_loader import ensure_content_hash_column
+from .utils.db_metrics import RouteContextMiddleware
+from .utils.response_cache import ResponseCacheMiddleware, response_cache
+from .routes import auth, quizzes, trending, comments, polls, live, news, internal
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Create tables on startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await ensure_content_hash_column(conn)
+        await conn.run_sync(create_missing_indexes)
+    await mcq_bank.load()
+    live_state.start()
+    # Pick up reseed jobs interrupted by a restart, now and whenever one goes stale
+    seed_jobs.watch()
     yield
+    # Persist any live session changes still waiting for write-behind
+    await live_state.stop()
+    await seed_jobs.stop()
 
 app = FastAPI(title="ManageMind API", lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+# Read-mostly routes; writers invalidate these tags (see utils/response_cache.py)
+response_cache.cache_route(r"/api/news/?", "news")
+response_cache.cache_route(r"/api/trending/?", "trending")
+response_cache.cache_route(r"/api/trending/(?P<topic_id>\d+)", "trending", "trending:{topic_id}")
+response_cache.cache_route(r"/api/comments/(?P<target_id>[^/]+)", "comments:{target_id}")
+app.add_middleware(ResponseCacheMiddleware)
+
+# Lets slow-statement metrics name the route that issued them
+app.add_middleware(RouteContextMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -28,6 +53,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -38,6 +64,7 @@ app.include_router(comments.router, prefix="/api/comments", tags=["Comments"])
 app.include_router(polls.router, prefix="/api/polls", tags=["Polls"])
 app.include_router(live.router, prefix="/api/live", tags=["Live Sessions"])
 app.include_router(news.router, prefix="/api/news", tags=["Latest News"])
+app.include_router(internal.router, prefix="/api/internal", tags=["Internal"])
 
 @app.get("/")
 async def root():
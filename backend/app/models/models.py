@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, Float, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -33,6 +33,51 @@ class MCQ(Base):
     options = Column(JSON, nullable=False)  # List of Option dicts
     correct_option_id = Column(String, nullable=False)
     explanation = Column(String, nullable=False)
+    content_hash = Column(String, unique=True, index=True, nullable=True)  # unit + question, set by the bulk loader
+
+class MCQBankVersion(Base):
+    __tablename__ = "mcq_bank_version"
+
+    id = Column(Integer, primary_key=True)  # single row, id = 1
+    version = Column(Integer, nullable=False, default=0)  # bumped by the seeders
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class AIQuestionCache(Base):
+    __tablename__ = "ai_question_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, unique=True, index=True, nullable=False)  # sha256 of normalized point + prompt version
+    syllabus_point = Column(String, nullable=False)
+    prompt_version = Column(Integer, nullable=False)
+    questions = Column(JSON, nullable=False)  # pool of generated MCQ dicts
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class SeedJob(Base):
+    __tablename__ = "seed_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, default="queued")  # 'queued', 'running', 'swapping', 'completed', 'failed'
+    questions_per_topic = Column(Integer, nullable=False)
+    total_topics = Column(Integer, default=0)
+    completed_topics = Column(Integer, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # refreshed at every topic checkpoint
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class SeedJobTopic(Base):
+    __tablename__ = "seed_job_topics"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("seed_jobs.id"), index=True, nullable=False)
+    unit = Column(String, nullable=False)
+    topic = Column(String, nullable=False)
+    status = Column(String, default="pending")  # 'pending', 'done' (checkpoint)
+    attempts = Column(Integer, default=0)
+    used_fallback = Column(Boolean, default=False)
+    questions = Column(JSON, nullable=True)  # generated MCQ dicts, kept until the swap
 
 class TrendingTopic(Base):
     __tablename__ = "trending_topics"
@@ -76,6 +121,25 @@ class QuizAttempt(Base):
     details = Column(JSON, nullable=False) # List of dicts {question_id, selected_option_id, is_correct}
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # History pages: one user's attempts, newest id first
+    __table_args__ = (Index("ix_quiz_attempts_user_id_id", "user_id", "id"),)
+
+class UserStats(Base):
+    """Running quiz totals per user, updated by every submit (see utils/user_stats.py)."""
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    attempts = Column(Integer, default=0)
+    total_questions = Column(Integer, default=0)
+    correct_answers = Column(Integer, default=0)
+    accuracy_sum = Column(Float, default=0.0)  # sum of per-attempt accuracy %, for the mean
+    time_per_question_sum = Column(Float, default=0.0)  # sum of per-attempt seconds/question
+    topics = Column(JSON, default=dict)  # attempt topic -> {"attempts", "correct", "total"}
+    current_streak = Column(Integer, default=0)  # consecutive days with an attempt
+    longest_streak = Column(Integer, default=0)
+    last_attempt_date = Column(Date, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class LiveSession(Base):
     __tablename__ = "live_sessions"
 
@@ -90,12 +154,14 @@ class LiveSession(Base):
     started_at = Column(DateTime(timezone=True), nullable=True)
     mcqs = Column(JSON, nullable=True)  # AI-generated questions for this session
 
+    __table_args__ = (Index("ix_live_sessions_host_id_created_at", "host_id", "created_at", "id"),)
+
 
 class LiveParticipant(Base):
     __tablename__ = "live_participants"
 
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(Integer, ForeignKey("live_sessions.id"), nullable=False)
+    session_id = Column(Integer, ForeignKey("live_sessions.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     score = Column(Integer, nullable=True)
     time_taken_seconds = Column(Integer, nullable=True)
@@ -120,6 +186,14 @@ class PollVote(Base):
     option_id = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+class PollOptionCount(Base):
+    """Vote tally per option of a trending topic's poll, incremented in place."""
+    __tablename__ = "poll_option_counts"
+
+    topic_id = Column(Integer, primary_key=True)  # no FK: rows are removed together with the topic
+    option_id = Column(String, primary_key=True)
+    votes = Column(Integer, nullable=False, default=0)
+
 class News(Base):
     __tablename__ = "news"
 
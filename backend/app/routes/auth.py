@@ -3,12 +3,12 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
 from ..database import get_db
 from ..models.models import User
 from ..schemas.user import UserCreate, UserResponse, UserInDB, UserUpdate
-from ..utils.auth import verify_password, get_password_hash, create_access_token, SECRET_KEY, ALGORITHM
+from ..utils.auth import hash_password_async, verify_and_update_async, create_access_token, decode_access_token
 from ..utils.rate_limit import limiter
+from ..utils import user_names, auth_cache
 
 router = APIRouter()
 
@@ -32,7 +32,7 @@ async def register(request: Request, user: UserCreate, db: AsyncSession = Depend
         username=user.username,
         email=user.email,
         full_name=user.full_name,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=await hash_password_async(user.password),
         created_at=datetime.utcnow(),
         quiz_history=[],
         badges=["Beginner Manager"]
@@ -41,6 +41,8 @@ async def register(request: Request, user: UserCreate, db: AsyncSession = Depend
     db.add(new_user)
     await db.commit()
     await db.refresh(new_user)
+    # Drop any cached "no such user" entry for this id
+    user_names.forget(new_user.id)
     return new_user
 
 @router.post("/login")
@@ -48,58 +50,58 @@ async def register(request: Request, user: UserCreate, db: AsyncSession = Depend
 async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).filter(User.username == form_data.username))
     user = result.scalars().first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = (await verify_and_update_async(form_data.password, user.hashed_password)) if user else (False, None)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Work factor changed since this password was hashed
+        user.hashed_password = new_hash
+        await db.commit()
     
     access_token = create_access_token(data={"sub": user.username})
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.get("/me", response_model=UserResponse)
-async def get_me(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Invalid credentials")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-        
-    result = await db.execute(select(User).filter(User.username == username))
-    user = result.scalars().first()
-    if user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-        
-    return user
-
 async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Invalid credentials")
-    except JWTError:
+    """Shared auth dependency. Cached users are read-only snapshots; see utils/auth_cache."""
+    user = auth_cache.get(token)
+    if user is not None:
+        return user
+
+    payload = decode_access_token(token)
+    if payload is None:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-        
-    result = await db.execute(select(User).filter(User.username == username))
+
+    result = await db.execute(select(User).filter(User.username == payload["sub"]))
     user = result.scalars().first()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
+    auth_cache.put(token, user, payload.get("exp"))
     return user
 
+@router.get("/me", response_model=UserResponse)
+async def get_me(current_user: User = Depends(get_current_user)):
+    return current_user
+
 @router.patch("/profile", response_model=UserResponse)
 async def update_profile(
     payload: UserUpdate,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    # current_user may be a cached snapshot; write through this request's session
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
     update_data = payload.dict(exclude_unset=True)
     for key, value in update_data.items():
-        setattr(current_user, key, value)
+        setattr(user, key, value)
     
     await db.commit()
-    await db.refresh(current_user)
-    return current_user
+    await db.refresh(user)
+    user_names.forget(user.id)
+    auth_cache.invalidate_user(user.id)
+    return user
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from ..database import get_db
 from ..models.models import Comment as CommentModel
+from ..utils.pagination import parse_fields, page_limit, fetch_page, set_next_cursor
+from ..utils import votes
+from ..utils.response_cache import response_cache
 from datetime import datetime
 
 router = APIRouter()
@@ -20,14 +23,38 @@ class Comment(BaseModel):
     
     class Config:
         from_attributes = True
+        coerce_numbers_to_str = True  # user_id/target_id are integer columns
 
 class CommentResponse(Comment):
     id: int
 
-@router.get("/{target_id}", response_model=List[CommentResponse])
-async def get_comments(target_id: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(CommentModel).filter(CommentModel.target_id == target_id))
-    return result.scalars().all()
+COMMENT_COLUMNS = {c.key: getattr(CommentModel, c.key) for c in CommentModel.__table__.columns}
+
+@router.get("/{target_id}")
+async def get_comments(
+    target_id: str,
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Oldest first; `fields=` picks columns. Every comment unless `limit` or `cursor`
+    asks for pages; X-Next-Cursor pages."""
+    names = parse_fields(fields, list(COMMENT_COLUMNS), list(CommentResponse.model_fields))
+    items, next_cursor = await fetch_page(
+        db, select(CommentModel).filter(CommentModel.target_id == target_id), COMMENT_COLUMNS, names,
+        order=[(CommentModel.id, False)],
+        limit=page_limit(limit, cursor, 100, 200),
+        cursor=cursor
+    )
+    set_next_cursor(response, next_cursor)
+    # The API exposes ids as strings (see Comment)
+    for item in items:
+        for key in ("user_id", "target_id"):
+            if item.get(key) is not None:
+                item[key] = str(item[key])
+    return items
 
 @router.post("/", response_model=CommentResponse)
 async def add_comment(comment: Comment, db: AsyncSession = Depends(get_db)):
@@ -36,14 +63,18 @@ async def add_comment(comment: Comment, db: AsyncSession = Depends(get_db)):
     db.add(new_comment)
     await db.commit()
     await db.refresh(new_comment)
+    response_cache.invalidate(f"comments:{new_comment.target_id}")
     return new_comment
 
 @router.post("/{comment_id}/vote")
 async def vote_comment(comment_id: int, direction: int, db: AsyncSession = Depends(get_db)):
     # direction: 1 for upvote, -1 for downvote
-    result = await db.execute(select(CommentModel).filter(CommentModel.id == comment_id))
-    comment = result.scalars().first()
-    if comment:
-        comment.votes += direction
-        await db.commit()
-    return {"message": "Vote recorded"}
+    if direction not in (1, -1):
+        raise HTTPException(status_code=400, detail="direction must be 1 or -1")
+    voted = await votes.vote_comment(db, comment_id, direction)
+    if voted is None:
+        raise HTTPException(status_code=404, detail="Comment not found")
+    await db.commit()
+    total, target_id = voted
+    response_cache.invalidate(f"comments:{target_id}")
+    return {"message": "Vote recorded", "votes": total}
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Header
+from typing import Optional
+import os
+from ..database import engine
+from ..utils.db_metrics import db_metrics
+from ..utils.response_cache import response_cache
+
+router = APIRouter()
+
+# Callers must send it in the X-Internal-Token header; while unset, internal routes stay closed
+INTERNAL_TOKEN = os.getenv("INTERNAL_METRICS_TOKEN", "").strip()
+
+
+def require_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """Closed until INTERNAL_METRICS_TOKEN is configured."""
+    if not INTERNAL_TOKEN or x_internal_token != INTERNAL_TOKEN:
+        raise HTTPException(status_code=403, detail="Requires the internal token")
+
+
+@router.get("/db", dependencies=[Depends(require_internal_token)])
+async def get_db_metrics():
+    """Pool occupancy, checkout wait percentiles and recent slow statements by route."""
+    return db_metrics.snapshot(engine.pool)
+
+
+@router.get("/cache", dependencies=[Depends(require_internal_token)])
+async def get_response_cache_stats():
+    """Response cache hit ratio, 304s and bytes served from memory."""
+    return response_cache.snapshot()
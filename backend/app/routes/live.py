@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -6,12 +7,21 @@ from sqlalchemy import and_, or_, func
 from typing import List, Optional, Union
 from datetime import datetime, timezone
 from pydantic import BaseModel
-import random, string, json
-from ..database import get_db
+import asyncio, random, string, json
+from ..database import get_db, AsyncSessionLocal
 from ..models.models import LiveSession, LiveParticipant, User, MCQ
 from ..utils.rate_limit import limiter
-from ..utils.ai_generator import generate_mcqs
-from ..utils.pdf_exporter import generate_quiz_pdf, generate_host_session_pdf
+from ..utils import ai_pipeline
+from ..utils.ai_generator import get_client
+from ..utils import reports
+from ..utils.live_hub import get_live_hub
+from ..utils.live_state import live_state, LiveSessionState
+from ..utils import user_names
+from ..utils.mcq_bank import get_mcq_bank
+from ..utils.pagination import parse_fields, page_limit, set_next_cursor
+from ..utils import host_sessions
+from ..utils import result_export
+from .auth import get_current_user
 
 router = APIRouter()
 
@@ -25,6 +35,8 @@ class CreateAdvancedSession(BaseModel):
     host_id: int
     duration_minutes: int
     syllabus_selections: List[SyllabusSelection]
+    job_id: Optional[str] = None  # poll /generation/{job_id} for progress
+    fresh: bool = False  # True: always call the AI instead of reusing cached questions
 
 class AnswerSubmit(BaseModel):
     mcq_id: Union[int, str]
@@ -40,6 +52,69 @@ class ParticipantSubmit(BaseModel):
 def generate_exam_id(length=6):
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
 
+
+async def broadcast(state: LiveSessionState, event_type: str, **extra):
+    """Push the current session status to every subscribed client."""
+    payload = state.status_payload()
+    payload.update(extra)
+    payload["type"] = event_type
+    await get_live_hub().publish(state.id, jsonable_encoder(payload))
+
+
+async def load_status_snapshot(session_id: int) -> Optional[dict]:
+    """Initial event for a new subscriber."""
+    state = await live_state.get(session_id)
+    if state is None:
+        return None
+    payload = state.status_payload()
+    payload["type"] = "snapshot"
+    return jsonable_encoder(payload)
+
+AI_FAILURE_DETAIL = "AI Teacher failed to generate questions. This is usually due to an invalid GEMINI_API_KEY or Quota limit on Render. Please verify your environment variables."
+
+
+async def save_ai_session(db: AsyncSession, payload: CreateAdvancedSession, question_sets: List[List[dict]]) -> Optional[dict]:
+    """Persist an AI session from per-point question lists; None if nothing was generated."""
+    exam_id = generate_exam_id()
+    result = await db.execute(select(LiveSession).filter(LiveSession.exam_id == exam_id))
+    if result.scalars().first():
+        exam_id = generate_exam_id()
+
+    all_ai_questions = []
+    topic_label = ", ".join(s.point for s in payload.syllabus_selections)
+    for qs in question_sets:
+        # Give each an in-memory id (negative to distinguish from DB ids)
+        for i, q in enumerate(qs):
+            q["_ai_idx"] = len(all_ai_questions) + i
+            q["topic"] = "AI"
+        all_ai_questions.extend(qs)
+
+    if not all_ai_questions:
+        return None
+
+    session = LiveSession(
+        host_id=payload.host_id,
+        exam_id=exam_id,
+        topic=topic_label,
+        duration_minutes=payload.duration_minutes,
+        mcqs=all_ai_questions
+    )
+    db.add(session)
+    await db.commit()
+    await db.refresh(session)
+    live_state.register(session)
+    host_sessions.invalidate_host(session.host_id)
+
+    return {
+        "id": session.id,
+        "exam_id": session.exam_id,
+        "topic": session.topic,
+        "duration_minutes": session.duration_minutes,
+        "status": session.status,
+        "has_ai_questions": True,
+        "question_count": len(all_ai_questions)
+    }
+
 # ── Endpoints ─────────────────────────────────────────────────────────────
 
 @router.post("/create")
@@ -60,6 +135,8 @@ async def create_session(topic: str, duration_minutes: int, host_id: int, unit:
     db.add(session)
     await db.commit()
     await db.refresh(session)
+    live_state.register(session)
+    host_sessions.invalidate_host(session.host_id)
     return {
         "id": session.id,
         "exam_id": session.exam_id,
@@ -74,135 +151,182 @@ async def create_session(topic: str, duration_minutes: int, host_id: int, unit:
 @router.post("/create-advanced")
 async def create_advanced_session(payload: CreateAdvancedSession, db: AsyncSession = Depends(get_db)):
     """Teacher Advanced Mode - AI generates questions per syllabus point."""
-    exam_id = generate_exam_id()
-    result = await db.execute(select(LiveSession).filter(LiveSession.exam_id == exam_id))
-    if result.scalars().first():
-        exam_id = generate_exam_id()
+    # Build the AI question pool, generating every syllabus point concurrently
+    selections = [(s.point, s.count) for s in payload.syllabus_selections]
+    progress = ai_pipeline.track(payload.job_id, selections)
+    question_sets = await ai_pipeline.generate_for_selections(selections, progress, fresh=payload.fresh)
 
-    # Build the AI question pool
-    all_ai_questions = []
-    topic_label = ", ".join(s.point for s in payload.syllabus_selections)
+    created = await save_ai_session(db, payload, question_sets)
+    if not created:
+        # Check if it was specifically an API key issue in logs
+        raise HTTPException(status_code=500, detail=AI_FAILURE_DETAIL)
+    created["generation"] = progress.as_dict()
+    return created
+
+
+@router.post("/create-advanced/stream")
+async def create_advanced_session_stream(payload: CreateAdvancedSession):
+    """Streaming Advanced Mode: NDJSON lines with each question as soon as it is generated,
+    a line per finished syllabus point, and finally the created session (or an error)."""
+    selections = [(s.point, s.count) for s in payload.syllabus_selections]
+    progress = ai_pipeline.track(payload.job_id, selections)
+
+    async def event_stream():
+        question_sets = [[] for _ in selections]
+        async for index, q in ai_pipeline.stream_for_selections(selections, progress, fresh=payload.fresh):
+            if q is None:
+                point = progress.points[index]
+                yield json.dumps({"type": "point", "point_index": index, "status": point["status"], "generated": point["generated"]}) + "\n"
+                continue
+            question_sets[index].append(q)
+            yield json.dumps({"type": "question", "point_index": index, "question": q}) + "\n"
 
-    for sel in payload.syllabus_selections:
-        qs = await generate_mcqs(sel.point, sel.count)
-        # Give each an in-memory id (negative to distinguish from DB ids)
-        for i, q in enumerate(qs):
-            q["_ai_idx"] = len(all_ai_questions) + i
-            q["topic"] = "AI"
-        all_ai_questions.extend(qs)
+        # The request's own DB session may already be closed while streaming
+        async with AsyncSessionLocal() as db:
+            created = await save_ai_session(db, payload, question_sets)
+        if not created:
+            yield json.dumps({"type": "error", "detail": AI_FAILURE_DETAIL}) + "\n"
+            return
+        created["generation"] = progress.as_dict()
+        yield json.dumps({"type": "session", **jsonable_encoder(created)}) + "\n"
 
-    if not all_ai_questions:
-        # Check if it was specifically an API key issue in logs
-        raise HTTPException(
-            status_code=500,
-            detail="AI Teacher failed to generate questions. This is usually due to an invalid GEMINI_API_KEY or Quota limit on Render. Please verify your environment variables."
-        )
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
 
-    has_ai = True
 
-    session = LiveSession(
-        host_id=payload.host_id,
-        exam_id=exam_id,
-        topic=topic_label,
-        duration_minutes=payload.duration_minutes,
-        mcqs=all_ai_questions if has_ai else None
-    )
-    db.add(session)
-    await db.commit()
-    await db.refresh(session)
+@router.get("/ai-stats")
+async def get_ai_stats():
+    """Which Gemini model is in use plus per-model call, error and latency counters."""
+    return get_client().describe()
 
-    return {
-        "id": session.id,
-        "exam_id": session.exam_id,
-        "topic": session.topic,
-        "duration_minutes": session.duration_minutes,
-        "status": session.status,
-        "has_ai_questions": has_ai,
-        "question_count": len(all_ai_questions)
-    }
+
+@router.get("/generation/{job_id}")
+async def get_generation_progress(job_id: str):
+    """Per-point progress of a running (or recent) create-advanced request."""
+    progress = ai_pipeline.get_progress(job_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    return progress.as_dict()
 
 
 @router.get("/by-code/{exam_id}")
-async def get_session_by_code(exam_id: str, db: AsyncSession = Depends(get_db)):
+async def get_session_by_code(exam_id: str):
     """Lookup session by exam code (for student join flow)."""
-    result = await db.execute(select(LiveSession).filter(LiveSession.exam_id == exam_id.upper()))
-    session = result.scalars().first()
-    if not session:
+    state = await live_state.get_by_code(exam_id.upper())
+    if not state:
         raise HTTPException(status_code=404, detail="Session not found")
     return {
-        "id": session.id,
-        "exam_id": session.exam_id,
-        "topic": session.topic,
-        "status": session.status,
-        "duration_minutes": session.duration_minutes,
-        "has_ai_questions": bool(session.mcqs)
+        "id": state.id,
+        "exam_id": state.exam_id,
+        "topic": state.topic,
+        "status": state.status,
+        "duration_minutes": state.duration_minutes,
+        "has_ai_questions": state.has_ai_questions
     }
 
 
 @router.post("/join/{exam_id}")
 @limiter.limit("10/minute")
-async def join_session(request: Request, exam_id: str, user_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(LiveSession).filter(LiveSession.exam_id == exam_id.upper()))
-    session = result.scalars().first()
+async def join_session(request: Request, exam_id: str, user_id: int):
+    state = await live_state.get_by_code(exam_id.upper())
 
-    if not session:
+    if not state:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    if session.status == "finished":
+    if state.status == "finished":
         raise HTTPException(status_code=400, detail="Session has already ended")
 
+    # Cached after the first lookup, so repeat joins stay off the DB
+    if user_id not in await user_names.get_names([user_id]):
+        raise HTTPException(status_code=404, detail="User not found")
+
     # Allow joining waiting OR active sessions
-    part_result = await db.execute(
-        select(LiveParticipant)
-        .filter(and_(LiveParticipant.session_id == session.id, LiveParticipant.user_id == user_id))
-    )
-    existing = part_result.scalars().first()
-    if existing:
-        return {"session_id": session.id, "message": "Already joined", "status": session.status}
+    if not state.add_participant(user_id):
+        return {"session_id": state.id, "message": "Already joined", "status": state.status}
 
-    participant = LiveParticipant(session_id=session.id, user_id=user_id)
-    db.add(participant)
-    await db.commit()
-    return {"session_id": session.id, "message": "Successfully joined", "status": session.status}
+    await broadcast(state, "join")
+    return {"session_id": state.id, "message": "Successfully joined", "status": state.status}
 
 
 @router.get("/{session_id}/status")
-async def get_session_status(session_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(LiveSession).filter(LiveSession.id == session_id))
-    session = result.scalars().first()
-    if not session:
+async def get_session_status(session_id: int):
+    state = await live_state.get(session_id)
+    if not state:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    part_result = await db.execute(select(LiveParticipant).filter(LiveParticipant.session_id == session.id))
-    participants = part_result.scalars().all()
+    return state.status_payload()
+
+
+@router.websocket("/{session_id}/ws")
+async def live_session_socket(websocket: WebSocket, session_id: int):
+    """Push channel replacing /status polling: a snapshot, then join/start/submit/end events."""
+    await websocket.accept()
+    snapshot = await load_status_snapshot(session_id)
+    if snapshot is None:
+        await websocket.close(code=4404)
+        return
+
+    hub = get_live_hub()
+    queue = await hub.subscribe(session_id)
+    # Clients never send anything; the reader only exists to notice disconnects
+    reader = asyncio.create_task(websocket.receive_text())
+    try:
+        await websocket.send_json(snapshot)
+        while True:
+            getter = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait({getter, reader}, return_when=asyncio.FIRST_COMPLETED)
+            if reader in done:
+                getter.cancel()
+                break
+            await websocket.send_json(getter.result())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
+        await hub.unsubscribe(session_id, queue)
+
+
+@router.get("/{session_id}/events")
+async def live_session_events(session_id: int, request: Request):
+    """Server-Sent Events variant of the push channel for clients behind WebSocket-unfriendly proxies."""
+    snapshot = await load_status_snapshot(session_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Session not found")
 
-    return {
-        "id": session.id,
-        "status": session.status,
-        "unit": session.unit,
-        "topic": session.topic,
-        "duration_minutes": session.duration_minutes,
-        "started_at": session.started_at,
-        "participants_count": len(participants),
-        "has_ai_questions": bool(session.mcqs)
-    }
+    hub = get_live_hub()
+    queue = await hub.subscribe(session_id)
+
+    async def event_stream():
+        try:
+            yield f"data: {json.dumps(snapshot)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            await hub.unsubscribe(session_id, queue)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 
 @router.get("/{session_id}/questions")
 async def get_session_questions(session_id: int, db: AsyncSession = Depends(get_db)):
     """Returns questions for an active session (AI-generated or from DB by topic)."""
-    result = await db.execute(select(LiveSession).filter(LiveSession.id == session_id))
-    session = result.scalars().first()
-    if not session:
+    state = await live_state.get(session_id)
+    if not state:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    if session.status != "active":
+    # The in-memory state is authoritative; the row's status may not be flushed yet
+    if state.status != "active":
         raise HTTPException(status_code=400, detail="Session is not active yet")
 
-    if session.mcqs:
+    if state.has_ai_questions:
+        result = await db.execute(select(LiveSession.mcqs).filter(LiveSession.id == session_id))
         # Add temporary IDs for AI questions
         questions = []
-        for i, q in enumerate(session.mcqs):
+        for i, q in enumerate(result.scalar() or []):
             questions.append({
                 "id": f"ai_{session_id}_{i}",
                 "topic": "AI",
@@ -213,15 +337,9 @@ async def get_session_questions(session_id: int, db: AsyncSession = Depends(get_
             })
         return questions
     else:
-        # Use filtered DB questions
-        stmt = select(MCQ)
-        if session.unit:
-            stmt = stmt.filter(MCQ.unit == session.unit)
-        if session.topic and session.topic != 'Full Unit':
-            stmt = stmt.filter(MCQ.topic == session.topic)
-            
-        mcq_result = await db.execute(stmt)
-        mcqs = mcq_result.scalars().all()
+        # Use filtered questions from the cached bank
+        bank = await get_mcq_bank()
+        mcqs = bank.records_for(state.unit, state.topic)
         return [
             {
                 "id": m.id,
@@ -236,197 +354,196 @@ async def get_session_questions(session_id: int, db: AsyncSession = Depends(get_
 
 
 @router.post("/{session_id}/start")
-async def start_session(session_id: int, host_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(LiveSession).filter(LiveSession.id == session_id))
-    session = result.scalars().first()
+async def start_session(session_id: int, host_id: int):
+    state = await live_state.get(session_id)
 
-    if not session or session.host_id != host_id:
+    if not state or state.host_id != host_id:
         raise HTTPException(status_code=403, detail="Not authorized to start this session")
-    if session.status != "waiting":
+    if state.status != "waiting":
         raise HTTPException(status_code=400, detail="Session already started or finished")
 
-    session.status = "active"
-    session.started_at = datetime.now(timezone.utc)
-    await db.commit()
-    return {"message": "Session started", "started_at": session.started_at}
+    # Compile the answer key once so submissions at the buzzer never hit the DB
+    await live_state.answer_key(state)
+    if state.status != "waiting":
+        raise HTTPException(status_code=400, detail="Session already started or finished")
+    state.set_status("active", started_at=datetime.now(timezone.utc))
+    await broadcast(state, "start")
+    return {"message": "Session started", "started_at": state.started_at}
 
 
 @router.post("/{session_id}/end")
-async def end_session(session_id: int, host_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(LiveSession).filter(LiveSession.id == session_id))
-    session = result.scalars().first()
+async def end_session(session_id: int, host_id: int):
+    state = await live_state.get(session_id)
 
-    if not session or session.host_id != host_id:
+    if not state or state.host_id != host_id:
         raise HTTPException(status_code=403, detail="Not authorized")
-    if session.status == "finished":
+    if state.status == "finished":
         return {"message": "Already finished"}
 
-    session.status = "finished"
-    await db.commit()
+    state.set_status("finished")
+    await broadcast(state, "end")
+    # Results are final now, so the export is ready by the time the host asks for it
+    reports.in_background(prerender_session_report(state))
     return {"message": "Session ended"}
 
 
 @router.post("/{session_id}/submit")
-async def submit_exam(session_id: int, payload: ParticipantSubmit, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(LiveSession).filter(LiveSession.id == session_id))
-    session = result.scalars().first()
+async def submit_exam(session_id: int, payload: ParticipantSubmit):
+    state = await live_state.get(session_id)
 
-    if not session or session.status != "active":
+    if not state or state.status != "active":
         raise HTTPException(status_code=400, detail="Session is not active")
 
-    part_result = await db.execute(
-        select(LiveParticipant)
-        .filter(and_(LiveParticipant.session_id == session_id, LiveParticipant.user_id == payload.user_id))
-    )
-    participant = part_result.scalars().first()
+    participant = state.participants.get(payload.user_id)
     if not participant:
         raise HTTPException(status_code=404, detail="Participant not found")
     if participant.submitted_at:
         raise HTTPException(status_code=400, detail="Already submitted")
 
-    # Score calculation
-    correct = 0
-    answers_detail = []
-
-    if session.mcqs:
-        # AI questions: build lookup by index/id string
-        # Support both 'ai_X_Y' and raw index if needed
-        ai_questions = {str(q.get("_ai_idx", i)): q for i, q in enumerate(session.mcqs)}
-        # Also map by the formatted ID used in frontend: f"ai_{session_id}_{i}"
-        for i, q in enumerate(session.mcqs):
-            ai_questions[f"ai_{session_id}_{i}"] = q
-
-        for ans in payload.answers:
-            q = ai_questions.get(str(ans.mcq_id))
-            if q:
-                is_correct = str(ans.selected_option_id) == str(q.get("correct_option_id"))
-                if is_correct:
-                    correct += 1
-                answers_detail.append({
-                    "mcq_id": str(ans.mcq_id),
-                    "selected": ans.selected_option_id,
-                    "is_correct": is_correct
-                })
-    else:
-        # DB questions
-        # Convert all mcq_ids to int for DB lookup, filter out non-integers
-        raw_ids = []
-        for ans in payload.answers:
-            try:
-                raw_ids.append(int(ans.mcq_id))
-            except (ValueError, TypeError):
-                continue
+    answer_key = await live_state.answer_key(state)
+    correct, answers_detail = answer_key.score(payload.answers)
 
-        if raw_ids:
-            mcq_result = await db.execute(select(MCQ).filter(MCQ.id.in_(raw_ids)))
-            mcq_map = {m.id: m for m in mcq_result.scalars().all()}
-            for ans in payload.answers:
-                try:
-                    m_id = int(ans.mcq_id)
-                except (ValueError, TypeError):
-                    continue
-                
-                mcq = mcq_map.get(m_id)
-                if mcq:
-                    is_correct = str(ans.selected_option_id) == str(mcq.correct_option_id)
-                    if is_correct:
-                        correct += 1
-                    answers_detail.append({
-                        "mcq_id": m_id,
-                        "selected": ans.selected_option_id,
-                        "is_correct": is_correct
-                    })
-
-    participant.score = correct
-    participant.answers = answers_detail
-    participant.time_taken_seconds = payload.time_taken_seconds
-    participant.submitted_at = datetime.now(timezone.utc)
-    await db.commit()
+    # Re-check after the await above so a double submit can't slip through
+    if participant.submitted_at:
+        raise HTTPException(status_code=400, detail="Already submitted")
+    state.record_submission(payload.user_id, correct, answers_detail, payload.time_taken_seconds)
+    await broadcast(state, "submit", user_id=payload.user_id)
 
     return {"message": "Submitted", "score": correct, "total": len(answers_detail)}
 
 
 @router.get("/host/{host_id}")
-async def get_host_sessions(host_id: int, db: AsyncSession = Depends(get_db)):
-    """List sessions created by a specific host."""
-    result = await db.execute(
-        select(LiveSession)
-        .filter(LiveSession.host_id == host_id)
-        .order_by(LiveSession.created_at.desc())
+async def get_host_sessions(
+    host_id: int,
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """List sessions created by a specific host with participation stats, newest first.
+    Every session unless `limit` or `cursor` asks for pages; X-Next-Cursor pages."""
+    names = parse_fields(fields, list(host_sessions.SUMMARY_COLUMNS), host_sessions.DEFAULT_FIELDS)
+    output, next_cursor = await host_sessions.host_session_page(
+        db, host_id, names, page_limit(limit, cursor, 20, 100), cursor
     )
-    sessions = result.scalars().all()
-    
-    output = []
-    for s in sessions:
-        # Get participant count for each
-        p_count_res = await db.execute(
-            select(func.count(LiveParticipant.id)).filter(LiveParticipant.session_id == s.id)
-        )
-        p_count = p_count_res.scalar()
-        
-        output.append({
-            "id": s.id,
-            "exam_id": s.exam_id,
-            "topic": s.topic,
-            "status": s.status,
-            "duration_minutes": s.duration_minutes,
-            "created_at": s.created_at,
-            "participants_count": p_count,
-            "has_ai_questions": bool(s.mcqs)
-        })
+    set_next_cursor(response, next_cursor)
     return output
 
 
+@router.get("/host/{host_id}/results")
+async def export_host_results(
+    host_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fmt: str = Query("csv", alias="format"),
+    current_user: User = Depends(get_current_user)
+):
+    """Answers from every session the host created in [since, until), one row per question. Host only."""
+    if current_user.id != host_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    fmt = result_export.check_format(fmt)
+    await live_state.flush()
+    return result_export.export_response(
+        lambda dialect: result_export.live_results_query(dialect, host_id=host_id, since=since, until=until),
+        result_export.live_rows, result_export.LIVE_COLUMNS, fmt, f"ManageMind_HostResults_{host_id}"
+    )
+
+
 @router.get("/{session_id}/leaderboard")
-async def get_leaderboard(session_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(LiveSession).filter(LiveSession.id == session_id))
-    session = result.scalars().first()
-    if not session:
+async def get_leaderboard(session_id: int, offset: int = 0, limit: int = None, user_id: int = None):
+    """Ranked submissions; `offset`/`limit` page through them and `user_id` adds that user's own row."""
+    state = await live_state.get(session_id)
+    if not state:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    part_result = await db.execute(
-        select(LiveParticipant, User.username, User.full_name)
-        .join(User, LiveParticipant.user_id == User.id)
-        .filter(LiveParticipant.session_id == session_id)
-        .filter(LiveParticipant.submitted_at.is_not(None))
-        .order_by(LiveParticipant.score.desc(), LiveParticipant.time_taken_seconds.asc())
+    rows = state.leaderboard.page(offset, limit)
+    my_rank = state.leaderboard.rank(user_id) if user_id is not None else None
+    names = await user_names.get_names(
+        [uid for _, uid in rows] + ([user_id] if my_rank else [])
     )
 
-    leaderboard = []
-    for rank, (participant, username, full_name) in enumerate(part_result.all(), start=1):
-        leaderboard.append({
+    def entry(rank, uid):
+        participant = state.participants[uid]
+        username, full_name = names.get(uid, ("Unknown", None))
+        return {
             "rank": rank,
-            "user_id": participant.user_id,
+            "user_id": uid,
             "username": username,
             "full_name": full_name or username,
             "score": participant.score or 0,
             "time_taken_seconds": participant.time_taken_seconds or 0,
             "submitted_at": participant.submitted_at
-        })
+        }
 
-    return {
+    response = {
         "session": {
-            "exam_id": session.exam_id,
-            "topic": session.topic,
-            "status": session.status
+            "exam_id": state.exam_id,
+            "topic": state.topic,
+            "status": state.status
         },
-        "leaderboard": leaderboard
+        "total": len(state.leaderboard),
+        "leaderboard": [entry(rank, uid) for rank, uid in rows]
     }
+    if user_id is not None:
+        response["me"] = entry(my_rank, user_id) if my_rank else None
+    return response
+
+async def session_report_inputs(state: LiveSessionState) -> dict:
+    lb_res = await get_leaderboard(state.id)
+    inputs = {
+        "session": {
+            "exam_id": state.exam_id,
+            "topic": state.topic,
+            "status": state.status,
+            "created_at": state.created_at
+        },
+        "leaderboard": [
+            {k: row[k] for k in ("rank", "full_name", "score", "time_taken_seconds")}
+            for row in lb_res['leaderboard']
+        ]
+    }
+    return inputs
+
+
+async def prerender_session_report(state: LiveSessionState) -> str:
+    return await reports.cached_report("session", state.id, await session_report_inputs(state), reports.session_pages)
+
 
 @router.get("/{session_id}/export")
-async def export_session_pdf(session_id: int, db: AsyncSession = Depends(get_db)):
+async def export_session_pdf(session_id: int):
     """Export live session results as PDF."""
-    result = await db.execute(select(LiveSession).filter(LiveSession.id == session_id))
-    session = result.scalars().first()
-    if not session:
+    state = await live_state.get(session_id)
+    if not state:
         raise HTTPException(status_code=404, detail="Session not found")
         
-    lb_res = await get_leaderboard(session_id, db)
-    leaderboard = lb_res['leaderboard']
-    
-    pdf_buffer = generate_host_session_pdf(session, leaderboard)
-    
-    headers = {
-        'Content-Disposition': f'attachment; filename="ManageMind_LiveSession_{session.exam_id}.pdf"'
-    }
-    return StreamingResponse(pdf_buffer, media_type="application/pdf", headers=headers)
+    return await reports.report_response(
+        "session", state.id, await session_report_inputs(state), reports.session_pages,
+        f"ManageMind_LiveSession_{state.exam_id}.pdf"
+    )
+
+
+@router.get("/{session_id}/results")
+async def export_session_results(
+    session_id: int,
+    fmt: str = Query("csv", alias="format"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """The session's answers as CSV, NDJSON or Parquet, one row per participant and question. Host only."""
+    fmt = result_export.check_format(fmt)
+    # Read straight from the table: loading the live state would pull every participant into memory
+    result = await db.execute(select(LiveSession.exam_id, LiveSession.host_id).filter(LiveSession.id == session_id))
+    session = result.first()
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session.host_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    exam_id = session.exam_id
+
+    # Submissions still waiting for the write-behind flush would be missing from the rows
+    await live_state.flush_session(session_id)
+    return result_export.export_response(
+        lambda dialect: result_export.live_results_query(dialect, session_id=session_id),
+        result_export.live_rows, result_export.LIVE_COLUMNS, fmt, f"ManageMind_LiveResults_{exam_id}"
+    )
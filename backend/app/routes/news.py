@@ -1,20 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import List, Optional
 from ..schemas.news import News as NewsSchema
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from ..database import get_db
 from ..models.models import News as NewsModel
+from ..utils.pagination import parse_fields, page_limit, fetch_page, set_next_cursor
 
 router = APIRouter()
 
-@router.get("/", response_model=List[NewsSchema])
-async def get_news(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(NewsModel).order_by(NewsModel.created_at.desc()))
-    news_items = result.scalars().all()
+NEWS_COLUMNS = {c.key: getattr(NewsModel, c.key) for c in NewsModel.__table__.columns}
+
+@router.get("/")
+async def get_news(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Newest first; `fields=` picks columns. Every item unless `limit` or `cursor`
+    asks for pages; X-Next-Cursor pages."""
+    names = parse_fields(fields, list(NEWS_COLUMNS), list(NEWS_COLUMNS))
+    news_items, next_cursor = await fetch_page(
+        db, select(NewsModel), NEWS_COLUMNS, names,
+        order=[(NewsModel.created_at, True), (NewsModel.id, True)],
+        limit=page_limit(limit, cursor, 20, 100),
+        cursor=cursor
+    )
+    set_next_cursor(response, next_cursor)
     
     # If no news, return some mock tech news for demonstration
-    if not news_items:
+    if not news_items and not cursor:
         mock_news = [
             {
                 "id": 1,
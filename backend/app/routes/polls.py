@@ -4,6 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from ..database import get_db
 from ..models.models import TrendingTopic, PollVote as PollVoteModel, User
+from ..utils import votes
+from ..utils.response_cache import response_cache
 
 router = APIRouter()
 
@@ -19,9 +21,9 @@ async def vote_trending_poll(trending_id: int, vote: PollVoteSchema, db: AsyncSe
         raise HTTPException(status_code=404, detail="User not found")
         
     # Verify Topic and Poll
-    result = await db.execute(select(TrendingTopic).filter(TrendingTopic.id == trending_id))
-    topic = result.scalars().first()
-    if not topic or not topic.poll:
+    result = await db.execute(select(TrendingTopic.poll).filter(TrendingTopic.id == trending_id))
+    poll = result.scalar()
+    if not poll:
         raise HTTPException(status_code=404, detail="Topic or Poll not found")
         
     # Strictly prevent Double Voting
@@ -35,24 +37,19 @@ async def vote_trending_poll(trending_id: int, vote: PollVoteSchema, db: AsyncSe
         raise HTTPException(status_code=400, detail="User has already voted on this poll")
         
     # Validate Option
-    poll_data = dict(topic.poll)
-    valid_option = False
-    if "options" in poll_data:
-        for opt in poll_data["options"]:
-            if opt["id"] == vote.option_id:
-                valid_option = True
-                opt["votes"] = opt.get("votes", 0) + 1
-                break
-                
-    if not valid_option:
+    option = next((opt for opt in poll.get("options", []) if opt["id"] == vote.option_id), None)
+    if option is None:
         raise HTTPException(status_code=400, detail="Invalid poll option")
         
     # Record Vote Object
     new_vote = PollVoteModel(poll_id=trending_id, user_id=vote.user_id, option_id=vote.option_id)
     db.add(new_vote)
     
-    # Update Topic Poll JSON with new counts
-    topic.poll = poll_data
+    # Tallies live in poll_option_counts; the poll JSON is left untouched
+    await votes.record_poll_vote(db, trending_id, option)
+    tallies = await votes.poll_tallies(db, trending_id)
     
     await db.commit()
-    return {"message": "Vote recorded successfully", "updated_poll": poll_data}
+    # The list (tag "trending") shows poll tallies too, not just this topic's detail
+    response_cache.invalidate("trending", f"trending:{trending_id}")
+    return {"message": "Vote recorded successfully", "updated_poll": votes.with_tallies(poll, tallies)}
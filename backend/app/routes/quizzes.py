@@ -1,30 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
 from ..schemas.mcq import MCQ as MCQSchema, QuizAttemptCreate, QuizResult
-from ..utils.pdf_exporter import generate_quiz_pdf
+from ..utils import reports
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from ..database import get_db
 from ..models.models import MCQ, User, QuizAttempt
+from ..utils.mcq_bank import get_mcq_bank
+from ..utils.mcq_sampler import draw_quiz
+from ..utils.seed_jobs import seed_jobs
+from ..utils import user_stats
+from ..utils import result_export
+from .auth import get_current_user
+from .internal import require_internal_token
 from datetime import datetime
 
 router = APIRouter()
 
 @router.get("/", response_model=List[MCQSchema])
-async def get_all_mcqs(unit: str = None, topic: str = None, limit: int = 50, db: AsyncSession = Depends(get_db)):
-    from sqlalchemy.sql.expression import func
-    stmt = select(MCQ)
-    if unit:
-        stmt = stmt.filter(MCQ.unit == unit)
-    if topic and topic != 'Full Unit':
-        stmt = stmt.filter(MCQ.topic == topic)
+async def get_all_mcqs(unit: str = None, topic: str = None, limit: int = 50, user_id: int = None):
+    bank = await get_mcq_bank()
     
-    # Randomize and limit
-    stmt = stmt.order_by(func.random()).limit(limit)
-    
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    # Randomize and limit; 'Full Unit' draws a proportional share from every topic
+    topic_ids = bank.topic_ids(unit, topic) if topic == 'Full Unit' else None
+    picked = draw_quiz(bank.ids_for(unit, topic), limit, topic_ids=topic_ids, user_id=user_id)
+    return [bank.by_id[i] for i in picked]
+
+
+@router.get("/bank/stats")
+async def get_bank_stats():
+    """Version, size and hit/miss/reload counters of the cached MCQ bank."""
+    bank = await get_mcq_bank()
+    return bank.describe()
+
+@router.post("/seed-jobs", dependencies=[Depends(require_internal_token)])
+async def submit_seed_job(questions_per_topic: int = 10):
+    """Regenerate the AI question bank in the background; the current bank stays live until it finishes.
+
+    Operators only: the job replaces the whole bank and spends Gemini quota.
+    """
+    if not 1 <= questions_per_topic <= 50:
+        raise HTTPException(status_code=400, detail="questions_per_topic must be between 1 and 50")
+    job_id = await seed_jobs.submit(questions_per_topic=questions_per_topic)
+    return {"job_id": job_id, "status": "queued"}
+
+@router.get("/seed-jobs/{job_id}")
+async def get_seed_job(job_id: int):
+    """Per-topic progress of a seed job plus the current request rate."""
+    job = await seed_jobs.describe(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Seed job not found")
+    return job
 
 @router.post("/submit", response_model=QuizResult)
 async def submit_quiz(attempt_data: QuizAttemptCreate, db: AsyncSession = Depends(get_db)):
@@ -35,9 +61,12 @@ async def submit_quiz(attempt_data: QuizAttemptCreate, db: AsyncSession = Depend
     topic_scores = {}
     details = []
     
+    # Served from the cached bank; unknown ids are fetched in a single query
+    bank = await get_mcq_bank()
+    mcq_map = await bank.get_many(int(sub.mcq_id) for sub in submissions)
+    
     for sub in submissions:
-        result = await db.execute(select(MCQ).filter(MCQ.id == int(sub.mcq_id)))
-        mcq = result.scalars().first()
+        mcq = mcq_map.get(int(sub.mcq_id))
         is_correct = False
         if mcq:
             topic = mcq.topic
@@ -71,6 +100,9 @@ async def submit_quiz(attempt_data: QuizAttemptCreate, db: AsyncSession = Depend
         details=details
     )
     db.add(new_attempt)
+    await db.flush()
+    # Same transaction, so the dashboard stats never miss or double-count an attempt
+    await user_stats.record_attempt(db, new_attempt)
     await db.commit()
     await db.refresh(new_attempt)
     
@@ -83,15 +115,50 @@ async def submit_quiz(attempt_data: QuizAttemptCreate, db: AsyncSession = Depend
         "attempt_id": new_attempt.id
     }
 
+HISTORY_COLUMNS = [
+    QuizAttempt.id, QuizAttempt.user_id, QuizAttempt.topic, QuizAttempt.score,
+    QuizAttempt.total_questions, QuizAttempt.time_taken_seconds, QuizAttempt.mode, QuizAttempt.created_at
+]
+
 @router.get("/history/{user_id}")
-async def get_quiz_history(user_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(QuizAttempt)
-        .filter(QuizAttempt.user_id == user_id)
-        .order_by(QuizAttempt.created_at.desc())
+async def get_quiz_history(
+    user_id: int,
+    limit: int = 20,
+    before_id: Optional[int] = None,
+    include_details: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Newest attempts first. Pass the last id of a page as `before_id` to get the next one."""
+    limit = min(max(limit, 1), 100)
+    columns = HISTORY_COLUMNS + [QuizAttempt.details] if include_details else HISTORY_COLUMNS
+    query = select(*columns).filter(QuizAttempt.user_id == user_id)
+    if before_id is not None:
+        query = query.filter(QuizAttempt.id < before_id)
+    # Ids grow with created_at, and the primary key makes the page seek an index range
+    result = await db.execute(query.order_by(QuizAttempt.id.desc()).limit(limit))
+    return [dict(row._mapping) for row in result.all()]
+
+@router.get("/stats/{user_id}")
+async def get_user_stats(user_id: int, db: AsyncSession = Depends(get_db)):
+    """Dashboard totals: accuracy, average time per question, per-topic scores and streaks."""
+    stats = await user_stats.get_stats(db, user_id)
+    return user_stats.stats_payload(stats)
+
+@router.get("/attempts/export")
+async def export_attempts(
+    topic: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fmt: str = Query("csv", alias="format"),
+    current_user: User = Depends(get_current_user)
+):
+    """The caller's quiz attempts created in [since, until) as CSV, NDJSON or Parquet, one row per question."""
+    fmt = result_export.check_format(fmt)
+    user_id = current_user.id
+    return result_export.export_response(
+        lambda dialect: result_export.attempts_query(dialect, user_id=user_id, topic=topic, since=since, until=until),
+        result_export.attempt_rows, result_export.ATTEMPT_COLUMNS, fmt, "ManageMind_QuizAttempts"
     )
-    attempts = result.scalars().all()
-    return attempts
     
 @router.get("/export/{attempt_id}")
 async def export_quiz_pdf(attempt_id: int, db: AsyncSession = Depends(get_db)):
@@ -101,17 +168,26 @@ async def export_quiz_pdf(attempt_id: int, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Attempt not found")
         
     mcq_ids = [int(d['question_id']) for d in attempt.details]
-    result_mcqs = await db.execute(select(MCQ).filter(MCQ.id.in_(mcq_ids)))
-    mcqs = result_mcqs.scalars().all()
+    bank = await get_mcq_bank()
+    mcqs = list((await bank.get_many(mcq_ids)).values())
     
     # Fetch user for name
     user_res = await db.execute(select(User).filter(User.id == attempt.user_id))
     user_obj = user_res.scalars().first()
     user_name = (user_obj.full_name or user_obj.username) if user_obj else "Student"
     
-    pdf_buffer = generate_quiz_pdf(attempt, mcqs, user_name=user_name)
-    
-    headers = {
-        'Content-Disposition': f'attachment; filename="ManageMind_Quiz_Report_{attempt_id}.pdf"'
+    inputs = {
+        "attempt": {
+            "topic": attempt.topic,
+            "score": attempt.score,
+            "total_questions": attempt.total_questions,
+            "time_taken_seconds": attempt.time_taken_seconds,
+            "mode": attempt.mode,
+            "details": attempt.details
+        },
+        "questions": [m._asdict() for m in sorted(mcqs, key=lambda m: m.id)],
+        "user_name": user_name
     }
-    return StreamingResponse(pdf_buffer, media_type="application/pdf", headers=headers)
+    return await reports.report_response(
+        "quiz", attempt_id, inputs, reports.quiz_pages, f"ManageMind_Quiz_Report_{attempt_id}.pdf"
+    )
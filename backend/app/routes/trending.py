@@ -1,18 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from typing import List, Optional
 from ..schemas.trending import TrendingTopic
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from ..database import get_db
 from ..models.models import TrendingTopic as TrendingTopicModel
+from ..utils.pagination import parse_fields, clamp_limit, page_limit, fetch_page, set_next_cursor
+from ..utils import votes
+from ..utils.topic_feed import topic_feed
+from ..utils.response_cache import response_cache
 from datetime import datetime
 
 router = APIRouter()
 
-@router.get("/", response_model=List[TrendingTopic])
-async def get_trending_topics(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(TrendingTopicModel))
-    return result.scalars().all()
+TOPIC_COLUMNS = {c.key: getattr(TrendingTopicModel, c.key) for c in TrendingTopicModel.__table__.columns}
+# Full records, as the list has always returned; lighter projections are opt-in through `fields=`
+TOPIC_FIELDS = [f for f in TrendingTopic.model_fields if f in TOPIC_COLUMNS]
+
+@router.get("/")
+async def get_trending_topics(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Topics in id order; `fields=` picks columns (e.g. the feed's summary set).
+    Every topic unless `limit` or `cursor` asks for pages; X-Next-Cursor pages."""
+    names = parse_fields(fields, list(TOPIC_COLUMNS), TOPIC_FIELDS)
+    # Tallies are keyed by topic id, so read it even when the caller didn't ask for it
+    read = names + ["id"] if "poll" in names and "id" not in names else names
+    items, next_cursor = await fetch_page(
+        db, select(TrendingTopicModel), TOPIC_COLUMNS, read,
+        order=[(TrendingTopicModel.id, False)],
+        limit=page_limit(limit, cursor, 50, 100),
+        cursor=cursor
+    )
+    set_next_cursor(response, next_cursor)
+    if "poll" in names:
+        # Same counts as the detail route: the poll JSON's votes are only a baseline
+        tallies = await votes.poll_tallies_for(db, [item["id"] for item in items if item.get("poll")])
+        for item in items:
+            item["poll"] = votes.with_tallies(item["poll"], tallies.get(item["id"], {}))
+            if read is not names:
+                del item["id"]
+    return items
+
+@router.get("/feed")
+async def get_topic_feed(request: Request, response: Response, limit: int = 50, cursor: Optional[str] = None):
+    """Ranked topic summaries (live, approvals, newest) from the precomputed feed; 304 when unchanged."""
+    items, next_cursor, etag = await topic_feed.page(clamp_limit(limit, 50, 100), cursor)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return items
+
+@router.get("/{topic_id}", response_model=TrendingTopic)
+async def get_trending_topic(topic_id: int, db: AsyncSession = Depends(get_db)):
+    topic = await db.get(TrendingTopicModel, topic_id)
+    if not topic:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    detail = TrendingTopic.model_validate(topic)
+    if detail.poll:
+        detail.poll = votes.with_tallies(detail.poll, await votes.poll_tallies(db, topic_id))
+    return detail
 
 @router.post("/suggest", response_model=TrendingTopic)
 async def suggest_topic(topic: TrendingTopic, db: AsyncSession = Depends(get_db)):
@@ -28,34 +82,26 @@ async def suggest_topic(topic: TrendingTopic, db: AsyncSession = Depends(get_db)
     db.add(new_topic)
     await db.commit()
     await db.refresh(new_topic)
+    topic_feed.invalidate()
+    response_cache.invalidate("trending")
     return new_topic
 
 @router.post("/{topic_id}/vote")
 async def vote_topic(topic_id: int, vote_type: str, db: AsyncSession = Depends(get_db)):
     # vote_type: "approval" or "correction"
-    result = await db.execute(select(TrendingTopicModel).filter(TrendingTopicModel.id == topic_id))
-    topic = result.scalars().first()
-    
-    if not topic:
+    if vote_type not in ("approval", "correction"):
+        raise HTTPException(status_code=400, detail="vote_type must be 'approval' or 'correction'")
+    # Approvals put the topic live at 5; corrections past 20 remove it
+    counts = await votes.vote_topic(db, topic_id, vote_type)
+    if counts is None:
         raise HTTPException(status_code=404, detail="Topic not found")
-        
-    if vote_type == "approval":
-        topic.approval_votes += 1
-        # Check if needs auto-approval (Threshold: 5 votes)
-        if topic.approval_votes >= 5:
-            topic.is_live = True
-    elif vote_type == "correction":
-        # Increment dislike/correction count
-        topic.correction_votes = (topic.correction_votes or 0) + 1
-        
-        # Auto-deletion only if dislikes > 20
-        if topic.correction_votes > 20:
-            await db.delete(topic)
-            await db.commit()
-            return {"message": "Topic removed due to excessive community disapproval"}
-        
     await db.commit()
-    return {"message": "Vote recorded"}
+    topic_feed.invalidate()
+    response_cache.invalidate("trending")
+
+    if counts.pop("removed"):
+        return {"message": "Topic removed due to excessive community disapproval"}
+    return {"message": "Vote recorded", **counts}
 
 @router.delete("/{topic_id}")
 async def delete_topic(topic_id: int, db: AsyncSession = Depends(get_db)):
@@ -66,5 +112,8 @@ async def delete_topic(topic_id: int, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Topic not found")
         
     await db.delete(topic)
+    await votes.delete_poll_tallies(db, topic_id)
     await db.commit()
+    topic_feed.invalidate()
+    response_cache.invalidate("trending")
     return {"message": "Topic deleted"}
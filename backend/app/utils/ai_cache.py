@@ -0,0 +1,98 @@
+"""Persistent cache of AI-generated question pools, keyed on the syllabus point.
+
+Keys are a hash of the normalized syllabus point and the prompt version.
+Each entry holds a pool that grows with every fresh generation, up to
+AI_CACHE_POOL_SIZE questions. Requests are served a random subset of the
+pool, so a 5-question session can reuse a 20-question pool. The table keeps
+at most AI_CACHE_MAX_ENTRIES pools and evicts the least recently used.
+"""
+import copy, hashlib, os, random, re
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import update, delete, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.future import select
+from ..database import AsyncSessionLocal
+from ..models.models import AIQuestionCache
+from .ai_generator import PROMPT_VERSION
+
+MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "500"))
+MAX_POOL_SIZE = int(os.getenv("AI_CACHE_POOL_SIZE", "100"))
+
+
+def normalize_point(syllabus_point: str) -> str:
+    text = re.sub(r"\s+", " ", syllabus_point.strip().lower())
+    return text.strip(" .:;-")
+
+
+def cache_key(syllabus_point: str, prompt_version: int = PROMPT_VERSION) -> str:
+    raw = f"{prompt_version}:{normalize_point(syllabus_point)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def lookup(syllabus_point: str, count: int) -> Optional[List[Dict]]:
+    """A random `count`-question subset of the cached pool, or None if it is too small."""
+    key = cache_key(syllabus_point)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(AIQuestionCache.questions).filter(AIQuestionCache.cache_key == key))
+        pool = result.scalar()
+        if not pool or len(pool) < count:
+            return None
+        await db.execute(
+            update(AIQuestionCache)
+            .where(AIQuestionCache.cache_key == key)
+            .values(hits=AIQuestionCache.hits + 1, last_used_at=datetime.now(timezone.utc))
+        )
+        await db.commit()
+    return copy.deepcopy(random.sample(pool, count))
+
+
+def _merge(pool: List[Dict], questions: List[Dict]) -> List[Dict]:
+    seen = {q.get("question") for q in pool}
+    merged = list(pool)
+    for q in questions:
+        if q.get("question") not in seen:
+            seen.add(q.get("question"))
+            merged.append({k: v for k, v in q.items() if not k.startswith("_")})
+    # Keep the newest questions once the pool is full
+    return merged[-MAX_POOL_SIZE:]
+
+
+async def store(syllabus_point: str, questions: List[Dict]):
+    """Add freshly generated questions to the point's pool, then enforce the LRU bound."""
+    if not questions:
+        return
+    key = cache_key(syllabus_point)
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        # Two tries: if a concurrent request inserts the point first, the second merges into its row
+        for attempt in range(2):
+            result = await db.execute(
+                select(AIQuestionCache).filter(AIQuestionCache.cache_key == key).with_for_update()
+            )
+            entry = result.scalars().first()
+            if entry:
+                entry.questions = _merge(entry.questions or [], questions)
+                entry.last_used_at = now
+            else:
+                db.add(AIQuestionCache(
+                    cache_key=key,
+                    syllabus_point=syllabus_point,
+                    prompt_version=PROMPT_VERSION,
+                    questions=_merge([], questions),
+                    last_used_at=now
+                ))
+            try:
+                await db.commit()
+                break
+            except IntegrityError:
+                await db.rollback()
+                if attempt:
+                    raise
+
+        count_res = await db.execute(select(func.count(AIQuestionCache.id)))
+        excess = (count_res.scalar() or 0) - MAX_ENTRIES
+        if excess > 0:
+            oldest = select(AIQuestionCache.id).order_by(AIQuestionCache.last_used_at.asc()).limit(excess)
+            await db.execute(delete(AIQuestionCache).where(AIQuestionCache.id.in_(oldest)))
+            await db.commit()
@@ -1,62 +1,101 @@
 """AI Question Generator using Google Gemini API.
 Falls back gracefully to empty list if GEMINI_API_KEY is not configured.
+
+The Gemini SDK is blocking, so every call runs on a small dedicated thread
+pool. The timeout is also passed to the SDK as its request deadline, so a
+call that times out ends its thread instead of running on in the
+background. Set AI_FAKE_MODEL=1 to swap in an offline stand-in model for
+local and load testing.
 """
-import os, json, re
-from typing import List, Dict
+import os, json, re, time, asyncio, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator, List, Dict, Optional
+from pydantic import ValidationError
+from ..schemas.mcq import MCQ as MCQSchema
 
 from dotenv import load_dotenv
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "").strip()
+AI_TIMEOUT_SECONDS = float(os.getenv("AI_TIMEOUT_SECONDS", "60"))
+USE_FAKE_MODEL = os.getenv("AI_FAKE_MODEL", "").strip().lower() in ("1", "true", "yes")
+FAKE_MODEL_LATENCY = float(os.getenv("AI_FAKE_MODEL_LATENCY", "1.0"))
+# Same setting as the pipeline's semaphore: at most this many Gemini calls run at once
+AI_WORKERS = max(int(os.getenv("AI_CONCURRENCY", "4")), 1)
 
+_ai_pool = ThreadPoolExecutor(max_workers=AI_WORKERS, thread_name_prefix="ai-generate")
 
-def _clean_json(text: str) -> str:
-    """Strip markdown code fences if present."""
-    text = re.sub(r"```json\s*", "", text)
-    text = re.sub(r"```\s*", "", text)
-    return text.strip()
 
+class MCQStreamParser:
+    """Pulls complete question objects out of the model's JSON array as text arrives.
 
-async def generate_mcqs(syllabus_point: str, count: int) -> List[Dict]:
-    """
-    Generate `count` MCQs for the given `syllabus_point` using Gemini.
-    Returns a list of dicts: {question, options:[{id,text}], correct_option_id, explanation}
-    Returns [] if API key is not set or call fails.
+    Anything outside a top-level object (code fences, brackets, commas) is
+    ignored, and an object that fails to parse is skipped on its own instead
+    of discarding the whole batch.
     """
-    if not GEMINI_API_KEY:
-        print("[AI Generator] Missing GEMINI_API_KEY")
-        return []
 
+    def __init__(self):
+        self._buf = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> List[Dict]:
+        complete = []
+        for ch in text:
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._buf = [ch]
+                continue
+            self._buf.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    question = validate_question("".join(self._buf))
+                    if question:
+                        complete.append(question)
+        return complete
+
+
+def validate_question(raw: str) -> Optional[Dict]:
+    """Parse one question object and check it against the MCQ schema."""
     try:
-        import google.generativeai as genai
-        genai.configure(api_key=GEMINI_API_KEY)
-        
-        # Try models in order of preference/availability
-        models_to_try = [
-            "gemini-2.0-flash", 
-            "gemini-1.5-flash",
-            "gemini-2.5-flash"  # Experimental but worked in local test
-        ]
-        
-        model = None
-        last_error = ""
-        for model_name in models_to_try:
-            try:
-                model = genai.GenerativeModel(model_name)
-                # Test the model with a tiny prompt to ensure it exists and has quota
-                model.generate_content("test", generation_config={"max_output_tokens": 1})
-                print(f"[AI Generator] Using model: {model_name}")
-                break
-            except Exception as e:
-                last_error = str(e)
-                print(f"[AI Generator] Model {model_name} failed: {last_error[:100]}...")
-                model = None
-        
-        if not model:
-            print(f"[AI Generator] All models failed. Last error: {last_error}")
-            return []
-
-        prompt = f"""You are an expert teacher.
+        obj = json.loads(raw)
+        fields = {k: obj[k] for k in ("question", "options", "correct_option_id", "explanation")}
+        mcq = MCQSchema(topic="AI", **fields)
+    except (ValueError, KeyError, TypeError, ValidationError) as e:
+        print(f"[AI Generator] Skipping malformed question: {str(e)[:100]}")
+        return None
+    option_ids = [o.id for o in mcq.options]
+    if mcq.correct_option_id not in option_ids:
+        print("[AI Generator] Skipping question whose answer is not one of its options")
+        return None
+    return {
+        "question": mcq.question,
+        "options": [{"id": o.id, "text": o.text} for o in mcq.options],
+        "correct_option_id": mcq.correct_option_id,
+        "explanation": mcq.explanation
+    }
+
+
+# Bump whenever the prompt changes so cached question pools are not reused
+PROMPT_VERSION = 1
+
+
+def _build_prompt(syllabus_point: str, count: int) -> str:
+    return f"""You are an expert teacher.
 Generate exactly {count} multiple-choice questions for the following syllabus point or topic:
 "{syllabus_point}"
 
@@ -82,16 +121,342 @@ Return ONLY a valid JSON array in this exact format, no other text:
   }}
 ]"""
 
-        response = model.generate_content(prompt)
-        cleaned = _clean_json(response.text)
-        data = json.loads(cleaned)
-        return data[:count]  # Safety: cap at requested count
 
+class _FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """Offline stand-in for genai.GenerativeModel: sleeps, then returns well-formed MCQs."""
+
+    def __init__(self, latency: float = FAKE_MODEL_LATENCY):
+        self.latency = latency
+
+    def generate_content(self, prompt: str, generation_config=None, stream: bool = False, request_options=None):
+        timeout = (request_options or {}).get("timeout")
+        if stream:
+            return self._stream(prompt, timeout)
+        self._sleep(self.latency, timeout)
+        return self._respond(prompt)
+
+    def _sleep(self, seconds: float, timeout: Optional[float]):
+        # Like the SDK, give up with an error once the request deadline passes
+        if timeout is not None and seconds > timeout:
+            time.sleep(max(timeout, 0))
+            raise TimeoutError("504 Deadline Exceeded")
+        time.sleep(seconds)
+
+    def _stream(self, prompt: str, timeout: Optional[float]):
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        text = self._respond(prompt).text
+        size = max(len(text) // 10, 1)
+        for i in range(0, len(text), size):
+            self._sleep(self.latency / 10, deadline - time.monotonic() if deadline is not None else None)
+            yield _FakeResponse(text[i:i + size])
+
+    def _respond(self, prompt: str) -> _FakeResponse:
+        match = re.search(r"Generate exactly (\d+)", prompt)
+        count = int(match.group(1)) if match else 1
+        point = re.search(r'topic:\n"(.*)"', prompt)
+        label = point.group(1) if point else "the topic"
+        questions = [
+            {
+                "question": f"[Fake] Question {i + 1} about {label}?",
+                "options": [{"id": o, "text": f"Option {o.upper()}"} for o in "abcd"],
+                "correct_option_id": "a",
+                "explanation": "Generated offline by the fake model."
+            }
+            for i in range(count)
+        ]
+        return _FakeResponse(json.dumps(questions))
+
+
+MODEL_CANDIDATES = [
+    "gemini-2.0-flash",
+    "gemini-1.5-flash",
+    "gemini-2.5-flash"  # Experimental but worked in local test
+]
+MODEL_CACHE_TTL = float(os.getenv("AI_MODEL_CACHE_TTL", "3600"))
+
+
+class GeminiClient:
+    """Long-lived client: configures the SDK once and remembers which model works.
+
+    The last model that answered is tried first until the TTL expires; the
+    other candidates are only tried when a real call fails, so there are no
+    probe requests. Calls run in worker threads, hence the lock.
+    """
+
+    def __init__(self, model_names: List[str] = MODEL_CANDIDATES, ttl: float = MODEL_CACHE_TTL):
+        self.model_names = list(model_names)
+        self.ttl = ttl
+        self._models = {}
+        self._configured = False
+        self._preferred = None
+        self._preferred_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {
+            name: {"calls": 0, "errors": 0, "total_latency": 0.0, "last_error": None}
+            for name in self.model_names
+        }
+
+    def _model(self, name: str):
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                if USE_FAKE_MODEL:
+                    model = FakeModel()
+                else:
+                    import google.generativeai as genai
+                    if not self._configured:
+                        genai.configure(api_key=GEMINI_API_KEY)
+                        self._configured = True
+                    model = genai.GenerativeModel(name)
+                self._models[name] = model
+            return model
+
+    def _candidates(self) -> List[str]:
+        with self._lock:
+            preferred = self._preferred
+            if preferred and time.monotonic() - self._preferred_at > self.ttl:
+                # Expired: give the first-choice model another chance
+                preferred = self._preferred = None
+        if not preferred:
+            return list(self.model_names)
+        return [preferred] + [n for n in self.model_names if n != preferred]
+
+    def _record(self, name: str, started: float, error: Exception = None):
+        with self._lock:
+            stat = self.stats[name]
+            stat["calls"] += 1
+            stat["total_latency"] += time.monotonic() - started
+            if error is not None:
+                stat["errors"] += 1
+                stat["last_error"] = str(error)[:200]
+                if self._preferred == name:
+                    self._preferred = None
+            elif self._preferred != name:
+                self._preferred = name
+                self._preferred_at = time.monotonic()
+                print(f"[AI Generator] Using model: {name}")
+
+    def _request_options(self, deadline: Optional[float]) -> dict:
+        if deadline is None:
+            return {}
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("AI request deadline passed")
+        return {"request_options": {"timeout": remaining}}
+
+    def generate(self, prompt: str, timeout: Optional[float] = None, **kwargs):
+        """Blocking: generate with the cached model, falling back down the list on failure.
+
+        `timeout` covers the whole call, fallbacks included; each model gets what is left of it.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        last_error = None
+        for name in self._candidates():
+            started = time.monotonic()
+            try:
+                options = self._request_options(deadline)
+            except TimeoutError as e:
+                last_error = e
+                break
+            try:
+                response = self._model(name).generate_content(prompt, **options, **kwargs)
+            except Exception as e:
+                self._record(name, started, e)
+                last_error = e
+                print(f"[AI Generator] Model {name} failed: {str(e)[:100]}...")
+                continue
+            self._record(name, started)
+            return response
+        raise RuntimeError(f"All models failed. Last error: {last_error}")
+
+    def stream(self, prompt: str, on_fallback: Callable[[], None] = None, timeout: Optional[float] = None,
+               **kwargs) -> Iterator:
+        """Blocking generator of response chunks with the same fallback as generate().
+
+        A model only counts as working once its stream has finished (or the
+        caller stopped reading). A failure part-way through is recorded against
+        the model and the next one starts over; `on_fallback` runs first so the
+        caller can drop what it parsed of the broken answer. `timeout` works as in generate().
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        last_error = None
+        for name in self._candidates():
+            started = time.monotonic()
+            received = False
+            response = None
+            try:
+                options = self._request_options(deadline)
+            except TimeoutError as e:
+                last_error = e
+                break
+            try:
+                response = self._model(name).generate_content(prompt, stream=True, **options, **kwargs)
+                for chunk in response:
+                    received = True
+                    yield chunk
+            except GeneratorExit:
+                self._record(name, started)
+                close = getattr(response, "close", None)
+                if close is not None:
+                    close()  # stop reading the model's answer rather than leaving it to the GC
+                raise
+            except Exception as e:
+                self._record(name, started, e)
+                last_error = e
+                print(f"[AI Generator] Model {name} failed{' mid-stream' if received else ''}: {str(e)[:100]}...")
+                if received and on_fallback is not None:
+                    on_fallback()
+                continue
+            self._record(name, started)
+            return
+        raise RuntimeError(f"All models failed. Last error: {last_error}")
+
+    def describe(self) -> dict:
+        with self._lock:
+            return {
+                "preferred_model": self._preferred,
+                "models": {
+                    name: {
+                        **stat,
+                        "avg_latency": round(stat["total_latency"] / stat["calls"], 3) if stat["calls"] else None
+                    }
+                    for name, stat in self.stats.items()
+                }
+            }
+
+
+_client = None
+
+
+def get_client() -> GeminiClient:
+    global _client
+    if _client is None:
+        _client = GeminiClient()
+    return _client
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    # Deadlines are set when the call is queued, so time spent waiting for a worker counts
+    return deadline - time.monotonic() if deadline is not None else None
+
+
+def _generate_blocking(syllabus_point: str, count: int, deadline: Optional[float] = None) -> List[Dict]:
+    response = get_client().generate(_build_prompt(syllabus_point, count), timeout=_remaining(deadline))
+    data = MCQStreamParser().feed(response.text)
+    return data[:count]  # Safety: cap at requested count
+
+
+def _stream_blocking(syllabus_point: str, count: int, emit, stop: Optional[threading.Event] = None,
+                     deadline: Optional[float] = None):
+    """Feed questions to `emit` as the model writes them; returns early once `stop` is set."""
+    parser = MCQStreamParser()
+    sent = 0
+
+    def restart():
+        # Questions already emitted stay; the next model's answer is parsed from scratch
+        nonlocal parser
+        parser = MCQStreamParser()
+
+    chunks = get_client().stream(_build_prompt(syllabus_point, count), on_fallback=restart, timeout=_remaining(deadline))
+    try:
+        for chunk in chunks:
+            if stop is not None and stop.is_set():
+                return
+            for question in parser.feed(chunk.text):
+                emit(question)
+                sent += 1
+                if sent >= count:
+                    return
+    finally:
+        chunks.close()
+
+
+async def generate_mcqs(syllabus_point: str, count: int, timeout: float = AI_TIMEOUT_SECONDS,
+                        raise_errors: bool = False) -> List[Dict]:
+    """
+    Generate `count` MCQs for the given `syllabus_point` using Gemini.
+    Returns a list of dicts: {question, options:[{id,text}], correct_option_id, explanation}
+    Returns [] if API key is not set, the call fails or it takes longer than `timeout`,
+    unless `raise_errors` is set, in which case call failures and timeouts propagate.
+    """
+    if not GEMINI_API_KEY and not USE_FAKE_MODEL:
+        print("[AI Generator] Missing GEMINI_API_KEY")
+        return []
+
+    try:
+        # The SDK blocks; keep it off the event loop. The SDK deadline ends the thread if we stop waiting
+        loop = asyncio.get_running_loop()
+        call = loop.run_in_executor(_ai_pool, _generate_blocking, syllabus_point, count, time.monotonic() + timeout)
+        return await asyncio.wait_for(call, timeout)
+    except asyncio.TimeoutError:
+        print(f"[AI Generator] Timed out after {timeout}s for: {syllabus_point[:60]}")
+        if raise_errors:
+            raise
+        return []
     except Exception as e:
         print(f"[AI Generator] Error generating questions: {e}")
+        if raise_errors:
+            raise
         return []
 
 
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for Gemini quota / HTTP 429 failures."""
+    text = f"{type(error).__name__} {error}"
+    return "429" in text or "ResourceExhausted" in text or "quota" in text.lower()
+
+
+async def stream_mcqs(syllabus_point: str, count: int, timeout: float = AI_TIMEOUT_SECONDS) -> AsyncIterator[Dict]:
+    """Like generate_mcqs, but yields each valid question as soon as the model finishes it."""
+    if not GEMINI_API_KEY and not USE_FAKE_MODEL:
+        print("[AI Generator] Missing GEMINI_API_KEY")
+        return
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+    # Set when the reader goes away (deadline, disconnect, cancellation) so the worker stops pulling chunks
+    stop = threading.Event()
+
+    def emit(item):
+        if loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            pass  # the loop closed after the check
+
+    started = time.monotonic()
+
+    def worker():
+        try:
+            _stream_blocking(syllabus_point, count, emit, stop, started + timeout)
+        except Exception as e:
+            print(f"[AI Generator] Error streaming questions: {e}")
+        finally:
+            emit(done)
+
+    loop.run_in_executor(_ai_pool, worker)
+    deadline = loop.time() + timeout
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                print(f"[AI Generator] Stream timed out after {timeout}s for: {syllabus_point[:60]}")
+                return
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+
+
 def generate_mcqs_sync(syllabus_point: str, count: int) -> List[Dict]:
     """Synchronous wrapper for environments that don't support async."""
     import asyncio
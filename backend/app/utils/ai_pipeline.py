@@ -0,0 +1,145 @@
+"""Concurrent AI question generation for multi-point live sessions.
+
+Each syllabus point is generated in parallel, bounded by AI_CONCURRENCY.
+Results are merged as they finish. Progress is tracked per job id so a
+client can poll it while the create request is still running. Points
+already in the AI question cache skip generation unless `fresh` is set.
+`stream_for_selections` hands out questions one by one as they are parsed.
+"""
+import asyncio, os, time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from .ai_generator import generate_mcqs, stream_mcqs
+from . import ai_cache
+
+AI_CONCURRENCY = int(os.getenv("AI_CONCURRENCY", "4"))
+MAX_TRACKED_JOBS = 100
+
+
+class GenerationProgress:
+    def __init__(self, selections: List[Tuple[str, int]]):
+        self.started = time.monotonic()
+        self.points = [
+            {"point": point, "requested": count, "generated": 0, "status": "pending"}
+            for point, count in selections
+        ]
+
+    def mark(self, index: int, status: str, generated: int = 0):
+        self.points[index]["status"] = status
+        self.points[index]["generated"] = generated
+
+    def as_dict(self) -> dict:
+        finished = [p for p in self.points if p["status"] in ("done", "cached", "failed")]
+        return {
+            "total_points": len(self.points),
+            "finished_points": len(finished),
+            "questions_ready": sum(p["generated"] for p in self.points),
+            "elapsed_seconds": round(time.monotonic() - self.started, 2),
+            "points": self.points,
+        }
+
+
+_jobs: "OrderedDict[str, GenerationProgress]" = OrderedDict()
+
+
+def track(job_id: Optional[str], selections: List[Tuple[str, int]]) -> GenerationProgress:
+    progress = GenerationProgress(selections)
+    if job_id:
+        _jobs[job_id] = progress
+        while len(_jobs) > MAX_TRACKED_JOBS:
+            _jobs.popitem(last=False)
+    return progress
+
+
+def get_progress(job_id: str) -> Optional[GenerationProgress]:
+    return _jobs.get(job_id)
+
+
+async def generate_for_selections(selections: List[Tuple[str, int]],
+                                  progress: Optional[GenerationProgress] = None,
+                                  concurrency: int = AI_CONCURRENCY,
+                                  fresh: bool = False) -> List[List[Dict]]:
+    """Questions for each (point, count), in selection order; failed points yield []."""
+    progress = progress or GenerationProgress(selections)
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    results: List[List[Dict]] = [[] for _ in selections]
+
+    async def run(index: int, point: str, count: int):
+        if not fresh:
+            try:
+                cached = await ai_cache.lookup(point, count)
+            except Exception as e:
+                print(f"[AI Pipeline] Cache lookup failed for {point[:60]}: {e}")
+                cached = None
+            if cached is not None:
+                progress.mark(index, "cached", len(cached))
+                return index, cached
+
+        async with semaphore:
+            progress.mark(index, "running")
+            qs = await generate_mcqs(point, count)
+        try:
+            await ai_cache.store(point, qs)
+        except Exception as e:
+            print(f"[AI Pipeline] Cache store failed for {point[:60]}: {e}")
+        return index, qs
+
+    tasks = [asyncio.create_task(run(i, point, count)) for i, (point, count) in enumerate(selections)]
+    for finished in asyncio.as_completed(tasks):
+        index, qs = await finished
+        results[index] = qs
+        if progress.points[index]["status"] != "cached":
+            progress.mark(index, "done" if qs else "failed", len(qs))
+    return results
+
+
+async def stream_for_selections(selections: List[Tuple[str, int]],
+                                progress: Optional[GenerationProgress] = None,
+                                concurrency: int = AI_CONCURRENCY,
+                                fresh: bool = False) -> AsyncIterator[Tuple[int, Optional[Dict]]]:
+    """Streaming variant: yields (point_index, question) as each question is ready,
+    then (point_index, None) once that point has finished."""
+    progress = progress or GenerationProgress(selections)
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run(index: int, point: str, count: int):
+        try:
+            if not fresh:
+                try:
+                    cached = await ai_cache.lookup(point, count)
+                except Exception as e:
+                    print(f"[AI Pipeline] Cache lookup failed for {point[:60]}: {e}")
+                    cached = None
+                if cached is not None:
+                    for q in cached:
+                        await queue.put((index, q))
+                    progress.mark(index, "cached", len(cached))
+                    return
+
+            qs = []
+            async with semaphore:
+                progress.mark(index, "running")
+                async for q in stream_mcqs(point, count):
+                    qs.append(q)
+                    progress.mark(index, "running", len(qs))
+                    await queue.put((index, q))
+            progress.mark(index, "done" if qs else "failed", len(qs))
+            try:
+                await ai_cache.store(point, qs)
+            except Exception as e:
+                print(f"[AI Pipeline] Cache store failed for {point[:60]}: {e}")
+        finally:
+            await queue.put((index, None))
+
+    tasks = [asyncio.create_task(run(i, point, count)) for i, (point, count) in enumerate(selections)]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            index, q = await queue.get()
+            if q is None:
+                remaining -= 1
+            yield index, q
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,77 @@
+"""Precompiled answer keys for scoring live session submissions.
+
+A key is built once per session when it starts and then shared read-only by
+every submitter, so scoring is a dict lookup per answer with no DB access.
+"""
+from typing import Dict, List, Tuple
+from sqlalchemy.future import select
+from ..database import AsyncSessionLocal
+from ..models.models import LiveSession
+from .mcq_bank import get_mcq_bank
+
+
+class AnswerKey:
+    __slots__ = ("slots", "correct", "numeric_ids")
+
+    def __init__(self, slots: Dict[str, int], correct: List[str], numeric_ids: bool):
+        self.slots = slots          # submitted mcq_id (as str) -> slot
+        self.correct = correct      # slot -> correct option id
+        self.numeric_ids = numeric_ids  # DB sessions report integer mcq ids
+
+    def __len__(self) -> int:
+        return len(self.correct)
+
+    def score(self, answers) -> Tuple[int, List[dict]]:
+        slots, correct_ids = self.slots, self.correct
+        correct = 0
+        details = []
+        for ans in answers:
+            raw_id = str(ans.mcq_id)
+            slot = slots.get(raw_id)
+            if slot is None:
+                continue
+            is_correct = str(ans.selected_option_id) == correct_ids[slot]
+            if is_correct:
+                correct += 1
+            details.append({
+                "mcq_id": int(raw_id) if self.numeric_ids else raw_id,
+                "selected": ans.selected_option_id,
+                "is_correct": is_correct
+            })
+        return correct, details
+
+
+def compile_ai_key(session_id: int, mcqs: List[dict]) -> AnswerKey:
+    slots = {}
+    correct = []
+    for i, q in enumerate(mcqs):
+        # Accept both the raw index and the id sent to clients by /questions
+        slots[str(q.get("_ai_idx", i))] = i
+        slots[f"ai_{session_id}_{i}"] = i
+        correct.append(str(q.get("correct_option_id")))
+    return AnswerKey(slots, correct, numeric_ids=False)
+
+
+def compile_db_key(rows) -> AnswerKey:
+    slots = {}
+    correct = []
+    for mcq_id, correct_option_id in rows:
+        slots[str(mcq_id)] = len(correct)
+        correct.append(str(correct_option_id))
+    return AnswerKey(slots, correct, numeric_ids=True)
+
+
+async def load_answer_key(session_id: int) -> AnswerKey:
+    """Build the key from the session's AI questions or its unit/topic pool in the MCQ bank."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(LiveSession).filter(LiveSession.id == session_id))
+        session = result.scalars().first()
+        if session is None:
+            return AnswerKey({}, [], numeric_ids=True)
+        if session.mcqs:
+            return compile_ai_key(session_id, session.mcqs)
+
+        unit, topic = session.unit, session.topic
+
+    bank = await get_mcq_bank()
+    return compile_db_key((m.id, m.correct_option_id) for m in bank.records_for(unit, topic))
@@ -0,0 +1,60 @@
+"""Short-lived cache of authenticated users, keyed on the bearer token.
+
+A hit skips both the JWT decode and the user query. Entries live for
+AUTH_CACHE_TTL seconds (never past the token's own expiry), and the
+cache holds at most AUTH_CACHE_MAX_ENTRIES tokens, least recently used
+first out. Cached users are detached copies of the row, so treat them
+as read-only. Routes that write should load the row with their own
+session and call `invalidate_user()` afterwards. Invalidation only
+reaches this process; other workers catch up within the TTL.
+"""
+import os, time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from ..models.models import User
+
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+_COLUMNS = [c.key for c in User.__table__.columns]
+
+# token -> (expires_at epoch seconds, column values of the user row)
+_entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def get(token: str) -> Optional[User]:
+    entry = _entries.get(token)
+    if entry is None:
+        stats["misses"] += 1
+        return None
+    expires_at, values = entry
+    if time.time() >= expires_at:
+        del _entries[token]
+        stats["misses"] += 1
+        return None
+    _entries.move_to_end(token)
+    stats["hits"] += 1
+    return User(**values)
+
+
+def put(token: str, user: User, token_exp: Optional[float] = None):
+    expires_at = time.time() + AUTH_CACHE_TTL
+    if token_exp is not None:
+        expires_at = min(expires_at, token_exp)
+    _entries[token] = (expires_at, {key: getattr(user, key) for key in _COLUMNS})
+    _entries.move_to_end(token)
+    while len(_entries) > AUTH_CACHE_MAX_ENTRIES:
+        _entries.popitem(last=False)
+
+
+def invalidate_user(user_id: int):
+    """Drop every cached token of this user; call after any change to the user row."""
+    stale = [token for token, (_, values) in _entries.items() if values["id"] == user_id]
+    for token in stale:
+        del _entries[token]
+    stats["invalidations"] += 1
+
+
+def clear():
+    _entries.clear()
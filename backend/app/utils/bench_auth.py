@@ -0,0 +1,65 @@
+"""Microbenchmark: per-request auth overhead with and without the user cache.
+
+Run from backend/ against a throwaway database, since it creates a user:
+
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m app.utils.bench_auth --requests 2000
+"""
+import argparse, asyncio, time
+from sqlalchemy import event
+from sqlalchemy.future import select
+from ..database import AsyncSessionLocal, engine, Base
+from ..models.models import User
+from ..routes.auth import get_current_user
+from . import auth_cache
+from .auth import create_access_token, get_password_hash
+
+
+async def ensure_user() -> str:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User).filter(User.username == "bench_auth_user"))
+        if result.scalars().first() is None:
+            db.add(User(username="bench_auth_user", email="bench_auth_user@example.com",
+                        hashed_password=get_password_hash("bench"), quiz_history=[], badges=[]))
+            await db.commit()
+    return create_access_token(data={"sub": "bench_auth_user"})
+
+
+async def timed(token: str, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        # Same shape as a request: a fresh session per call
+        async with AsyncSessionLocal() as db:
+            await get_current_user(token, db)
+    return (time.perf_counter() - started) / requests
+
+
+async def main(requests: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    token = await ensure_user()
+
+    queries = {"n": 0}
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: queries.__setitem__("n", queries["n"] + 1))
+
+    # Uncached: what every request paid before (decode + user query)
+    auth_cache.AUTH_CACHE_TTL = 0
+    queries["n"] = 0
+    uncached = await timed(token, requests)
+    uncached_queries = queries["n"] / requests
+
+    auth_cache.AUTH_CACHE_TTL = 60
+    auth_cache.clear()
+    queries["n"] = 0
+    cached = await timed(token, requests)
+    cached_queries = queries["n"] / requests
+
+    print(f"uncached  {uncached * 1e6:8.1f} us/request  {uncached_queries:.3f} queries/request")
+    print(f"cached    {cached * 1e6:8.1f} us/request  {cached_queries:.3f} queries/request")
+    print(f"speedup   {uncached / cached:8.1f}x")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    asyncio.run(main(parser.parse_args().requests))
@@ -0,0 +1,83 @@
+"""Load test: DB queries per live-session event, push channel against status polling.
+
+Opens K WebSocket subscribers on one session and counts the queries a join
+costs while the event fans out to all of them. The previous clients polled
+/status instead; that cost is measured with a copy of the old handler's
+two queries, one poll per client per event. Run from backend/ against a
+throwaway database, since it creates users and sessions:
+
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m app.utils.bench_live_push --clients 1 10 50 100
+"""
+import argparse, contextlib
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert, func
+from sqlalchemy.future import select
+from ..main import app
+from ..database import AsyncSessionLocal, engine, Base
+from ..models.models import User, LiveSession, LiveParticipant
+from .rate_limit import limiter
+
+JOINS_PER_RUN = 20
+
+
+async def legacy_poll_status(session_id: int):
+    """The old get_session_status: the session row, then every participant row to len() them."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(LiveSession).filter(LiveSession.id == session_id))
+        session = result.scalars().first()
+        participants = await db.execute(select(LiveParticipant).filter(LiveParticipant.session_id == session_id))
+        return {"status": session.status, "participants_count": len(participants.scalars().all())}
+
+
+async def create_users(count: int) -> list:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        first = (await db.execute(select(func.coalesce(func.max(User.id), 0)))).scalar() + 1
+        await db.execute(insert(User), [
+            {"id": first + i, "username": f"bench_push_{first + i}", "email": f"bench_push_{first + i}@example.com",
+             "hashed_password": "x", "quiz_history": [], "badges": []}
+            for i in range(count)
+        ])
+        await db.commit()
+    return list(range(first, first + count))
+
+
+def main(client_counts):
+    limiter.enabled = False  # every join comes from the same test client
+    queries = {"n": 0}
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: queries.__setitem__("n", queries["n"] + 1))
+
+    print(f"{'clients':>7}  {'push q/join':>11} {'delivered':>9}  {'polling q/event':>15}")
+    with TestClient(app) as client:
+        for clients in client_counts:
+            users = client.portal.call(create_users, JOINS_PER_RUN + 1)
+            host_id, students = users[0], users[1:]
+            session = client.post("/api/live/create", params={"topic": "Bench", "duration_minutes": 5, "host_id": host_id}).json()
+
+            with contextlib.ExitStack() as stack:
+                sockets = [stack.enter_context(client.websocket_connect(f"/api/live/{session['id']}/ws"))
+                           for _ in range(clients)]
+                for ws in sockets:
+                    ws.receive_json()  # snapshot
+
+                queries["n"] = 0
+                delivered = 0
+                for user_id in students:
+                    client.post(f"/api/live/join/{session['exam_id']}", params={"user_id": user_id})
+                    for ws in sockets:
+                        delivered += ws.receive_json()["type"] == "join"
+                push = queries["n"] / JOINS_PER_RUN
+
+            queries["n"] = 0
+            for _ in range(clients):
+                client.portal.call(legacy_poll_status, session["id"])
+            polling = queries["n"]
+
+            print(f"{clients:>7}  {push:>11.2f} {delivered:>9}  {polling:>15}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 50, 100])
+    main(parser.parse_args().clients)
@@ -0,0 +1,89 @@
+"""Load test: event-loop lag while a burst of students log in at once.
+
+Runs the real /api/auth/login route in-process (rate limiting disabled)
+while a probe task measures how late a 10ms sleep wakes up. "inline"
+hashes on the event loop as the handlers used to; "pool" uses the
+hashing thread pool. Run from backend/ against a throwaway database:
+
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m app.utils.bench_login_lag --logins 60
+"""
+import argparse, asyncio, time
+import httpx
+from sqlalchemy.future import select
+from ..database import AsyncSessionLocal, engine, Base
+from ..models.models import User
+from ..main import app
+from ..routes import auth as auth_routes
+from ..utils.rate_limit import limiter
+from . import auth
+
+PROBE_INTERVAL = 0.01
+
+
+async def ensure_users(count: int):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User.username).filter(User.username.like("bench_login_%")))
+        existing = set(result.scalars().all())
+        for i in range(count):
+            name = f"bench_login_{i}"
+            if name not in existing:
+                db.add(User(username=name, email=f"{name}@example.com",
+                            hashed_password=auth.get_password_hash("password"), quiz_history=[], badges=[]))
+        await db.commit()
+
+
+async def _inline_verify(plain_password, hashed_password):
+    return auth.pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def burst(logins: int) -> dict:
+    lags = []
+    stop = asyncio.Event()
+
+    async def probe():
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        responses = await asyncio.gather(*[
+            client.post("/api/auth/login", data={"username": f"bench_login_{i}", "password": "password"})
+            for i in range(logins)
+        ])
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+
+    lags.sort()
+    return {
+        "ok": sum(r.status_code == 200 for r in responses),
+        "seconds": elapsed,
+        "p50_ms": lags[len(lags) // 2] * 1000,
+        "p99_ms": lags[min(int(len(lags) * 0.99), len(lags) - 1)] * 1000,
+        "max_ms": lags[-1] * 1000,
+    }
+
+
+async def main(logins: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await ensure_users(logins)
+    limiter.enabled = False
+
+    pooled = auth_routes.verify_and_update_async
+    for mode in ("inline", "pool"):
+        auth_routes.verify_and_update_async = _inline_verify if mode == "inline" else pooled
+        r = await burst(logins)
+        print(f"{mode:<7} {r['ok']:>3}/{logins} ok in {r['seconds']:5.2f}s   loop lag p50 {r['p50_ms']:7.1f}ms"
+              f"  p99 {r['p99_ms']:7.1f}ms  max {r['max_ms']:7.1f}ms")
+    auth_routes.verify_and_update_async = pooled
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=60)
+    asyncio.run(main(parser.parse_args().logins))
@@ -0,0 +1,95 @@
+"""Benchmark: the old per-object seeding path against the bulk loader.
+
+Run from backend/ against a throwaway database, since it clears the mcqs table:
+
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m app.utils.bench_mcq_loader --rows 20000
+"""
+import argparse, asyncio, json, os, tempfile, time
+from sqlalchemy import delete
+from ..database import AsyncSessionLocal, engine, Base
+from ..models.models import MCQ
+from .mcq_loader import ensure_content_hash_column, iter_unit_records, load_files
+
+
+def write_fixture(directory: str, rows: int, units: int = 5) -> list:
+    paths = []
+    per_unit = rows // units
+    for u in range(1, units + 1):
+        questions = [
+            {
+                "topic": f"Topic {u}.{i % 6 + 1}",
+                "question": f"Benchmark question {i} of unit {u}?",
+                "options": [{"id": o, "text": f"Option {o.upper()} for {i}"} for o in "abcd"],
+                "correct_option_id": "abcd"[i % 4],
+                "explanation": f"Explanation for question {i}."
+            }
+            for i in range(per_unit)
+        ]
+        path = os.path.join(directory, f"unit{u}_mcqs.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({f"unit{u}": questions}, f)
+        paths.append(path)
+    return paths
+
+
+async def per_object(paths: list) -> int:
+    """The previous seed_exam_mcqs loop: json.load, one ORM object per row, commit per unit."""
+    total = 0
+    async with AsyncSessionLocal() as session:
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            unit_key = list(data.keys())[0]
+            for q_data in data[unit_key]:
+                session.add(MCQ(
+                    unit=unit_key,
+                    topic=q_data["topic"],
+                    question=q_data["question"],
+                    options=q_data["options"],
+                    correct_option_id=q_data["correct_option_id"],
+                    explanation=q_data["explanation"]
+                ))
+                total += 1
+            await session.commit()
+    return total
+
+
+async def clear():
+    async with engine.begin() as conn:
+        await conn.execute(delete(MCQ))
+
+
+async def main(rows: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await ensure_content_hash_column(conn)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_fixture(directory, rows)
+        print(f"Fixture: {rows} questions in {len(paths)} files")
+
+        started = time.monotonic()
+        parsed = sum(1 for path in paths for _ in iter_unit_records(path))
+        print(f"streaming parse only   {parsed:>7} rows  {time.monotonic() - started:7.2f}s")
+
+        await clear()
+        started = time.monotonic()
+        count = await per_object(paths)
+        elapsed = time.monotonic() - started
+        print(f"per-object (old)       {count:>7} rows  {elapsed:7.2f}s  {count / elapsed:9.0f} rows/sec")
+
+        await clear()
+        report = await load_files(paths)
+        print(f"bulk upsert (insert)   {report['upserted']:>7} rows  {report['seconds']:7.2f}s  {report['rows_per_sec']:9} rows/sec")
+
+        report = await load_files(paths)
+        print(f"bulk upsert (update)   {report['upserted']:>7} rows  {report['seconds']:7.2f}s  {report['rows_per_sec']:9} rows/sec")
+
+    await clear()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    asyncio.run(main(parser.parse_args().rows))
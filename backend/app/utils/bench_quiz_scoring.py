@@ -0,0 +1,99 @@
+"""Benchmark: p50/p99 of scoring a quiz attempt against attempt size.
+
+Compares the previous per-question lookups with the single batched IN
+query and with the cached MCQ bank that submit_quiz uses now. Run from
+backend/ against a throwaway database, since it adds questions:
+
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m app.utils.bench_quiz_scoring --sizes 10 50 200
+"""
+import argparse, asyncio, time
+from types import SimpleNamespace
+from sqlalchemy import insert, func
+from sqlalchemy.future import select
+from ..database import AsyncSessionLocal, engine, Base
+from ..models.models import MCQ
+from .mcq_bank import get_mcq_bank, bump_bank_version
+
+BANK_SIZE = 300
+
+
+def score(submissions, mcq_map):
+    """The scoring pass shared by every variant: score plus per-topic breakdown."""
+    correct = 0
+    topic_scores = {}
+    for sub in submissions:
+        mcq = mcq_map.get(int(sub.mcq_id))
+        if mcq:
+            scores = topic_scores.setdefault(mcq.topic, {"total": 0, "correct": 0})
+            scores["total"] += 1
+            if mcq.correct_option_id == sub.selected_option_id:
+                correct += 1
+                scores["correct"] += 1
+    return correct, topic_scores
+
+
+async def per_question(db, submissions):
+    """The previous submit_quiz: one SELECT per submitted answer."""
+    mcq_map = {}
+    for sub in submissions:
+        result = await db.execute(select(MCQ).filter(MCQ.id == int(sub.mcq_id)))
+        mcq = result.scalars().first()
+        if mcq:
+            mcq_map[mcq.id] = mcq
+    return score(submissions, mcq_map)
+
+
+async def batched(db, submissions):
+    result = await db.execute(
+        select(MCQ.id, MCQ.topic, MCQ.correct_option_id).filter(MCQ.id.in_({int(s.mcq_id) for s in submissions}))
+    )
+    return score(submissions, {row.id: row for row in result.all()})
+
+
+async def cached_bank(db, submissions):
+    bank = await get_mcq_bank()
+    return score(submissions, await bank.get_many(int(s.mcq_id) for s in submissions))
+
+
+async def seed() -> list:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        first = (await db.execute(select(func.coalesce(func.max(MCQ.id), 0)))).scalar() + 1
+        options = [{"id": o, "text": o} for o in "abcd"]
+        await db.execute(insert(MCQ), [
+            {"unit": "bench", "topic": f"Bench {i % 4}", "question": f"Bench question {first + i}?",
+             "options": options, "correct_option_id": "abcd"[i % 4], "explanation": "Bench."}
+            for i in range(BANK_SIZE)
+        ])
+        await bump_bank_version(db)
+    return list(range(first, first + BANK_SIZE))
+
+
+async def main(sizes, runs: int):
+    ids = await seed()
+    await (await get_mcq_bank()).ensure_fresh()
+
+    print(f"{'size':>5}  {'variant':<13} {'p50':>8} {'p99':>8}")
+    for size in sizes:
+        submissions = [SimpleNamespace(mcq_id=ids[i % len(ids)], selected_option_id="a") for i in range(size)]
+        for name, variant in (("per-question", per_question), ("batched", batched), ("cached bank", cached_bank)):
+            timings = []
+            for _ in range(runs):
+                async with AsyncSessionLocal() as db:
+                    started = time.perf_counter()
+                    await variant(db, submissions)
+                    timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p50 = timings[len(timings) // 2]
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            print(f"{size:>5}  {name:<13} {p50:>6.2f}ms {p99:>6.2f}ms")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--runs", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.runs))
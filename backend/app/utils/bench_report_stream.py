@@ -0,0 +1,125 @@
+"""Benchmark: the previous reportlab session report against the streaming writer.
+
+Measures time to first byte, time to the first full page, total time and
+traced peak memory (in a second, untimed run) at several leaderboard
+sizes. No database is needed:
+
+    python -m app.utils.bench_report_stream --rows 100 1000 10000
+
+reportlab is no longer a dependency of the app. Install it to include the
+previous renderer in the comparison; otherwise only the streaming writer
+is measured.
+"""
+import argparse, time, tracemalloc
+from datetime import datetime
+from io import BytesIO
+from types import SimpleNamespace
+from .pdf_exporter import iter_host_session_pdf
+
+
+def reportlab_session_pdf(session_data, leaderboard_data):
+    """The previous generate_host_session_pdf: the whole document is built in a BytesIO."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+    p.setFont("Helvetica-Bold", 16)
+    p.drawString(50, height - 50, f"ManageMind - Live Session Report")
+    p.setFont("Helvetica", 12)
+    p.drawString(50, height - 80, f"Session ID: {session_data.exam_id}")
+    p.drawString(50, height - 100, f"Topic: {session_data.topic}")
+    p.drawString(50, height - 120, f"Status: {session_data.status.capitalize()}")
+    p.drawString(50, height - 140, f"Date: {session_data.created_at.strftime('%Y-%m-%d %H:%M')}")
+    y = height - 180
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(50, y, "Rank")
+    p.drawString(100, y, "Student")
+    p.drawString(300, y, "Score")
+    p.drawString(400, y, "Time")
+    y -= 20
+    p.setFont("Helvetica", 10)
+    for row in leaderboard_data:
+        if y < 50:
+            p.showPage()
+            y = height - 50
+        p.drawString(50, y, str(row['rank']))
+        p.drawString(100, y, row['full_name'])
+        p.drawString(300, y, f"{row['score']}")
+        p.drawString(400, y, f"{row['time_taken_seconds']}s")
+        y -= 15
+    p.save()
+    buffer.seek(0)
+    return buffer
+
+
+def fixture(rows: int):
+    session = SimpleNamespace(exam_id="BENCH1", topic="Benchmark", status="finished", created_at=datetime(2026, 1, 1))
+    leaderboard = [
+        {"rank": i + 1, "full_name": f"Student Number {i:05d}", "score": (i * 7) % 50, "time_taken_seconds": 60 + i % 900}
+        for i in range(rows)
+    ]
+    return session, leaderboard
+
+
+def timings(chunks_factory):
+    """(first byte s, first page s, total s, bytes) while discarding output."""
+    started = time.perf_counter()
+    first_byte = first_page = None
+    size = 0
+    for i, chunk in enumerate(chunks_factory()):
+        now = time.perf_counter() - started
+        if first_byte is None:
+            first_byte = now
+        if first_page is None and i >= 1:
+            first_page = now
+        size += len(chunk)
+    total = time.perf_counter() - started
+    return first_byte, first_page or total, total, size
+
+
+def peak_memory(chunks_factory) -> int:
+    """Traced peak in a separate run; tracemalloc slows allocation-heavy code too much to time it."""
+    tracemalloc.start()
+    for _ in chunks_factory():
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def has_reportlab() -> bool:
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def main(sizes):
+    compare = has_reportlab()
+    if not compare:
+        print("reportlab is not installed; measuring the streaming writer only")
+    # Warm up imports and font tables so the first row isn't charged for them
+    session, leaderboard = fixture(10)
+    if compare:
+        reportlab_session_pdf(session, leaderboard)
+    b"".join(iter_host_session_pdf(session, leaderboard))
+
+    print(f"{'rows':>6}  {'renderer':<10} {'first byte':>10} {'first page':>10} {'total':>8} {'size':>9} {'peak mem':>9}")
+    for rows in sizes:
+        session, leaderboard = fixture(rows)
+        runs = [("streaming", lambda: iter_host_session_pdf(session, leaderboard))]
+        if compare:
+            runs.insert(0, ("reportlab", lambda: iter([reportlab_session_pdf(session, leaderboard).getvalue()])))
+        for name, factory in runs:
+            first_byte, first_page, total, size = timings(factory)
+            peak = peak_memory(factory)
+            print(f"{rows:>6}  {name:<10} {first_byte * 1000:>8.1f}ms {first_page * 1000:>8.1f}ms "
+                  f"{total * 1000:>6.0f}ms {size / 1024:>7.0f}KB {peak / 1024 / 1024:>7.2f}MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    main(parser.parse_args().rows)
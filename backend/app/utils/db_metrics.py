@@ -0,0 +1,186 @@
+"""Connection pool and statement instrumentation for the database engine.
+
+`InstrumentedPool` times every pool checkout, which includes the wait
+for a free connection, connecting on overflow and pre-ping. Engine
+events count statements and keep the slowest ones (over
+DB_SLOW_STATEMENT_MS) along with the route that issued them.
+`RouteContextMiddleware` supplies that route. All samples live in
+bounded in-process buffers and are read through
+`db_metrics.snapshot()`.
+"""
+import os, time
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+SLOW_STATEMENT_MS = float(os.getenv("DB_SLOW_STATEMENT_MS", "200"))
+WAIT_SAMPLES = 1000
+SLOW_SAMPLES = 100
+
+_request_scope: ContextVar[Optional[dict]] = ContextVar("db_request_scope", default=None)
+
+
+def current_route() -> str:
+    """Route template of the request being served, or 'background' outside one."""
+    scope = _request_scope.get()
+    if scope is None:
+        return "background"
+    method = scope.get("method") or "WS"
+    return f"{method} {_route_template(scope)}"
+
+
+def _route_template(scope: dict) -> str:
+    """'/api/live/{session_id}/submit' rather than the concrete path, so samples group by route."""
+    path = scope.get("path", "?")
+    # FastAPI stores the matched route on the scope after routing; for included
+    # routers its path lacks the prefix, so find where its pattern starts matching
+    route = scope.get("route")
+    regex = getattr(route, "path_regex", None)
+    if regex is None:
+        return path
+    for i in range(len(path)):
+        if path[i] == "/" and regex.match(path[i:]):
+            return path[:i] + route.path
+    return path
+
+
+class RouteContextMiddleware:
+    """Plain ASGI middleware, so it also covers WebSocket connections."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+        token = _request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(token)
+
+
+def _percentile(ordered: list, pct: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+class DBMetrics:
+    def __init__(self):
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.statements = 0
+        self.slow_statements = 0
+        self.slow = deque(maxlen=SLOW_SAMPLES)
+        self.slow_by_route = {}
+
+    def record_checkout(self, seconds: float, checked_out: int):
+        self.waits.append(seconds)
+        self.checkouts += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+        self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_statement(self, statement: str, seconds: float):
+        self.statements += 1
+        ms = seconds * 1000
+        if ms < SLOW_STATEMENT_MS:
+            return
+        route = current_route()
+        self.slow_statements += 1
+        self.slow.append({
+            "route": route,
+            "ms": round(ms, 1),
+            "statement": " ".join(statement.split())[:300],
+            "at": time.time()
+        })
+        stat = self.slow_by_route.setdefault(route, {"count": 0, "max_ms": 0.0})
+        stat["count"] += 1
+        stat["max_ms"] = round(max(stat["max_ms"], ms), 1)
+
+    def snapshot(self, pool=None) -> dict:
+        ordered = sorted(self.waits)
+        to_ms = lambda s: round(s * 1000, 2) if s is not None else None
+        data = {
+            "checkout": {
+                "count": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_ms": to_ms(self.total_wait / self.checkouts) if self.checkouts else None,
+                "p50_ms": to_ms(_percentile(ordered, 0.50)),
+                "p95_ms": to_ms(_percentile(ordered, 0.95)),
+                "p99_ms": to_ms(_percentile(ordered, 0.99)),
+                "max_ms": to_ms(self.max_wait),
+            },
+            "connections": {
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "peak_checked_out": self.peak_checked_out,
+            },
+            "statements": {
+                "count": self.statements,
+                "slow_count": self.slow_statements,
+                "slow_threshold_ms": SLOW_STATEMENT_MS,
+                "slow_by_route": self.slow_by_route,
+                "recent_slow": list(self.slow)[::-1],
+            },
+        }
+        if pool is not None:
+            data["pool"] = {"class": type(pool).__name__, "status": pool.status()}
+            if isinstance(pool, AsyncAdaptedQueuePool):
+                data["pool"].update(
+                    size=pool.size(),
+                    checked_out=pool.checkedout(),
+                    checked_in=pool.checkedin(),
+                    overflow=pool.overflow(),
+                )
+        return data
+
+
+db_metrics = DBMetrics()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout took."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            conn = super().connect()
+        except PoolTimeoutError:
+            db_metrics.timeouts += 1
+            raise
+        db_metrics.record_checkout(time.perf_counter() - started, self.checkedout())
+        return conn
+
+
+def instrument(async_engine):
+    sync_engine = async_engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._db_metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_db_metrics_started", None)
+        if started is not None:
+            db_metrics.record_statement(statement, time.perf_counter() - started)
+
+    @event.listens_for(sync_engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        db_metrics.connects += 1
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _invalidate(dbapi_connection, connection_record, exception):
+        db_metrics.invalidations += 1
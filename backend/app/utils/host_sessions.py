@@ -0,0 +1,96 @@
+"""Per-host session summaries for the host dashboard.
+
+One grouped query per page returns each session with its participant
+count, submission count and average score, joined from
+`live_participants`. `has_ai_questions` is `mcqs IS NOT NULL`, so the
+question JSON is never read. Pages are cached per host for
+HOST_SESSIONS_CACHE_TTL seconds. Every write to a host's sessions drops
+that host's pages:
+- session creation;
+- the live-state flusher persisting joins, submissions and status changes.
+
+Like the live state itself, invalidation is per process.
+"""
+import os, time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, and_
+from sqlalchemy.future import select
+from ..models.models import LiveSession, LiveParticipant
+from .pagination import fetch_page
+
+HOST_SESSIONS_CACHE_TTL = float(os.getenv("HOST_SESSIONS_CACHE_TTL", "60"))
+HOST_SESSIONS_CACHE_MAX_HOSTS = int(os.getenv("HOST_SESSIONS_CACHE_MAX_HOSTS", "1000"))
+
+SUMMARY_COLUMNS = {
+    "id": LiveSession.id,
+    "exam_id": LiveSession.exam_id,
+    "topic": LiveSession.topic,
+    "unit": LiveSession.unit,
+    "status": LiveSession.status,
+    "duration_minutes": LiveSession.duration_minutes,
+    "created_at": LiveSession.created_at,
+    "started_at": LiveSession.started_at,
+    # AI sessions always store their question list; DB sessions leave it NULL
+    "has_ai_questions": LiveSession.mcqs.isnot(None),
+    "participants_count": func.count(LiveParticipant.id),
+    "submissions_count": func.count(LiveParticipant.submitted_at),
+    "average_score": func.avg(LiveParticipant.score),
+}
+DEFAULT_FIELDS = [
+    "id", "exam_id", "topic", "status", "duration_minutes", "created_at",
+    "participants_count", "submissions_count", "average_score", "has_ai_questions"
+]
+
+# host_id -> {(fields, limit, cursor): (expires_at, items, next_cursor)}
+_entries: "OrderedDict[int, Dict[tuple, Tuple[float, List[dict], Optional[str]]]]" = OrderedDict()
+stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _summary_query(host_id: int):
+    return (
+        select(LiveSession)
+        .outerjoin(LiveParticipant, LiveParticipant.session_id == LiveSession.id)
+        .filter(LiveSession.host_id == host_id)
+        .group_by(LiveSession.id)
+    )
+
+
+async def host_session_page(db, host_id: int, fields: List[str], limit: Optional[int],
+                            cursor: Optional[str]) -> Tuple[List[dict], Optional[str]]:
+    """One page of the host's sessions, newest first, served from cache when fresh."""
+    key = (tuple(fields), limit, cursor)
+    pages = _entries.get(host_id)
+    entry = pages.get(key) if pages else None
+    if entry is not None and time.time() < entry[0]:
+        _entries.move_to_end(host_id)
+        stats["hits"] += 1
+        return entry[1], entry[2]
+
+    stats["misses"] += 1
+    items, next_cursor = await fetch_page(
+        db, _summary_query(host_id), SUMMARY_COLUMNS, fields,
+        order=[(LiveSession.created_at, True), (LiveSession.id, True)],
+        limit=limit,
+        cursor=cursor
+    )
+    for item in items:
+        if "has_ai_questions" in item:
+            item["has_ai_questions"] = bool(item["has_ai_questions"])
+        if item.get("average_score") is not None:
+            item["average_score"] = round(float(item["average_score"]), 2)
+
+    _entries.setdefault(host_id, {})[key] = (time.time() + HOST_SESSIONS_CACHE_TTL, items, next_cursor)
+    _entries.move_to_end(host_id)
+    while len(_entries) > HOST_SESSIONS_CACHE_MAX_HOSTS:
+        _entries.popitem(last=False)
+    return items, next_cursor
+
+
+def invalidate_host(host_id: int):
+    if _entries.pop(host_id, None) is not None:
+        stats["invalidations"] += 1
+
+
+def clear():
+    _entries.clear()
@@ -0,0 +1,48 @@
+"""Incrementally maintained ranking for live sessions.
+
+Entries are kept in a SortedList keyed on (-score, time_taken_seconds,
+user_id), so a submission, a user's rank and a page of results each cost
+O(log n) instead of re-sorting every participant.
+"""
+from typing import Dict, List, Optional, Tuple
+from sortedcontainers import SortedList
+
+
+class Leaderboard:
+    def __init__(self):
+        self._entries = SortedList()
+        self._keys: Dict[int, Tuple[int, int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._keys
+
+    def update(self, user_id: int, score: int, time_taken_seconds: int):
+        """Insert or move a user; ties on score are broken by the faster time."""
+        self.remove(user_id)
+        key = (-(score or 0), time_taken_seconds or 0, user_id)
+        self._keys[user_id] = key
+        self._entries.add(key)
+
+    def remove(self, user_id: int):
+        key = self._keys.pop(user_id, None)
+        if key is not None:
+            self._entries.remove(key)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """1-based rank, or None if the user has not submitted."""
+        key = self._keys.get(user_id)
+        if key is None:
+            return None
+        return self._entries.index(key) + 1
+
+    def page(self, offset: int = 0, limit: Optional[int] = None) -> List[Tuple[int, int]]:
+        """(rank, user_id) pairs for a slice of the ranking."""
+        offset = max(offset, 0)
+        stop = len(self._entries) if limit is None else offset + max(limit, 0)
+        return [(offset + i + 1, key[2]) for i, key in enumerate(self._entries.islice(offset, stop))]
+
+    def top(self, n: int) -> List[Tuple[int, int]]:
+        return self.page(0, n)
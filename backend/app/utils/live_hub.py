@@ -0,0 +1,64 @@
+"""Pub/sub hub that pushes live session events to connected clients.
+
+The default hub keeps subscribers in process memory, which is enough for a
+single uvicorn worker. A multi-worker deployment can swap in another
+`LiveHub` implementation (e.g. Redis pub/sub) with `set_live_hub()`.
+"""
+import asyncio
+from typing import Dict, Set
+
+
+class LiveHub:
+    """Interface every hub backend implements."""
+
+    async def subscribe(self, session_id: int) -> asyncio.Queue:
+        raise NotImplementedError
+
+    async def unsubscribe(self, session_id: int, queue: asyncio.Queue) -> None:
+        raise NotImplementedError
+
+    async def publish(self, session_id: int, event: dict) -> None:
+        raise NotImplementedError
+
+
+class InMemoryLiveHub(LiveHub):
+    """Fans events out to per-subscriber queues inside this process."""
+
+    def __init__(self, queue_size: int = 32):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+
+    async def subscribe(self, session_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(session_id, set()).add(queue)
+        return queue
+
+    async def unsubscribe(self, session_id: int, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(session_id)
+        if not subscribers:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[session_id]
+
+    async def publish(self, session_id: int, event: dict) -> None:
+        for queue in list(self._subscribers.get(session_id, ())):
+            if queue.full():
+                # Slow client: drop its oldest event, every event carries full status anyway
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def subscriber_count(self, session_id: int) -> int:
+        return len(self._subscribers.get(session_id, ()))
+
+
+live_hub: LiveHub = InMemoryLiveHub()
+
+
+def get_live_hub() -> LiveHub:
+    return live_hub
+
+
+def set_live_hub(hub: LiveHub) -> None:
+    global live_hub
+    live_hub = hub
@@ -0,0 +1,312 @@
+"""Authoritative in-memory state for live exam sessions.
+
+Join, status and leaderboard requests are served from `live_state` without
+touching the database. Changes are written back to `live_sessions` and
+`live_participants` in batches by a background flusher, and a session that
+is not in memory (e.g. after a restart) is rehydrated from the database on
+first access. Clean sessions are dropped from memory LIVE_FINISHED_TTL
+seconds after they finish, or after LIVE_IDLE_TTL seconds without a
+request if a host abandoned them before that; the next access rehydrates
+them. Like the in-process live hub, this assumes every request for
+a given session reaches the same worker.
+"""
+import asyncio, os, time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+from sqlalchemy import update, insert, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.future import select
+from ..database import AsyncSessionLocal
+from ..models.models import LiveSession, LiveParticipant, User
+from .leaderboard import Leaderboard
+from .answer_key import AnswerKey, load_answer_key
+from . import user_names, host_sessions
+
+FLUSH_INTERVAL_SECONDS = float(os.getenv("LIVE_FLUSH_INTERVAL", "1.0"))
+FINISHED_TTL_SECONDS = int(os.getenv("LIVE_FINISHED_TTL", "600"))
+IDLE_TTL_SECONDS = int(os.getenv("LIVE_IDLE_TTL", "3600"))
+
+
+class ParticipantState:
+    __slots__ = ("user_id", "score", "time_taken_seconds", "submitted_at",
+                 "answers", "persisted", "dirty")
+
+    def __init__(self, user_id: int, persisted: bool = False):
+        self.user_id = user_id
+        self.score = None
+        self.time_taken_seconds = None
+        self.submitted_at = None
+        self.answers = None
+        self.persisted = persisted  # row exists in live_participants
+        self.dirty = not persisted
+
+    def row_values(self) -> dict:
+        return {
+            "score": self.score,
+            "time_taken_seconds": self.time_taken_seconds,
+            "submitted_at": self.submitted_at,
+            "answers": self.answers,
+        }
+
+
+class LiveSessionState:
+    def __init__(self, session: LiveSession):
+        self.id = session.id
+        self.host_id = session.host_id
+        self.exam_id = session.exam_id
+        self.topic = session.topic
+        self.unit = session.unit
+        self.status = session.status or "waiting"
+        self.duration_minutes = session.duration_minutes
+        self.created_at = session.created_at
+        self.started_at = session.started_at
+        self.has_ai_questions = bool(session.mcqs)
+        self.participants: Dict[int, ParticipantState] = {}
+        self.leaderboard = Leaderboard()
+        # Compiled at start, dropped at end; see LiveStateStore.answer_key()
+        self.answer_key: Optional[AnswerKey] = None
+        self._key_task: Optional[asyncio.Task] = None
+        self.dirty = False
+        self.finished_at = time.monotonic() if self.status == "finished" else None
+        self.last_active = time.monotonic()  # refreshed by every LiveStateStore lookup
+
+    def add_participant(self, user_id: int) -> bool:
+        """Returns False if the user had already joined."""
+        if user_id in self.participants:
+            return False
+        self.participants[user_id] = ParticipantState(user_id)
+        return True
+
+    def drop_participant(self, user_id: int):
+        self.participants.pop(user_id, None)
+        self.leaderboard.remove(user_id)
+
+    def set_status(self, status: str, started_at: Optional[datetime] = None):
+        self.status = status
+        if started_at is not None:
+            self.started_at = started_at
+        if status == "finished":
+            self.finished_at = time.monotonic()
+            self.answer_key = None
+            self._key_task = None
+        self.dirty = True
+
+    def record_submission(self, user_id: int, score: int, answers: list, time_taken_seconds: int):
+        participant = self.participants[user_id]
+        participant.score = score
+        participant.answers = answers
+        participant.time_taken_seconds = time_taken_seconds
+        participant.submitted_at = datetime.now(timezone.utc)
+        participant.dirty = True
+        self.leaderboard.update(user_id, score, time_taken_seconds)
+
+    def status_payload(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "unit": self.unit,
+            "topic": self.topic,
+            "duration_minutes": self.duration_minutes,
+            "started_at": self.started_at,
+            "participants_count": len(self.participants),
+            "has_ai_questions": self.has_ai_questions
+        }
+
+    def is_dirty(self) -> bool:
+        return self.dirty or any(p.dirty for p in self.participants.values())
+
+
+class LiveStateStore:
+    def __init__(self):
+        self._sessions: Dict[int, LiveSessionState] = {}
+        self._codes: Dict[str, int] = {}
+        self._load_lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+
+    def register(self, session: LiveSession) -> LiveSessionState:
+        """Track a session that was just inserted, so its first reads skip the DB."""
+        state = LiveSessionState(session)
+        self._sessions[state.id] = state
+        self._codes[state.exam_id] = state.id
+        return state
+
+    async def get(self, session_id: int) -> Optional[LiveSessionState]:
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = await self._rehydrate(LiveSession.id == session_id)
+        else:
+            state.last_active = time.monotonic()
+        return state
+
+    async def get_by_code(self, exam_id: str) -> Optional[LiveSessionState]:
+        session_id = self._codes.get(exam_id)
+        if session_id is not None:
+            return await self.get(session_id)
+        return await self._rehydrate(LiveSession.exam_id == exam_id)
+
+    async def _rehydrate(self, criterion) -> Optional[LiveSessionState]:
+        async with self._load_lock:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(LiveSession).filter(criterion))
+                session = result.scalars().first()
+                if not session:
+                    return None
+                # Another request may have loaded it while we waited on the lock
+                if session.id in self._sessions:
+                    return self._sessions[session.id]
+
+                state = LiveSessionState(session)
+                part_result = await db.execute(
+                    select(LiveParticipant, User.username, User.full_name)
+                    .outerjoin(User, LiveParticipant.user_id == User.id)
+                    .filter(LiveParticipant.session_id == session.id)
+                )
+                for row, username, full_name in part_result.all():
+                    if username is not None:
+                        user_names.remember(row.user_id, username, full_name)
+                    participant = ParticipantState(row.user_id, persisted=True)
+                    participant.score = row.score
+                    participant.time_taken_seconds = row.time_taken_seconds
+                    participant.submitted_at = row.submitted_at
+                    participant.answers = row.answers
+                    state.participants[row.user_id] = participant
+                    if row.submitted_at:
+                        state.leaderboard.update(row.user_id, row.score, row.time_taken_seconds)
+
+            self._sessions[state.id] = state
+            self._codes[state.exam_id] = state.id
+            return state
+
+    async def answer_key(self, state: LiveSessionState) -> AnswerKey:
+        """The session's compiled key; concurrent first callers share one build."""
+        if state.answer_key is not None:
+            return state.answer_key
+        if state._key_task is None:
+            state._key_task = asyncio.ensure_future(load_answer_key(state.id))
+        task = state._key_task
+        try:
+            key = await task
+        except Exception:
+            if state._key_task is task:
+                state._key_task = None
+            raise
+        if state._key_task is task and state.status != "finished":
+            state.answer_key = key
+        return key
+
+    # ── Write-behind ──────────────────────────────────────────────────────
+
+    async def flush(self):
+        for state in list(self._sessions.values()):
+            if state.is_dirty():
+                await self._flush_state(state)
+        self._evict_idle()
+
+    async def flush_session(self, session_id: int):
+        """Persist a tracked session now, for readers that go to the DB instead of the state."""
+        state = self._sessions.get(session_id)
+        if state is not None and state.is_dirty():
+            await self._flush_state(state)
+
+    async def _flush_state(self, state: LiveSessionState):
+        session_dirty = state.dirty
+        pending = [p for p in state.participants.values() if p.dirty]
+        # Clear flags before awaiting so changes made during the flush are picked up next round
+        state.dirty = False
+        for p in pending:
+            p.dirty = False
+
+        new_rows = [p for p in pending if not p.persisted]
+        changed_rows = [p for p in pending if p.persisted]
+        try:
+            try:
+                rejected = await self._write_rows(state, session_dirty, new_rows, changed_rows, one_by_one=False)
+            except IntegrityError:
+                # One bad row (e.g. a user deleted after joining) fails the whole batch.
+                # Write rows one at a time so the valid ones land and the bad ones are dropped.
+                rejected = await self._write_rows(state, session_dirty, new_rows, changed_rows, one_by_one=True)
+        except Exception as e:
+            print(f"[Live State] Flush failed for session {state.id}: {e}")
+            state.dirty = state.dirty or session_dirty
+            for p in pending:
+                p.dirty = True
+            return
+
+        for p in new_rows:
+            if p.user_id in rejected:
+                state.drop_participant(p.user_id)
+            else:
+                p.persisted = True
+        # Joins, submissions and status changes reach the host's session list only now
+        host_sessions.invalidate_host(state.host_id)
+
+    async def _write_rows(self, state: LiveSessionState, session_dirty: bool, new_rows, changed_rows, one_by_one: bool) -> Set[int]:
+        """Write one flush in a transaction; returns the user ids whose new rows were rejected."""
+        rejected: Set[int] = set()
+        async with AsyncSessionLocal() as db:
+            if session_dirty:
+                await db.execute(
+                    update(LiveSession)
+                    .where(LiveSession.id == state.id)
+                    .values(status=state.status, started_at=state.started_at)
+                )
+            if one_by_one:
+                for p in new_rows:
+                    try:
+                        async with db.begin_nested():
+                            await db.execute(
+                                insert(LiveParticipant)
+                                .values(session_id=state.id, user_id=p.user_id, **p.row_values())
+                            )
+                    except IntegrityError as e:
+                        print(f"[Live State] Dropping participant {p.user_id} of session {state.id}: {e.orig}")
+                        rejected.add(p.user_id)
+            elif new_rows:
+                await db.execute(
+                    insert(LiveParticipant),
+                    [{"session_id": state.id, "user_id": p.user_id, **p.row_values()} for p in new_rows]
+                )
+            for p in changed_rows:
+                await db.execute(
+                    update(LiveParticipant)
+                    .where(and_(LiveParticipant.session_id == state.id, LiveParticipant.user_id == p.user_id))
+                    .values(**p.row_values())
+                )
+            await db.commit()
+        return rejected
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        for session_id, state in list(self._sessions.items()):
+            if state.is_dirty():
+                continue
+            if state.finished_at is not None:
+                expired = now - state.finished_at > FINISHED_TTL_SECONDS
+            else:
+                # Left in "waiting" or "active" by its host; everything is in the DB already
+                expired = now - state.last_active > IDLE_TTL_SECONDS
+            if expired:
+                del self._sessions[session_id]
+                self._codes.pop(state.exam_id, None)
+
+    async def _run_flusher(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+            await self.flush()
+
+    def start(self):
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run_flusher())
+
+    async def stop(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+
+live_state = LiveStateStore()
@@ -0,0 +1,164 @@
+"""Process-wide, versioned cache of the MCQ question bank.
+
+The `mcqs` table only changes when a seeder runs, so the whole bank is
+loaded once at startup and indexed by id and by unit -> topic. Seeders call
+`bump_bank_version()` when they finish; every worker compares that version
+at most once per `MCQ_BANK_CHECK_SECONDS` and reloads when it has moved.
+"""
+import asyncio, os, time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from sqlalchemy import update, insert
+from sqlalchemy.future import select
+from ..database import AsyncSessionLocal
+from ..models.models import MCQ, MCQBankVersion
+
+VERSION_CHECK_SECONDS = float(os.getenv("MCQ_BANK_CHECK_SECONDS", "30"))
+
+
+class MCQRecord(NamedTuple):
+    id: int
+    unit: Optional[str]
+    topic: str
+    question: str
+    options: list
+    correct_option_id: str
+    explanation: str
+
+
+def _record(m: MCQ) -> MCQRecord:
+    return MCQRecord(m.id, m.unit, m.topic, m.question, m.options, m.correct_option_id, m.explanation)
+
+
+class MCQBank:
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.by_id: Dict[int, MCQRecord] = {}
+        # Id arrays, all in id order and shared read-only with callers
+        self.by_unit: Dict[Optional[str], Dict[str, List[int]]] = {}  # unit -> topic -> ids
+        self.by_topic: Dict[str, List[int]] = {}  # topic -> ids across units
+        self.unit_ids: Dict[Optional[str], List[int]] = {}
+        self.all_ids: List[int] = []
+        self.stats = {"hits": 0, "misses": 0, "reloads": 0}
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    # ── Loading ───────────────────────────────────────────────────────────
+
+    async def load(self):
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                version = await _read_version(db)
+                result = await db.execute(select(MCQ).order_by(MCQ.id))
+                records = [_record(m) for m in result.scalars().all()]
+            self._index(records)
+            self.version = version
+            self._checked_at = time.monotonic()
+            self.stats["reloads"] += 1
+
+    def _index(self, records: Iterable[MCQRecord]):
+        by_id = {}
+        by_unit: Dict[Optional[str], Dict[str, List[int]]] = {}
+        by_topic: Dict[str, List[int]] = {}
+        unit_ids: Dict[Optional[str], List[int]] = {}
+        for r in records:
+            by_id[r.id] = r
+            by_unit.setdefault(r.unit, {}).setdefault(r.topic, []).append(r.id)
+            by_topic.setdefault(r.topic, []).append(r.id)
+            unit_ids.setdefault(r.unit, []).append(r.id)
+        self.by_id = by_id
+        self.by_unit = by_unit
+        self.by_topic = by_topic
+        self.unit_ids = unit_ids
+        self.all_ids = list(by_id)
+
+    def invalidate(self):
+        """Force a version check (and reload if needed) on the next access."""
+        self._checked_at = 0.0
+
+    async def ensure_fresh(self) -> "MCQBank":
+        if self.version is not None and time.monotonic() - self._checked_at < VERSION_CHECK_SECONDS:
+            return self
+        if self.version is None:
+            await self.load()
+            return self
+        async with AsyncSessionLocal() as db:
+            version = await _read_version(db)
+        if version != self.version:
+            await self.load()
+        else:
+            self._checked_at = time.monotonic()
+        return self
+
+    # ── Lookups ───────────────────────────────────────────────────────────
+
+    # Both lookups apply the unit/topic filters the routes have always used
+    # ('Full Unit' means every topic) and return the cached arrays without copying.
+
+    def topic_ids(self, unit: Optional[str] = None, topic: Optional[str] = None) -> Dict[str, List[int]]:
+        topics = self.by_unit.get(unit, {}) if unit else self.by_topic
+        if topic and topic != 'Full Unit':
+            return {topic: topics[topic]} if topic in topics else {}
+        return topics
+
+    def ids_for(self, unit: Optional[str] = None, topic: Optional[str] = None) -> List[int]:
+        if topic and topic != 'Full Unit':
+            return self.topic_ids(unit, topic).get(topic, [])
+        if unit:
+            return self.unit_ids.get(unit, [])
+        return self.all_ids
+
+    def records_for(self, unit: Optional[str] = None, topic: Optional[str] = None) -> List[MCQRecord]:
+        return [self.by_id[i] for i in self.ids_for(unit, topic)]
+
+    async def get_many(self, ids: Iterable[int]) -> Dict[int, MCQRecord]:
+        """id -> record; ids missing from the cache are fetched in one query."""
+        found = {}
+        missing = []
+        for mcq_id in set(ids):
+            record = self.by_id.get(mcq_id)
+            if record is None:
+                missing.append(mcq_id)
+            else:
+                found[mcq_id] = record
+        self.stats["hits"] += len(found)
+        if missing:
+            self.stats["misses"] += len(missing)
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(MCQ).filter(MCQ.id.in_(missing)))
+                for m in result.scalars().all():
+                    record = _record(m)
+                    self.by_id[m.id] = record
+                    found[m.id] = record
+        return found
+
+    def describe(self) -> dict:
+        return {
+            "version": self.version,
+            "size": len(self.by_id),
+            "units": {str(u): {t: len(ids) for t, ids in topics.items()} for u, topics in self.by_unit.items()},
+            **self.stats
+        }
+
+
+async def _read_version(db) -> int:
+    result = await db.execute(select(MCQBankVersion.version).filter(MCQBankVersion.id == 1))
+    return result.scalar() or 0
+
+
+async def bump_bank_version(db, commit: bool = True):
+    """Called by seeders after they change the mcqs table; pass commit=False to
+    make the bump part of the caller's transaction."""
+    result = await db.execute(
+        update(MCQBankVersion).where(MCQBankVersion.id == 1).values(version=MCQBankVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        await db.execute(insert(MCQBankVersion).values(id=1, version=1))
+    if commit:
+        await db.commit()
+
+
+mcq_bank = MCQBank()
+
+
+async def get_mcq_bank() -> MCQBank:
+    return await mcq_bank.ensure_fresh()
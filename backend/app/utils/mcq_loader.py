@@ -0,0 +1,209 @@
+"""Bulk loader for exam MCQ files.
+
+Unit files look like {"unit1": [{topic, question, options, correct_option_id,
+explanation}, ...]}. They are parsed incrementally, one question at a time,
+so a file is never held in memory as a whole. Records are validated in
+batches and upserted with one executemany statement per batch, keyed on a
+content hash of unit + question text. Re-running an import therefore
+updates questions in place and keeps their ids (and the quiz attempts that
+point at them) instead of deleting the whole bank first.
+"""
+import hashlib, json, re, time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import delete, inspect, text
+from sqlalchemy.future import select
+from ..database import engine, Base
+from ..models.models import MCQ
+from ..schemas.mcq import MCQ as MCQSchema
+from .mcq_bank import bump_bank_version, mcq_bank
+
+BATCH_SIZE = 1000
+READ_CHUNK = 1 << 16
+UPSERT_COLUMNS = ("unit", "topic", "question", "options", "correct_option_id", "explanation")
+
+
+def content_hash(unit: Optional[str], question: str) -> str:
+    normalized = re.sub(r"\s+", " ", question.strip().lower())
+    return hashlib.sha256(f"{unit or ''}\x1f{normalized}".encode("utf-8")).hexdigest()
+
+
+async def ensure_content_hash_column(conn):
+    """Add mcqs.content_hash to databases created before it existed (create_all skips it)."""
+    columns = await conn.run_sync(lambda c: [col["name"] for col in inspect(c).get_columns("mcqs")])
+    if "content_hash" not in columns:
+        await conn.execute(text("ALTER TABLE mcqs ADD COLUMN content_hash VARCHAR"))
+        await conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_mcqs_content_hash ON mcqs (content_hash)"))
+
+
+# ── Streaming JSON ────────────────────────────────────────────────────────
+
+class _Reader:
+    """Pulls JSON values and punctuation off a file without loading all of it."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self.f.read(READ_CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str):
+        if self.peek() != ch:
+            raise ValueError(f"Expected '{ch}' at offset {self.pos}, found {self.peek()!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            self.pos = end
+            return obj
+
+
+def iter_unit_records(path: str) -> Iterator[Tuple[str, dict]]:
+    """(unit_key, question dict) for every question in a unit file, in file order."""
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _Reader(f)
+        reader.expect("{")
+        while reader.peek() != "}":
+            unit_key = reader.value()
+            reader.expect(":")
+            reader.expect("[")
+            while reader.peek() != "]":
+                yield unit_key, reader.value()
+                if reader.peek() == ",":
+                    reader.expect(",")
+            reader.expect("]")
+            if reader.peek() == ",":
+                reader.expect(",")
+        reader.expect("}")
+
+
+# ── Validation ────────────────────────────────────────────────────────────
+
+def validate_batch(batch: List[Tuple[str, dict]]) -> Tuple[List[Dict], List[str]]:
+    """Rows ready for insert, plus a message per rejected record."""
+    rows, errors = [], []
+    for unit, raw in batch:
+        try:
+            mcq = MCQSchema(**{k: raw[k] for k in ("topic", "question", "options", "correct_option_id", "explanation")})
+        except (KeyError, TypeError, ValidationError) as e:
+            errors.append(f"{unit}: {str(raw.get('question', raw) if isinstance(raw, dict) else raw)[:60]} -> {str(e)[:120]}")
+            continue
+        if mcq.correct_option_id not in [o.id for o in mcq.options]:
+            errors.append(f"{unit}: {mcq.question[:60]} -> correct option is not one of the options")
+            continue
+        rows.append({
+            "unit": unit,
+            "topic": mcq.topic,
+            "question": mcq.question,
+            "options": [{"id": o.id, "text": o.text} for o in mcq.options],
+            "correct_option_id": mcq.correct_option_id,
+            "explanation": mcq.explanation,
+            "content_hash": content_hash(unit, mcq.question)
+        })
+    return rows, errors
+
+
+# ── Loading ───────────────────────────────────────────────────────────────
+
+def _upsert_statement(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise RuntimeError(f"Upsert is not supported for the {dialect} dialect")
+    stmt = dialect_insert(MCQ)
+    return stmt.on_conflict_do_update(
+        index_elements=[MCQ.content_hash],
+        set_={c: stmt.excluded[c] for c in UPSERT_COLUMNS}
+    )
+
+
+def _batches(records: Iterable[Tuple[str, dict]], size: int) -> Iterator[List[Tuple[str, dict]]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def load_files(paths: List[str], batch_size: int = BATCH_SIZE, prune: bool = False) -> dict:
+    """Upsert every question in `paths` in one transaction and bump the bank version.
+
+    With `prune`, questions of the loaded units that are no longer in the
+    files are deleted, which makes the import a full replacement of those units.
+    """
+    report = {"files": 0, "upserted": 0, "duplicates": 0, "invalid": 0, "pruned": 0, "errors": []}
+    started = time.monotonic()
+    seen = set()
+    units = set()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await ensure_content_hash_column(conn)
+        upsert = _upsert_statement(conn.dialect.name)
+
+        for path in paths:
+            report["files"] += 1
+            for batch in _batches(iter_unit_records(path), batch_size):
+                rows, errors = validate_batch(batch)
+                report["invalid"] += len(errors)
+                report["errors"].extend(errors[:20 - len(report["errors"])])
+                # ON CONFLICT cannot touch the same row twice in one statement
+                unique = {}
+                for row in rows:
+                    if row["content_hash"] in seen or row["content_hash"] in unique:
+                        report["duplicates"] += 1
+                        continue
+                    unique[row["content_hash"]] = row
+                    units.add(row["unit"])
+                if unique:
+                    await conn.execute(upsert, list(unique.values()))
+                    seen.update(unique)
+                    report["upserted"] += len(unique)
+
+        if prune and units:
+            result = await conn.execute(
+                select(MCQ.id, MCQ.content_hash).filter(MCQ.unit.in_(units))
+            )
+            stale = [mcq_id for mcq_id, h in result.all() if h not in seen]
+            for i in range(0, len(stale), batch_size):
+                await conn.execute(delete(MCQ).where(MCQ.id.in_(stale[i:i + batch_size])))
+            report["pruned"] = len(stale)
+
+        await bump_bank_version(conn, commit=False)
+
+    mcq_bank.invalidate()
+    elapsed = time.monotonic() - started
+    report["seconds"] = round(elapsed, 3)
+    report["rows_per_sec"] = round(report["upserted"] / elapsed) if elapsed > 0 else None
+    return report
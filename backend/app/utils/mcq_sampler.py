@@ -0,0 +1,108 @@
+"""Random question sampling over the cached MCQ bank id arrays.
+
+Replaces `ORDER BY random()`: each draw is a partial Fisher-Yates shuffle
+that only records the swaps it makes, so picking `k` questions costs O(k)
+no matter how large the bank is. 'Full Unit' quizzes are stratified so
+every topic gets its proportional share, and questions a user saw
+recently can be held back.
+"""
+import random
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Set
+
+RECENT_PER_USER = 200
+RECENT_MAX_USERS = 10000
+
+
+def sample_ids(ids: List[int], k: int, exclude: Optional[Set[int]] = None) -> List[int]:
+    """Up to `k` distinct ids from `ids`, skipping any in `exclude`."""
+    n = len(ids)
+    swaps: Dict[int, int] = {}
+    picked = []
+    i = 0
+    while len(picked) < k and i < n:
+        j = random.randrange(i, n)
+        slot = swaps.get(j, j)
+        swaps[j] = swaps.get(i, i)
+        i += 1
+        mcq_id = ids[slot]
+        if exclude and mcq_id in exclude:
+            continue
+        picked.append(mcq_id)
+    return picked
+
+
+def _allocate(sizes: Dict[str, int], k: int) -> Dict[str, int]:
+    """Split `k` across topics in proportion to their size (largest remainder)."""
+    total = sum(sizes.values())
+    if total <= k:
+        return dict(sizes)
+    quotas = {t: k * n / total for t, n in sizes.items()}
+    shares = {t: int(q) for t, q in quotas.items()}
+    leftover = k - sum(shares.values())
+    for t in sorted(quotas, key=lambda t: quotas[t] - shares[t], reverse=True)[:leftover]:
+        shares[t] += 1
+    return shares
+
+
+def sample_stratified(topic_ids: Dict[str, List[int]], k: int, exclude: Optional[Set[int]] = None) -> List[int]:
+    shares = _allocate({t: len(ids) for t, ids in topic_ids.items()}, k)
+    picked = []
+    for topic, share in shares.items():
+        picked.extend(sample_ids(topic_ids[topic], share, exclude))
+    # Topics short on unseen questions leave a gap; top it up from the rest
+    if len(picked) < k:
+        taken = set(picked) | (exclude or set())
+        for ids in topic_ids.values():
+            picked.extend(sample_ids(ids, k - len(picked), taken))
+            taken.update(picked)
+            if len(picked) >= k:
+                break
+    random.shuffle(picked)
+    return picked
+
+
+class RecentlySeen:
+    """Bounded per-user memory of the last questions served."""
+
+    def __init__(self, per_user: int = RECENT_PER_USER, max_users: int = RECENT_MAX_USERS):
+        self.per_user = per_user
+        self.max_users = max_users
+        self._users: "OrderedDict[int, deque]" = OrderedDict()
+
+    def get(self, user_id: int) -> Set[int]:
+        seen = self._users.get(user_id)
+        return set(seen) if seen else set()
+
+    def add(self, user_id: int, ids: Iterable[int]):
+        seen = self._users.get(user_id)
+        if seen is None:
+            seen = self._users[user_id] = deque(maxlen=self.per_user)
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        seen.extend(ids)
+
+
+recently_seen = RecentlySeen()
+
+
+def draw_quiz(ids: List[int], limit: int, topic_ids: Optional[Dict[str, List[int]]] = None,
+              user_id: Optional[int] = None) -> List[int]:
+    """Pick `limit` ids from `ids`, stratified over `topic_ids` when given,
+    avoiding the user's recent questions where the pool allows."""
+    limit = max(limit, 0)
+    exclude = recently_seen.get(user_id) if user_id is not None else None
+
+    if topic_ids and len(topic_ids) > 1:
+        picked = sample_stratified(topic_ids, limit, exclude)
+    else:
+        picked = sample_ids(ids, limit, exclude)
+    # Not enough unseen questions: allow repeats rather than serve a short quiz
+    if exclude and len(picked) < limit:
+        picked.extend(sample_ids(ids, limit - len(picked), set(picked)))
+
+    if user_id is not None:
+        recently_seen.add(user_id, picked)
+    return picked
@@ -1,11 +1,15 @@
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
 from io import BytesIO
+from typing import Iterable, Iterator
+from .pdf_stream import PDFStreamWriter
 
-def generate_quiz_pdf(attempt_data, questions_data, user_name="Student"):
-    buffer = BytesIO()
-    p = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
+# Each iter_* yields the PDF in chunks, one page at a time, so callers can
+# send or store bytes while later pages are still being laid out.
+
+def iter_quiz_pdf(attempt_data, questions_data, user_name="Student") -> Iterator[bytes]:
+    writer = PDFStreamWriter()
+    width, height = writer.width, writer.height
+    yield writer.begin()
+    p = writer.new_page()
     
     # Title
     p.setFont("Helvetica-Bold", 16)
@@ -20,16 +24,18 @@ def generate_quiz_pdf(attempt_data, questions_data, user_name="Student"):
     p.drawString(50, height - 160, f"Mode: {attempt_data.mode.capitalize()}")
     
     y = height - 200
+    questions_by_id = {q.id: q for q in questions_data}
     
     # Questions
     for detail in attempt_data.details:
         q_id = int(detail['question_id'])
-        mcq = next((q for q in questions_data if q.id == q_id), None)
+        mcq = questions_by_id.get(q_id)
         if not mcq:
             continue
             
         if y < 100:
-            p.showPage()
+            yield writer.end_page(p)
+            p = writer.new_page()
             y = height - 50
             
         p.setFont("Helvetica-Bold", 12)
@@ -61,14 +67,14 @@ def generate_quiz_pdf(attempt_data, questions_data, user_name="Student"):
         
         y -= 30
         
-    p.save()
-    buffer.seek(0)
-    return buffer
+    yield writer.end_page(p)
+    yield writer.finish()
 
-def generate_host_session_pdf(session_data, leaderboard_data):
-    buffer = BytesIO()
-    p = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
+def iter_host_session_pdf(session_data, leaderboard_data: Iterable[dict]) -> Iterator[bytes]:
+    writer = PDFStreamWriter()
+    width, height = writer.width, writer.height
+    yield writer.begin()
+    p = writer.new_page()
     
     # Title
     p.setFont("Helvetica-Bold", 16)
@@ -94,7 +100,9 @@ def generate_host_session_pdf(session_data, leaderboard_data):
     p.setFont("Helvetica", 10)
     for row in leaderboard_data:
         if y < 50:
-            p.showPage()
+            yield writer.end_page(p)
+            p = writer.new_page()
+            p.setFont("Helvetica", 10)
             y = height - 50
             
         p.drawString(50, y, str(row['rank']))
@@ -103,6 +111,11 @@ def generate_host_session_pdf(session_data, leaderboard_data):
         p.drawString(400, y, f"{row['time_taken_seconds']}s")
         y -= 15
         
-    p.save()
-    buffer.seek(0)
-    return buffer
+    yield writer.end_page(p)
+    yield writer.finish()
+
+def generate_quiz_pdf(attempt_data, questions_data, user_name="Student"):
+    return BytesIO(b"".join(iter_quiz_pdf(attempt_data, questions_data, user_name)))
+
+def generate_host_session_pdf(session_data, leaderboard_data):
+    return BytesIO(b"".join(iter_host_session_pdf(session_data, leaderboard_data)))
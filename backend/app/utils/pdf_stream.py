@@ -0,0 +1,111 @@
+"""Incremental PDF writer for text reports.
+
+Reportlab's canvas keeps every page in memory until `save()`. This
+writer emits each page's objects as soon as the page is finished:
+    writer = PDFStreamWriter()
+    yield writer.begin()
+    page = writer.new_page(); page.draw_string(...); yield writer.end_page(page)
+    yield writer.finish()
+Only the byte offsets of the objects written so far are kept for the
+xref table, so memory stays flat in the number of pages.
+
+Text uses the standard Helvetica faces with WinAnsi encoding, so no font
+is embedded. The drawing calls mirror reportlab's canvas
+(setFont/drawString/setFillColorRGB), so layouts port over line by line.
+"""
+import zlib
+from typing import List
+
+LETTER = (612.0, 792.0)
+FONTS = {"Helvetica": "F1", "Helvetica-Bold": "F2", "Helvetica-Oblique": "F3"}
+
+# Reserved object numbers; pages and their content streams follow
+_CATALOG, _PAGES = 1, 2
+_FIRST_FONT = 3
+
+
+def _pdf_string(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)").replace(b"\r", b"").replace(b"\n", b" ") + b")"
+
+
+def _num(value: float) -> bytes:
+    return (b"%.2f" % value).rstrip(b"0").rstrip(b".") or b"0"
+
+
+class PageCanvas:
+    def __init__(self):
+        self._ops: List[bytes] = []
+        self._font = b"/F1 12 Tf"
+
+    def setFont(self, name: str, size: float):
+        self._font = b"/%s %s Tf" % (FONTS[name].encode("ascii"), _num(size))
+
+    def setFillColorRGB(self, r: float, g: float, b: float):
+        self._ops.append(b"%s %s %s rg" % (_num(r), _num(g), _num(b)))
+
+    def drawString(self, x: float, y: float, text: str):
+        self._ops.append(b"BT %s %s %s Td %s Tj ET" % (self._font, _num(x), _num(y), _pdf_string(str(text))))
+
+    def content(self) -> bytes:
+        return b"\n".join(self._ops)
+
+
+class PDFStreamWriter:
+    def __init__(self, pagesize=LETTER, compress: bool = True):
+        self.width, self.height = pagesize
+        self.compress = compress
+        self._offset = 0
+        self._offsets = {}  # object number -> byte offset
+        self._next_obj = _FIRST_FONT + len(FONTS)
+        self._pages: List[int] = []
+
+    def _object(self, number: int, body: bytes) -> bytes:
+        self._offsets[number] = self._offset
+        data = b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        self._offset += len(data)
+        return data
+
+    def _emit(self, data: bytes) -> bytes:
+        self._offset += len(data)
+        return data
+
+    def begin(self) -> bytes:
+        out = [self._emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")]
+        for i, name in enumerate(FONTS):
+            out.append(self._object(
+                _FIRST_FONT + i,
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % name.encode("ascii")
+            ))
+        return b"".join(out)
+
+    def new_page(self) -> PageCanvas:
+        return PageCanvas()
+
+    def end_page(self, page: PageCanvas) -> bytes:
+        content = page.content()
+        if self.compress:
+            content = zlib.compress(content)
+            stream = b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(content), content)
+        else:
+            stream = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+        content_obj, page_obj = self._next_obj, self._next_obj + 1
+        self._next_obj += 2
+        self._pages.append(page_obj)
+        fonts = b" ".join(b"/%s %d 0 R" % (ref.encode("ascii"), _FIRST_FONT + i) for i, ref in enumerate(FONTS.values()))
+        return self._object(content_obj, stream) + self._object(page_obj, (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] /Contents %d 0 R /Resources << /Font << %s >> >> >>"
+            % (_PAGES, _num(self.width), _num(self.height), content_obj, fonts)
+        ))
+
+    def finish(self) -> bytes:
+        kids = b" ".join(b"%d 0 R" % n for n in self._pages)
+        out = self._object(_PAGES, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._pages)))
+        out += self._object(_CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % _PAGES)
+        xref_at = self._offset
+        size = self._next_obj
+        lines = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        for n in range(1, size):
+            lines.append(b"%010d 00000 n \n" % self._offsets[n])
+        lines.append(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, _CATALOG, xref_at))
+        return out + b"".join(lines)
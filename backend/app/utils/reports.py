@@ -0,0 +1,299 @@
+"""PDF report pipeline: off-loop rendering plus an on-disk cache.
+
+Routes gather a report's inputs as plain values (no ORM objects) on the
+event loop. Pages are laid out on a small thread pool and written to a
+temp file as each one is finished, so a large report no longer blocks
+every other request. `report_response()` sends the file to the client
+while it grows. The render never waits on a reader, and no one holds
+the whole document in memory.
+
+Finished PDFs are stored in REPORT_CACHE_DIR as `<kind>-<id>-<version>.pdf`.
+The version is a digest of the inputs, so any change to an attempt,
+question text or leaderboard produces a new file. Older versions of the
+same report are deleted when a new one is stored. Once the directory
+exceeds REPORT_CACHE_MAX_BYTES, the least recently served files go
+first. A request for a report that is already being rendered follows
+that render instead of starting its own.
+"""
+import asyncio, hashlib, itertools, json, os, shutil, tempfile, threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional, Set
+from fastapi.responses import StreamingResponse
+from .pdf_exporter import iter_quiz_pdf, iter_host_session_pdf
+
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "managemind-reports"))
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", "2"))
+TAIL_CHUNK_BYTES = 64 * 1024
+
+_render_pool = ThreadPoolExecutor(max_workers=max(REPORT_RENDER_WORKERS, 1), thread_name_prefix="report-render")
+_pending: Dict[str, "_Render"] = {}
+_tmp_ids = itertools.count()
+_background: Set[asyncio.Task] = set()
+stats = {"hits": 0, "renders": 0, "evictions": 0, "prerendered": 0}
+
+
+def content_version(inputs: dict) -> str:
+    raw = json.dumps(inputs, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+# ── Renderers (run on the pool) ───────────────────────────────────────────
+
+def quiz_pages(inputs: dict) -> Iterator[bytes]:
+    attempt = SimpleNamespace(**inputs["attempt"])
+    questions = [SimpleNamespace(**q) for q in inputs["questions"]]
+    return iter_quiz_pdf(attempt, questions, user_name=inputs["user_name"])
+
+
+def session_pages(inputs: dict) -> Iterator[bytes]:
+    return iter_host_session_pdf(SimpleNamespace(**inputs["session"]), inputs["leaderboard"])
+
+
+# ── Disk cache ────────────────────────────────────────────────────────────
+
+def _path(kind: str, key: int, version: str) -> str:
+    return os.path.join(REPORT_CACHE_DIR, f"{kind}-{key}-{version}.pdf")
+
+
+def _open_tmp(path: str):
+    os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{next(_tmp_ids)}.tmp"
+    return tmp, open(tmp, "wb")
+
+
+def _store(kind: str, key: int, path: str, tmp: str):
+    """Move a finished temp file into place and drop older versions of the report."""
+    try:
+        os.replace(tmp, path)
+    except PermissionError:
+        # Windows: another worker stored this version and is serving it; same inputs, same file
+        _remove(tmp)
+    prefix = f"{kind}-{key}-"
+    for name in os.listdir(REPORT_CACHE_DIR):
+        if name.startswith(prefix) and name.endswith(".pdf") and os.path.join(REPORT_CACHE_DIR, name) != path:
+            _remove(os.path.join(REPORT_CACHE_DIR, name))
+    _evict(keep=path)
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        # Windows will not delete a file that is open for a download; a later eviction retries it
+        return False
+    return True
+
+
+def _evict(keep: str):
+    files = []
+    for entry in os.scandir(REPORT_CACHE_DIR):
+        if entry.name.endswith(".pdf") and entry.path != keep:
+            st = entry.stat()
+            files.append((st.st_mtime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in files) + os.path.getsize(keep)
+    for _, size, path in sorted(files):
+        if total <= REPORT_CACHE_MAX_BYTES:
+            break
+        if _remove(path):
+            total -= size
+            stats["evictions"] += 1
+
+
+def _open_cached(path: str):
+    """An open handle on the cached file, or None. Holding it keeps eviction from pulling the file mid-response."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    os.utime(path)  # served recently, so evicted last
+    stats["hits"] += 1
+    return f
+
+
+def _cached(path: str) -> bool:
+    f = _open_cached(path)
+    if f is None:
+        return False
+    f.close()
+    return True
+
+
+class _Render:
+    """One report being written to disk on the pool, readable while it grows.
+
+    The render runs at the pool's pace whatever its readers do; each reader
+    tails the file on its own, so a slow or departed client holds up no one.
+    Readers are counted because Windows cannot rename or delete a file that
+    is open: the temp file is only moved into place when nobody is reading
+    it, otherwise a copy is stored and the last reader removes the original.
+    """
+
+    def __init__(self, path: str, tmp: str):
+        self.path = path
+        self.tmp = tmp
+        self.finished = False  # True once the report is stored at `path`
+        self.failed = False
+        self.readers = 0
+        self.lock = threading.Lock()  # guards the fields above against the pool thread
+        self.progress = asyncio.Event()
+        self.future: Optional[asyncio.Future] = None
+
+    def notify(self):
+        # Runs on the loop: wake everyone waiting and hand out a fresh event for the next chunk
+        event, self.progress = self.progress, asyncio.Event()
+        event.set()
+
+    def open_reader(self):
+        with self.lock:
+            f = open(self.path if self.finished else self.tmp, "rb")
+            self.readers += 1
+            return f
+
+    def close_reader(self, f):
+        with self.lock:
+            if f.closed:
+                return
+            f.close()
+            self.readers -= 1
+            if not self.readers and (self.finished or self.failed):
+                _remove(self.tmp)
+
+
+def _start_render(kind: str, key: int, path: str, inputs: dict,
+                  pages: Callable[[dict], Iterator[bytes]]) -> _Render:
+    loop = asyncio.get_running_loop()
+    tmp, f = _open_tmp(path)
+    render = _Render(path, tmp)
+
+    def store():
+        with render.lock:
+            if not render.readers:
+                _store(kind, key, path, tmp)
+                render.finished = True
+                return
+        # Readers hold the temp file open: store a copy and leave the original to the last of them
+        staged = f"{tmp}.copy"
+        try:
+            shutil.copyfile(tmp, staged)
+            _store(kind, key, path, staged)
+        except BaseException:
+            _remove(staged)
+            raise
+        with render.lock:
+            render.finished = True
+            if not render.readers:
+                _remove(tmp)
+
+    def build():
+        try:
+            with f:
+                for chunk in pages(inputs):
+                    f.write(chunk)
+                    f.flush()
+                    loop.call_soon_threadsafe(render.notify)
+            store()
+        except BaseException:
+            with render.lock:
+                render.failed = True
+                if not render.readers:
+                    _remove(tmp)
+            raise
+
+    def done(_):
+        _pending.pop(path, None)
+        render.notify()  # the final wake-up, once readers can see the future is done
+
+    render.future = loop.run_in_executor(_render_pool, build)
+    _pending[path] = render
+    render.future.add_done_callback(done)
+    stats["renders"] += 1
+    return render
+
+
+async def cached_report(kind: str, key: int, inputs: dict, pages: Callable[[dict], Iterator[bytes]]) -> str:
+    """Path of the rendered PDF for these inputs, rendering it to disk on the pool if needed."""
+    path = _path(kind, key, content_version(inputs))
+    if _cached(path):
+        return path
+    render = _pending.get(path) or _start_render(kind, key, path, inputs, pages)
+    await asyncio.shield(render.future)
+    return path
+
+
+class _ReportStreamingResponse(StreamingResponse):
+    """Runs `close` even when the client disconnects, or leaves before the body iterator has started."""
+
+    def __init__(self, content, close: Callable[[], None], **kwargs):
+        super().__init__(content, **kwargs)
+        self.close = close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
+            self.close()
+
+
+async def _read(f) -> AsyncIterator[bytes]:
+    while True:
+        data = f.read(TAIL_CHUNK_BYTES)
+        if not data:
+            return
+        yield data
+
+
+async def _tail(render: _Render, f) -> AsyncIterator[bytes]:
+    """The render's bytes as they reach the disk, until it has finished."""
+    try:
+        while True:
+            # Take the event before reading, so a chunk written meanwhile still wakes us
+            progress = render.progress
+            data = f.read(TAIL_CHUNK_BYTES)
+            if data:
+                yield data
+            elif render.future.done():
+                render.future.result()  # a failed render ends the response with its error
+                return
+            else:
+                await progress.wait()
+    finally:
+        render.close_reader(f)
+
+
+async def report_response(kind: str, key: int, inputs: dict, pages: Callable[[dict], Iterator[bytes]], filename: str):
+    """The cached file if there is one, otherwise a response that follows the render as it is written.
+
+    Both are served from a handle opened here, so eviction cannot pull the file mid-response.
+    """
+    path = _path(kind, key, content_version(inputs))
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    f = _open_cached(path)
+    if f is not None:
+        headers["Content-Length"] = str(os.fstat(f.fileno()).st_size)
+        return _ReportStreamingResponse(_read(f), f.close, media_type="application/pdf", headers=headers)
+
+    render = _pending.get(path) or _start_render(kind, key, path, inputs, pages)
+    f = render.open_reader()
+    return _ReportStreamingResponse(_tail(render, f), lambda: render.close_reader(f),
+                                    media_type="application/pdf", headers=headers)
+
+
+def in_background(job):
+    """Run a pre-render coroutine without holding up the request that triggered it."""
+    task = asyncio.ensure_future(job)
+    _background.add(task)
+
+    def done(t: asyncio.Task):
+        _background.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            print(f"[Reports] Pre-render failed: {t.exception()}")
+        elif not t.cancelled():
+            stats["prerendered"] += 1
+
+    task.add_done_callback(done)
+    return task
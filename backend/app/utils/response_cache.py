@@ -0,0 +1,202 @@
+"""In-process HTTP response cache for read-mostly GET routes.
+
+`ResponseCacheMiddleware` serves registered routes from memory. A route
+is registered with `response_cache.cache_route(pattern, *tags)`. Entries
+are keyed on the path and the sorted query string, and each holds the
+body, the headers and a strong ETag (SHA-256 of the body).
+- A request whose If-None-Match matches that ETag gets a 304 without a
+  body, even when the entry was just built.
+- Entries expire after RESPONSE_CACHE_TTL seconds.
+- Entries are evicted least recently used first once the cache holds
+  RESPONSE_CACHE_MAX_BYTES of bodies.
+- Write routes call `invalidate(tag)`. Tags may name path parameters,
+  e.g. "comments:{target_id}". A response computed while one of its tags
+  was invalidated is not stored, so a read that races a write cannot
+  re-cache stale data.
+
+Invalidation only reaches this process. Other workers catch up within
+the TTL.
+"""
+import hashlib, os, re, time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+
+# Response headers not replayed from an entry (recomputed or per-request)
+_SKIP_HEADERS = {b"content-length", b"date", b"etag", b"cache-control"}
+
+
+class CacheRule(NamedTuple):
+    pattern: Pattern
+    tags: Tuple[str, ...]
+
+
+class CacheEntry(NamedTuple):
+    expires_at: float
+    etag: bytes
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    tags: Tuple[str, ...]
+
+
+class ResponseCache:
+    def __init__(self):
+        self.rules: List[CacheRule] = []
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._generations: Dict[str, int] = {}
+        self.stats = {
+            "hits": 0, "misses": 0, "not_modified": 0, "stores": 0, "evictions": 0,
+            "invalidations": 0, "bytes_served_from_cache": 0, "bytes_saved_by_304": 0,
+        }
+
+    def cache_route(self, pattern: str, *tags: str):
+        """Cache GETs whose path fully matches `pattern` under `tags` ({group} fills from the match)."""
+        self.rules.append(CacheRule(re.compile(pattern), tags))
+
+    def match(self, path: str) -> Optional[Tuple[str, ...]]:
+        for rule in self.rules:
+            m = rule.pattern.fullmatch(path)
+            if m:
+                return tuple(tag.format(**m.groupdict()) for tag in rule.tags)
+        return None
+
+    # ── Entries ───────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry.expires_at:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry, generations: Tuple[int, ...]):
+        if len(entry.body) > RESPONSE_CACHE_MAX_ENTRY_BYTES:
+            return
+        if generations != self.generations(entry.tags):
+            return  # invalidated while this response was being built
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = entry
+        self._bytes += len(entry.body)
+        self.stats["stores"] += 1
+        while self._bytes > RESPONSE_CACHE_MAX_BYTES and self._entries:
+            self._drop(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def generations(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def invalidate(self, *tags: str):
+        """Drop every entry carrying any of `tags`; call after the write commits."""
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        stale = [key for key, entry in self._entries.items() if any(tag in entry.tags for tag in tags)]
+        for key in stale:
+            self._drop(key)
+        self.stats["invalidations"] += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": round(self.stats["hits"] / lookups, 3) if lookups else None,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": RESPONSE_CACHE_MAX_BYTES,
+            "ttl_seconds": RESPONSE_CACHE_TTL,
+        }
+
+
+response_cache = ResponseCache()
+
+
+def _cache_key(scope) -> str:
+    query = scope.get("query_string", b"").decode("latin-1")
+    return scope["path"] + "?" + "&".join(sorted(query.split("&"))) if query else scope["path"]
+
+
+def _if_none_match(scope) -> List[bytes]:
+    for name, value in scope.get("headers", []):
+        if name == b"if-none-match":
+            return [v.strip() for v in value.split(b",")]
+    return []
+
+
+class ResponseCacheMiddleware:
+    """Plain ASGI middleware; only GET/HEAD requests to registered routes are touched."""
+
+    def __init__(self, app, cache: ResponseCache = response_cache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+        tags = self.cache.match(scope["path"])
+        if tags is None:
+            return await self.app(scope, receive, send)
+
+        key = _cache_key(scope)
+        conditional = _if_none_match(scope)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.cache.stats["hits"] += 1
+            return await self._replay(entry, conditional, scope, send)
+
+        self.cache.stats["misses"] += 1
+        generations = self.cache.generations(tags)
+        start, chunks = None, []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await finish()
+
+        async def finish():
+            body = b"".join(chunks)
+            if start["status"] != 200:
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+            headers = [(k, v) for k, v in start["headers"] if k.lower() not in _SKIP_HEADERS]
+            etag = b'"' + hashlib.sha256(body).hexdigest()[:32].encode("ascii") + b'"'
+            entry = CacheEntry(time.monotonic() + RESPONSE_CACHE_TTL, etag, headers, body, tags)
+            if scope["method"] == "GET":
+                self.cache.put(key, entry, generations)
+            await self._replay(entry, conditional, scope, send, from_cache=False)
+
+        await self.app(scope, receive, capture)
+
+    async def _replay(self, entry: CacheEntry, conditional: List[bytes], scope, send, from_cache: bool = True):
+        headers = entry.headers + [(b"etag", entry.etag), (b"cache-control", b"no-cache")]
+        if entry.etag in conditional or b"*" in conditional:
+            self.cache.stats["not_modified"] += 1
+            self.cache.stats["bytes_saved_by_304"] += len(entry.body)
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        if from_cache:
+            self.cache.stats["bytes_served_from_cache"] += len(entry.body)
+        body = b"" if scope["method"] == "HEAD" else entry.body
+        headers.append((b"content-length", str(len(entry.body)).encode("ascii")))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
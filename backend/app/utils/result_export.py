@@ -0,0 +1,277 @@
+"""Bulk exports of live-session answers and quiz attempts.
+
+Rows are read with a server-side cursor (`db.stream()` with
+`yield_per`) and encoded one batch at a time. Each batch goes to the
+client before the next one is fetched, so memory does not grow with the
+number of rows.
+
+Every export is in long format: one row per answered question,
+carrying the participant's or attempt's totals alongside. A participant
+who joined but answered nothing still gets one row, with the question
+columns left empty. Pivoting on `question_id` gives the per-question
+answer matrix. Because the columns are the same for every session, one
+file can span a whole semester.
+
+Formats:
+- csv: header plus rows;
+- ndjson: one JSON object per line;
+- parquet: one row group per batch, written with pyarrow (listed in
+  requirements.txt). A server installed without it answers 501 for this
+  format instead of failing at import.
+"""
+import asyncio, csv, io, json, os
+from datetime import datetime
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Iterable, List, Optional
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.future import select
+from ..database import AsyncSessionLocal
+from ..models.models import LiveSession, LiveParticipant, QuizAttempt, User
+from .pagination import comparable
+
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "200"))
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# (name, parquet type); the same order is used for CSV headers and NDJSON keys
+ANSWER_FIELDS = [("question_id", "string"), ("selected", "string"), ("is_correct", "bool")]
+
+LIVE_COLUMNS = [
+    ("session_id", "int64"), ("exam_id", "string"), ("topic", "string"), ("unit", "string"),
+    ("session_created_at", "timestamp"), ("user_id", "int64"), ("username", "string"),
+    ("full_name", "string"), ("score", "int64"), ("time_taken_seconds", "int64"),
+    ("submitted_at", "timestamp"),
+] + ANSWER_FIELDS
+
+ATTEMPT_COLUMNS = [
+    ("attempt_id", "int64"), ("user_id", "int64"), ("username", "string"), ("topic", "string"),
+    ("mode", "string"), ("score", "int64"), ("total_questions", "int64"),
+    ("time_taken_seconds", "int64"), ("created_at", "timestamp"),
+] + ANSWER_FIELDS
+
+
+@lru_cache(maxsize=1)
+def available_formats() -> List[str]:
+    formats = ["csv", "ndjson"]
+    try:
+        import pyarrow.parquet  # noqa: F401
+        formats.append("parquet")
+    except ImportError:
+        pass
+    return formats
+
+
+# ── Queries ───────────────────────────────────────────────────────────────
+
+def _date_range(query, column, since: Optional[datetime], until: Optional[datetime], dialect: str):
+    if since is not None:
+        left, right = comparable(column, since, dialect)
+        query = query.filter(left >= right)
+    if until is not None:
+        left, right = comparable(column, until, dialect)
+        query = query.filter(left < right)
+    return query
+
+
+def live_results_query(dialect: str, session_id: Optional[int] = None, host_id: Optional[int] = None,
+                       since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """Participants of one session, or of a host's sessions created in [since, until)."""
+    query = (
+        select(
+            LiveSession.id, LiveSession.exam_id, LiveSession.topic, LiveSession.unit, LiveSession.created_at,
+            LiveParticipant.user_id, User.username, User.full_name, LiveParticipant.score,
+            LiveParticipant.time_taken_seconds, LiveParticipant.submitted_at, LiveParticipant.answers
+        )
+        .join(LiveSession, LiveSession.id == LiveParticipant.session_id)
+        .outerjoin(User, User.id == LiveParticipant.user_id)
+    )
+    if session_id is not None:
+        query = query.filter(LiveParticipant.session_id == session_id)
+    if host_id is not None:
+        query = query.filter(LiveSession.host_id == host_id)
+    query = _date_range(query, LiveSession.created_at, since, until, dialect)
+    return query.order_by(LiveParticipant.session_id, LiveParticipant.id)
+
+
+def attempts_query(dialect: str, user_id: Optional[int] = None, topic: Optional[str] = None,
+                   since: Optional[datetime] = None, until: Optional[datetime] = None):
+    query = (
+        select(
+            QuizAttempt.id, QuizAttempt.user_id, User.username, QuizAttempt.topic, QuizAttempt.mode,
+            QuizAttempt.score, QuizAttempt.total_questions, QuizAttempt.time_taken_seconds,
+            QuizAttempt.created_at, QuizAttempt.details
+        )
+        .outerjoin(User, User.id == QuizAttempt.user_id)
+    )
+    if user_id is not None:
+        query = query.filter(QuizAttempt.user_id == user_id)
+    if topic is not None:
+        query = query.filter(QuizAttempt.topic == topic)
+    query = _date_range(query, QuizAttempt.created_at, since, until, dialect)
+    return query.order_by(QuizAttempt.id)
+
+
+# ── Row expansion ─────────────────────────────────────────────────────────
+
+def _answer_rows(base: tuple, answers, question_key: str, selected_key: str) -> Iterable[tuple]:
+    if not answers:
+        yield base + (None, None, None)
+        return
+    for answer in answers:
+        question_id = answer.get(question_key)
+        selected = answer.get(selected_key)
+        yield base + (
+            str(question_id) if question_id is not None else None,
+            str(selected) if selected is not None else None,
+            answer.get("is_correct"),
+        )
+
+
+def live_rows(row) -> Iterable[tuple]:
+    # Answer details come from AnswerKey.score(): {mcq_id, selected, is_correct}
+    return _answer_rows(tuple(row[:-1]), row[-1], "mcq_id", "selected")
+
+
+def attempt_rows(row) -> Iterable[tuple]:
+    # Attempt details are {question_id, selected_option_id, is_correct}
+    return _answer_rows(tuple(row[:-1]), row[-1], "question_id", "selected_option_id")
+
+
+# ── Encoders ──────────────────────────────────────────────────────────────
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class CSVEncoder:
+    def __init__(self, columns):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._writer.writerow([name for name, _ in columns])
+
+    def encode(self, rows: List[tuple]) -> bytes:
+        self._writer.writerows([[_plain(v) for v in row] for row in rows])
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data.encode("utf-8")
+
+    def finish(self) -> bytes:
+        return self.encode([])
+
+
+class NDJSONEncoder:
+    def __init__(self, columns):
+        self._names = [name for name, _ in columns]
+
+    def encode(self, rows: List[tuple]) -> bytes:
+        names = self._names
+        return "".join(
+            json.dumps(dict(zip(names, row)), default=_plain, ensure_ascii=False) + "\n" for row in rows
+        ).encode("utf-8")
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _Drain:
+    """Write-only sink for ParquetWriter that hands back what was written since the last call."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetEncoder:
+    def __init__(self, columns):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        types = {"int64": pa.int64(), "string": pa.string(), "bool": pa.bool_(),
+                 "timestamp": pa.timestamp("us", tz="UTC")}
+        self._pa = pa
+        self._schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self._sink = _Drain()
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression="snappy")
+
+    def encode(self, rows: List[tuple]) -> bytes:
+        if rows:
+            columns = list(zip(*rows))
+            table = self._pa.Table.from_arrays(
+                [self._pa.array(values, type=field.type) for values, field in zip(columns, self._schema)],
+                schema=self._schema
+            )
+            self._writer.write_table(table)
+        return self._sink.take()
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.take()
+
+
+ENCODERS = {"csv": CSVEncoder, "ndjson": NDJSONEncoder, "parquet": ParquetEncoder}
+
+
+# ── Streaming ─────────────────────────────────────────────────────────────
+
+async def stream_export(build_query: Callable[[str], object], expand: Callable, columns, fmt: str) -> AsyncIterator[bytes]:
+    """Encoded export, one cursor batch at a time. The session lives only as long as the stream."""
+    encoder = ENCODERS[fmt](columns)
+    loop = asyncio.get_running_loop()
+
+    def encode(partition) -> bytes:
+        return encoder.encode([out for row in partition for out in expand(row)])
+
+    async with AsyncSessionLocal() as db:
+        query = build_query(db.get_bind().dialect.name).execution_options(yield_per=EXPORT_BATCH_ROWS)
+        result = await db.stream(query)
+        try:
+            async for partition in result.partitions():
+                # Encoding is the expensive part; keep it off the event loop
+                chunk = await loop.run_in_executor(None, encode, partition)
+                if chunk:
+                    yield chunk
+        finally:
+            await result.close()
+    tail = await loop.run_in_executor(None, encoder.finish)
+    if tail:
+        yield tail
+
+
+def check_format(fmt: str) -> str:
+    fmt = (fmt or "csv").lower()
+    if fmt not in ENCODERS:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{fmt}'; use one of: {', '.join(ENCODERS)}")
+    if fmt not in available_formats():
+        raise HTTPException(status_code=501, detail="Parquet export needs pyarrow installed on the server")
+    return fmt
+
+
+def export_response(build_query: Callable[[str], object], expand: Callable, columns, fmt: str, stem: str):
+    headers = {"Content-Disposition": f'attachment; filename="{stem}.{fmt}"'}
+    return StreamingResponse(stream_export(build_query, expand, columns, fmt), media_type=MEDIA_TYPES[fmt], headers=headers)
@@ -0,0 +1,353 @@
+"""Resumable background jobs that regenerate the AI MCQ bank.
+
+A job creates one checkpoint row per CURRICULUM topic. SEED_WORKERS
+workers pull topics from a queue, and every Gemini call first takes a
+token from a shared bucket. The bucket halves its rate and pauses when
+the API returns 429 and creeps back up after each success, so a reseed
+runs as fast as the quota allows instead of sleeping a fixed 10s per
+topic. Finished topics keep their questions on the checkpoint row, so a
+restarted server resumes the job where it stopped. Once every topic is
+done the whole `mcqs` table is replaced in one transaction together with
+the bank version bump, and the live bank is never empty.
+"""
+import asyncio, os, time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import update, delete, insert, or_
+from sqlalchemy.future import select
+from ..database import AsyncSessionLocal
+from ..models.models import MCQ, SeedJob, SeedJobTopic
+from .ai_generator import generate_mcqs, is_rate_limit_error
+from .mcq_bank import bump_bank_version, mcq_bank
+from .seed_quizzes import CURRICULUM, fallback_questions
+
+SEED_WORKERS = int(os.getenv("SEED_WORKERS", "3"))
+SEED_MAX_ATTEMPTS = int(os.getenv("SEED_MAX_ATTEMPTS", "4"))
+SEED_RATE_PER_MINUTE = float(os.getenv("SEED_RATE_PER_MINUTE", "10"))
+SEED_MAX_RATE_PER_MINUTE = float(os.getenv("SEED_MAX_RATE_PER_MINUTE", "30"))
+# A running job whose heartbeat is older than this belongs to a dead process
+SEED_JOB_STALE_SECONDS = float(os.getenv("SEED_JOB_STALE_SECONDS", "300"))
+# Owners refresh the heartbeat this often, and every process looks for stale jobs this often
+SEED_JOB_HEARTBEAT_SECONDS = SEED_JOB_STALE_SECONDS / 3
+SEED_JOB_RESUME_INTERVAL = float(os.getenv("SEED_JOB_RESUME_INTERVAL", str(SEED_JOB_STALE_SECONDS / 2)))
+
+ACTIVE_STATUSES = ("queued", "running", "swapping")
+
+
+class TokenBucket:
+    """Request pacing for the Gemini quota, adapted from real 429 responses."""
+
+    def __init__(self, per_minute: float = SEED_RATE_PER_MINUTE,
+                 max_per_minute: float = SEED_MAX_RATE_PER_MINUTE,
+                 min_per_minute: float = 1.0, capacity: float = 3.0):
+        self.rate = per_minute / 60
+        self.max_rate = max(max_per_minute, per_minute) / 60
+        self.min_rate = min_per_minute / 60
+        self.capacity = capacity
+        self.tokens = capacity
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.stats = {"granted": 0, "rate_limited": 0}
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.stats["granted"] += 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def on_success(self):
+        # Additive increase: about one extra request per minute per success
+        self.rate = min(self.rate + 1 / 60, self.max_rate)
+
+    def on_rate_limited(self):
+        # Multiplicative decrease, and hold every worker back for one new interval
+        self.rate = max(self.rate / 2, self.min_rate)
+        self.tokens = 0
+        self.paused_until = time.monotonic() + 1 / self.rate
+        self.stats["rate_limited"] += 1
+
+    def describe(self) -> dict:
+        return {
+            "per_minute": round(self.rate * 60, 2),
+            "paused_for": round(max(self.paused_until - time.monotonic(), 0), 2),
+            **self.stats
+        }
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class SeedJobRunner:
+    def __init__(self, workers: int = SEED_WORKERS):
+        self.workers = workers
+        self.bucket = TokenBucket()
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._watcher: Optional[asyncio.Task] = None
+
+    # ── Submitting and resuming ───────────────────────────────────────────
+
+    async def submit(self, questions_per_topic: int = 10) -> int:
+        async with AsyncSessionLocal() as db:
+            topics = [(unit, topic) for unit, names in CURRICULUM.items() for topic in names]
+            job = SeedJob(status="queued", questions_per_topic=questions_per_topic, total_topics=len(topics))
+            db.add(job)
+            await db.flush()
+            await db.execute(insert(SeedJobTopic), [
+                {"job_id": job.id, "unit": unit, "topic": topic, "status": "pending", "attempts": 0}
+                for unit, topic in topics
+            ])
+            await db.commit()
+            job_id = job.id
+        self.start(job_id)
+        return job_id
+
+    def start(self, job_id: int) -> asyncio.Task:
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            task = self._tasks[job_id] = asyncio.create_task(self.run(job_id))
+        return task
+
+    async def resume_unfinished(self) -> List[int]:
+        """Restart jobs left behind by a process that stopped mid-run; jobs another
+        live process is still heartbeating are skipped by `_claim`."""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(SeedJob.id).filter(SeedJob.status.in_(ACTIVE_STATUSES)))
+            job_ids = list(result.scalars().all())
+        for job_id in job_ids:
+            self.start(job_id)
+        return job_ids
+
+    def watch(self):
+        """Resume jobs now and keep looking for stale ones.
+
+        A restart shorter than SEED_JOB_STALE_SECONDS leaves the job's heartbeat
+        fresh at boot, so a single pass at startup would never reclaim it.
+        """
+        if self._watcher is None:
+            self._watcher = asyncio.create_task(self._run_watcher())
+
+    async def _run_watcher(self):
+        while True:
+            try:
+                await self.resume_unfinished()
+            except Exception as e:
+                print(f"[Seed Jobs] Resume check failed: {e}")
+            await asyncio.sleep(SEED_JOB_RESUME_INTERVAL)
+
+    async def _claim(self, job_id: int) -> bool:
+        """Take ownership of a queued job, or of an active one whose owner went quiet."""
+        now = _utcnow()
+        cutoff = datetime.fromtimestamp(now.timestamp() - SEED_JOB_STALE_SECONDS, timezone.utc)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(SeedJob)
+                .where(SeedJob.id == job_id, SeedJob.status.in_(ACTIVE_STATUSES))
+                .where(or_(SeedJob.status == "queued", SeedJob.heartbeat_at.is_(None), SeedJob.heartbeat_at < cutoff))
+                .values(status="running", heartbeat_at=now)
+            )
+            await db.commit()
+            claimed = result.rowcount > 0
+        if claimed:
+            print(f"[Seed Jobs] Running job {job_id}")
+        return claimed
+
+    # ── Running ───────────────────────────────────────────────────────────
+
+    async def run(self, job_id: int):
+        try:
+            if not await self._claim(job_id):
+                return
+            async with AsyncSessionLocal() as db:
+                job = await db.get(SeedJob, job_id)
+                count = job.questions_per_topic
+                result = await db.execute(
+                    select(SeedJobTopic.id, SeedJobTopic.unit, SeedJobTopic.topic, SeedJobTopic.attempts)
+                    .filter(SeedJobTopic.job_id == job_id, SeedJobTopic.status == "pending")
+                )
+                pending = result.all()
+
+            print(f"[Seed Jobs] Job {job_id}: {len(pending)} topics to generate")
+            queue: asyncio.Queue = asyncio.Queue()
+            for row in pending:
+                queue.put_nowait((row.id, row.unit, row.topic, row.attempts))
+            workers = [asyncio.create_task(self._worker(job_id, count, queue))
+                       for _ in range(min(self.workers, len(pending)))]
+            # Topics can sit behind a rate-limit pause for longer than the stale window
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                await queue.join()
+                await self._swap(job_id)
+            finally:
+                heartbeat.cancel()
+                for w in workers:
+                    w.cancel()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Seed Jobs] Job {job_id} failed: {e}")
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(SeedJob).where(SeedJob.id == job_id)
+                    .values(status="failed", error=str(e)[:500], finished_at=_utcnow())
+                )
+                await db.commit()
+        finally:
+            self._tasks.pop(job_id, None)
+
+    async def _heartbeat(self, job_id: int):
+        while True:
+            await asyncio.sleep(SEED_JOB_HEARTBEAT_SECONDS)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(update(SeedJob).where(SeedJob.id == job_id).values(heartbeat_at=_utcnow()))
+                    await db.commit()
+            except Exception as e:
+                print(f"[Seed Jobs] Job {job_id}: heartbeat failed: {e}")
+
+    async def _worker(self, job_id: int, count: int, queue: asyncio.Queue):
+        while True:
+            topic_id, unit, topic, attempts = await queue.get()
+            try:
+                await self._generate_topic(job_id, count, queue, topic_id, unit, topic, attempts)
+            except Exception as e:
+                # Checkpoint writes failing must not leave queue.join() hanging
+                print(f"[Seed Jobs] Job {job_id}: error on {topic}: {e}")
+            finally:
+                queue.task_done()
+
+    async def _generate_topic(self, job_id: int, count: int, queue: asyncio.Queue,
+                              topic_id: int, unit: str, topic: str, attempts: int):
+        await self.bucket.acquire()
+        attempts += 1
+        questions: List[Dict] = []
+        try:
+            questions = await generate_mcqs(f"MSBTE Management (22509) - Unit {unit}: {topic}", count=count,
+                                            raise_errors=True)
+            self.bucket.on_success()
+        except Exception as e:
+            if is_rate_limit_error(e):
+                self.bucket.on_rate_limited()
+                print(f"[Seed Jobs] Rate limited on {topic}; slowing to {self.bucket.describe()['per_minute']}/min")
+        if not questions and attempts < SEED_MAX_ATTEMPTS:
+            await self._checkpoint(job_id, topic_id, attempts=attempts)
+            queue.put_nowait((topic_id, unit, topic, attempts))
+            return
+
+        used_fallback = len(questions) < count
+        if used_fallback:
+            print(f"[Seed Jobs] Only {len(questions)} questions generated for {topic}; adding fallback questions")
+            for f_q in fallback_questions(topic):
+                if len(questions) < count:
+                    questions.append(f_q)
+        await self._checkpoint(job_id, topic_id, attempts=attempts, questions=questions, used_fallback=used_fallback)
+
+    async def _checkpoint(self, job_id: int, topic_id: int, attempts: int,
+                          questions: Optional[List[Dict]] = None, used_fallback: bool = False):
+        async with AsyncSessionLocal() as db:
+            values = {"attempts": attempts}
+            if questions is not None:
+                values.update(status="done", questions=questions, used_fallback=used_fallback)
+            await db.execute(update(SeedJobTopic).where(SeedJobTopic.id == topic_id).values(**values))
+            job_values = {"heartbeat_at": _utcnow()}
+            if questions is not None:
+                job_values["completed_topics"] = SeedJob.completed_topics + 1
+            await db.execute(update(SeedJob).where(SeedJob.id == job_id).values(**job_values))
+            await db.commit()
+
+    async def _swap(self, job_id: int):
+        """Replace the whole bank with the job's questions in a single transaction."""
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(SeedJob).where(SeedJob.id == job_id).values(status="swapping"))
+            await db.commit()
+
+            result = await db.execute(
+                select(SeedJobTopic.unit, SeedJobTopic.topic, SeedJobTopic.questions)
+                .filter(SeedJobTopic.job_id == job_id, SeedJobTopic.status == "done")
+                .order_by(SeedJobTopic.id)
+            )
+            rows = [
+                {
+                    "unit": unit,
+                    "topic": topic,
+                    "question": q["question"],
+                    "options": q["options"],
+                    "correct_option_id": q["correct_option_id"],
+                    "explanation": q["explanation"]
+                }
+                for unit, topic, questions in result.all()
+                for q in questions or []
+            ]
+            if not rows:
+                raise RuntimeError("No questions were generated; keeping the current bank")
+
+            await db.execute(delete(MCQ))
+            await db.execute(insert(MCQ), rows)
+            await bump_bank_version(db, commit=False)
+            await db.execute(
+                update(SeedJob).where(SeedJob.id == job_id)
+                .values(status="completed", finished_at=_utcnow(), heartbeat_at=_utcnow())
+            )
+            # Checkpointed questions now live in mcqs
+            await db.execute(update(SeedJobTopic).where(SeedJobTopic.job_id == job_id).values(questions=None))
+            await db.commit()
+
+        mcq_bank.invalidate()
+        print(f"[Seed Jobs] Job {job_id} completed: swapped in {len(rows)} questions")
+
+    # ── Progress ──────────────────────────────────────────────────────────
+
+    async def describe(self, job_id: int) -> Optional[dict]:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(SeedJob, job_id)
+            if not job:
+                return None
+            result = await db.execute(
+                select(SeedJobTopic.unit, SeedJobTopic.topic, SeedJobTopic.status,
+                       SeedJobTopic.attempts, SeedJobTopic.used_fallback)
+                .filter(SeedJobTopic.job_id == job_id)
+                .order_by(SeedJobTopic.id)
+            )
+            topics = [
+                {"unit": unit, "topic": topic, "status": status, "attempts": attempts, "used_fallback": bool(fallback)}
+                for unit, topic, status, attempts, fallback in result.all()
+            ]
+        return {
+            "id": job.id,
+            "status": job.status,
+            "questions_per_topic": job.questions_per_topic,
+            "total_topics": job.total_topics,
+            "completed_topics": job.completed_topics,
+            "error": job.error,
+            "created_at": job.created_at,
+            "finished_at": job.finished_at,
+            "running_here": job_id in self._tasks,
+            "rate": self.bucket.describe(),
+            "topics": topics
+        }
+
+    async def stop(self):
+        """Cancel in-process jobs; their checkpoints let the next start resume them."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+seed_jobs = SeedJobRunner()
@@ -43,6 +43,33 @@ CURRICULUM = {
     ]
 }
 
+def fallback_questions(topic):
+    """Generic but relevant questions used to top up a topic when the AI under-delivers."""
+    return [
+        {
+            "question": f"Which of the following is a key aspect of {topic}?",
+            "options": [
+                {"id": "a", "text": "Continuous Process Improvement"},
+                {"id": "b", "text": "Stagnation of Workflows"},
+                {"id": "c", "text": "Decreasing Organizational Efficiency"},
+                {"id": "d", "text": "Ignoring Stakeholder Requirements"}
+            ],
+            "correct_option_id": "a",
+            "explanation": f"In {topic}, the focus is always on improving processes and achieving better organizational outcomes."
+        },
+        {
+            "question": f"What role does planning play in {topic}?",
+            "options": [
+                {"id": "a", "text": "It is irrelevant to the outcome"},
+                {"id": "b", "text": "It serves as the foundation for execution"},
+                {"id": "c", "text": "It only consumes resources without benefit"},
+                {"id": "d", "text": "It is done after the work is complete"}
+            ],
+            "correct_option_id": "b",
+            "explanation": f"Effective {topic} requires thorough planning to set clear objectives and resource allocation."
+        }
+    ]
+
 async def seed_quizzes():
     # Explicitly load the backend .env file
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
@@ -55,85 +82,32 @@ async def seed_quizzes():
     print(f"📊 Using Database URL: {db_url}")
 
     # Lazy imports to ensure environment is set up
-    from backend.app.database import AsyncSessionLocal, engine, Base
-    from backend.app.models.models import MCQ
-    from backend.app.utils.ai_generator import generate_mcqs
+    from backend.app.database import engine, Base
+    from backend.app.utils.seed_jobs import seed_jobs
     
-    # Ensure tables exist and clear old MCQ data to prevent duplicates / mismatches
+    # Ensure tables exist; the current MCQs stay live until the job swaps in the new bank
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-        from sqlalchemy import delete
-        await conn.execute(delete(MCQ))
     
-    async with AsyncSessionLocal() as session:
-        print("🚀 Starting ManageMind Quiz Seeding...")
-        total_added = 0
-        
-        for unit, topics in CURRICULUM.items():
-            print(f"\n📂 Processing Unit {unit}...")
-            for topic in topics:
-                # Add delay to avoid 429 rate limits
-                if total_added > 0:
-                    print(f"  ⏳ Waiting 10s for API quota...")
-                    await asyncio.sleep(10)
-                
-                print(f"  📝 Generating MCQs for: {topic}...")
-                try:
-                    # Requesting 10 questions per topic to ensure a comprehensive pool
-                    questions = await generate_mcqs(f"MSBTE Management (22509) - Unit {unit}: {topic}", count=10)
-                    
-                    if not questions or len(questions) < 10:
-                        print(f"  ⚠️ Only {len(questions)} questions generated by AI. Adding standard fallback questions for {topic}.")
-                        # Supplement with generic but relevant questions if AI under-delivers
-                        fallbacks = [
-                            {
-                                "question": f"Which of the following is a key aspect of {topic}?",
-                                "options": [
-                                    {"id": "a", "text": "Continuous Process Improvement"},
-                                    {"id": "b", "text": "Stagnation of Workflows"},
-                                    {"id": "c", "text": "Decreasing Organizational Efficiency"},
-                                    {"id": "d", "text": "Ignoring Stakeholder Requirements"}
-                                ],
-                                "correct_option_id": "a",
-                                "explanation": f"In {topic}, the focus is always on improving processes and achieving better organizational outcomes."
-                            },
-                            {
-                                "question": f"What role does planning play in {topic}?",
-                                "options": [
-                                    {"id": "a", "text": "It is irrelevant to the outcome"},
-                                    {"id": "b", "text": "It serves as the foundation for execution"},
-                                    {"id": "c", "text": "It only consumes resources without benefit"},
-                                    {"id": "d", "text": "It is done after the work is complete"}
-                                ],
-                                "correct_option_id": "b",
-                                "explanation": f"Effective {topic} requires thorough planning to set clear objectives and resource allocation."
-                            }
-                        ]
-                        # Add only enough to hit a reasonable variety
-                        for f_q in fallbacks:
-                            if len(questions) < 10:
-                                questions.append(f_q)
-                        
-                    for q_data in questions:
-                        mcq = MCQ(
-                            unit=unit,
-                            topic=topic,
-                            question=q_data["question"],
-                            options=q_data["options"],
-                            correct_option_id=q_data["correct_option_id"],
-                            explanation=q_data["explanation"]
-                        )
-                        session.add(mcq)
-                    
-                    total_added += len(questions)
-                    print(f"  ✅ Added {len(questions)} questions.")
-                    # Commit per topic to ensure progress is saved if a crash occurs
-                    await session.commit()
-                except Exception as e:
-                    print(f"  ❌ Error processing {topic}: {e}")
-                    await session.rollback()
-        
-        print(f"\n✨ Seeding completed! Total questions added: {total_added}")
+    print("🚀 Starting ManageMind Quiz Seeding...")
+    # Resume an interrupted run from its checkpoints instead of starting over
+    job_ids = await seed_jobs.resume_unfinished()
+    if job_ids:
+        print(f"⏯️ Resuming seed job(s) {job_ids}")
+    else:
+        # Requesting 10 questions per topic to ensure a comprehensive pool
+        job_ids = [await seed_jobs.submit(questions_per_topic=10)]
+    await asyncio.gather(*[seed_jobs.start(job_id) for job_id in job_ids])
+    
+    for job_id in job_ids:
+        job = await seed_jobs.describe(job_id)
+        fallback_topics = [t["topic"] for t in job["topics"] if t["used_fallback"]]
+        if fallback_topics:
+            print(f"  ⚠️ Fallback questions were added for: {', '.join(fallback_topics)}")
+        if job["status"] == "completed":
+            print(f"\n✨ Seeding completed! Job {job_id} swapped in questions for {job['completed_topics']} topics")
+        else:
+            print(f"\n❌ Seed job {job_id} ended as '{job['status']}': {job['error']}")
 
 if __name__ == "__main__":
     # Ensure project root is in path
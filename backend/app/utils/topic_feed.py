@@ -0,0 +1,126 @@
+"""Precomputed trending topic feed.
+
+The feed is the summary projection of every topic (no article HTML, MCQs
+or poll), ranked live first, then by approvals, then newest. It is built
+with one query and kept in memory until a write in this process calls
+`invalidate()` or TOPIC_FEED_TTL seconds pass, which bounds how stale
+other workers can be. Each build gets a content digest. Page ETags derive
+from it, so every worker hands out the same ETag for the same data and
+clients can revalidate with If-None-Match.
+"""
+import asyncio, bisect, hashlib, json, os, time
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
+from sqlalchemy.future import select
+from ..database import AsyncSessionLocal
+from ..models.models import TrendingTopic
+from .pagination import encode_cursor, decode_cursor
+
+TOPIC_FEED_TTL = float(os.getenv("TOPIC_FEED_TTL", "30"))
+TOPIC_FEED_MAX_TOPICS = int(os.getenv("TOPIC_FEED_MAX_TOPICS", "1000"))
+
+# article_content, real_world_example, mcqs and poll are only read by the detail view
+SUMMARY_FIELDS = [
+    "id", "title", "description", "author", "tags", "created_at",
+    "approval_votes", "correction_votes", "is_live"
+]
+
+_RANKING = [
+    TrendingTopic.is_live.desc(),
+    func.coalesce(TrendingTopic.approval_votes, 0).desc(),
+    # Spelled out because the default differs: Postgres puts NULLs first on DESC, SQLite last
+    TrendingTopic.created_at.desc().nulls_last(),
+    TrendingTopic.id.desc(),
+]
+
+
+def _rank_key(item: dict) -> tuple:
+    """Ascending sort key matching _RANKING, used to seek past a cursor."""
+    created = item["created_at"] or ""  # NULL sorts after every timestamp, as nulls_last() does
+    return (not item["is_live"], -(item["approval_votes"] or 0), _Desc(created), -item["id"])
+
+
+class _Desc(str):
+    """Reverses string comparison so ISO timestamps sort newest first inside a tuple."""
+    def __lt__(self, other):
+        return str.__gt__(self, other)
+
+    def __gt__(self, other):
+        return str.__lt__(self, other)
+
+
+def _decode_feed_cursor(cursor: str) -> tuple:
+    live, approvals, created, topic_id = decode_cursor(cursor, 4)
+    # Well-formed JSON with the wrong types would otherwise fail in the comparisons below
+    if not (isinstance(live, bool) and _is_int(approvals) and isinstance(created, str) and _is_int(topic_id)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return live, approvals, created, topic_id
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class TopicFeed:
+    def __init__(self):
+        self.items: List[dict] = []
+        self.keys: List[tuple] = []
+        self.digest: Optional[str] = None
+        self.stats = {"hits": 0, "builds": 0, "invalidations": 0}
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _build(self):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(*[getattr(TrendingTopic, f) for f in SUMMARY_FIELDS])
+                .order_by(*_RANKING)
+                .limit(TOPIC_FEED_MAX_TOPICS)
+            )
+            rows = result.all()
+        # Encoded once here, so pages are served without re-serializing datetimes
+        items = jsonable_encoder([dict(row._mapping) for row in rows])
+        for item in items:
+            item["is_live"] = bool(item["is_live"])
+        self.items = items
+        self.keys = [_rank_key(item) for item in items]
+        self.digest = hashlib.sha1(json.dumps(items, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        self._built_at = time.monotonic()
+        self.stats["builds"] += 1
+
+    async def ensure_fresh(self) -> "TopicFeed":
+        if self.digest is not None and time.monotonic() - self._built_at < TOPIC_FEED_TTL:
+            self.stats["hits"] += 1
+            return self
+        async with self._lock:
+            # Another request may have rebuilt it while we waited
+            if self.digest is None or time.monotonic() - self._built_at >= TOPIC_FEED_TTL:
+                await self._build()
+        return self
+
+    def invalidate(self):
+        """Rebuild on next access; call after any change to a topic's summary or ranking."""
+        self._built_at = 0.0
+        self.stats["invalidations"] += 1
+
+    async def page(self, limit: int, cursor: Optional[str]) -> Tuple[List[dict], Optional[str], str]:
+        """(items, next cursor, ETag) for one page of the current feed."""
+        await self.ensure_fresh()
+        items, keys, digest = self.items, self.keys, self.digest
+        start = 0
+        if cursor:
+            live, approvals, created, topic_id = _decode_feed_cursor(cursor)
+            # First item ranked strictly after the cursor, even if the feed changed since
+            start = bisect.bisect_right(keys, (not live, -approvals, _Desc(created), -topic_id))
+        chunk = items[start:start + limit]
+        next_cursor = None
+        if start + limit < len(items):
+            last = chunk[-1]
+            next_cursor = encode_cursor([last["is_live"], last["approval_votes"] or 0, last["created_at"] or "", last["id"]])
+        etag = f'W/"feed-{digest}-{hashlib.sha1(f"{cursor}:{limit}".encode()).hexdigest()[:8]}"'
+        return chunk, next_cursor, etag
+
+
+topic_feed = TopicFeed()
@@ -0,0 +1,33 @@
+"""Process-wide cache of user display names for leaderboards and reports."""
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy.future import select
+from ..database import AsyncSessionLocal
+from ..models.models import User
+
+# user_id -> (username, full_name); None marks an id with no user row
+_names: Dict[int, Optional[Tuple[str, Optional[str]]]] = {}
+
+
+def remember(user_id: int, username: str, full_name: Optional[str]):
+    _names[user_id] = (username, full_name)
+
+
+def forget(user_id: int):
+    """Call whenever a user's username or full_name changes."""
+    _names.pop(user_id, None)
+
+
+async def get_names(user_ids: Iterable[int]) -> Dict[int, Tuple[str, Optional[str]]]:
+    """Names for the given ids, loading any uncached ones in a single query."""
+    user_ids = set(user_ids)
+    missing = [uid for uid in user_ids if uid not in _names]
+    if missing:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(User.id, User.username, User.full_name).filter(User.id.in_(missing))
+            )
+            for user_id, username, full_name in result.all():
+                remember(user_id, username, full_name)
+        for user_id in missing:
+            _names.setdefault(user_id, None)
+    return {uid: _names[uid] for uid in user_ids if _names.get(uid) is not None}
@@ -0,0 +1,140 @@
+"""Per-user quiz statistics, maintained incrementally on every submit.
+
+The dashboard used to download every attempt and aggregate in the
+browser. `record_attempt` folds each new attempt into the user's
+`user_stats` row inside the submit transaction. Users whose attempts
+predate the table get their row rebuilt from `quiz_attempts` on their
+next submit, without reading the `details` column.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy.future import select
+from ..models.models import QuizAttempt, UserStats
+
+
+def _apply(stats: UserStats, topic: str, score: int, total: int, time_taken: int, day: date):
+    stats.attempts = (stats.attempts or 0) + 1
+    stats.total_questions = (stats.total_questions or 0) + total
+    stats.correct_answers = (stats.correct_answers or 0) + score
+    if total > 0:
+        stats.accuracy_sum = (stats.accuracy_sum or 0.0) + score / total * 100
+        stats.time_per_question_sum = (stats.time_per_question_sum or 0.0) + time_taken / total
+
+    # Reassign so the JSON column is marked dirty
+    topics = dict(stats.topics or {})
+    entry = dict(topics.get(topic, {"attempts": 0, "correct": 0, "total": 0}))
+    entry["attempts"] += 1
+    entry["correct"] += score
+    entry["total"] += total
+    topics[topic] = entry
+    stats.topics = topics
+
+    last = stats.last_attempt_date
+    if last == day:
+        pass
+    elif last == day - timedelta(days=1):
+        stats.current_streak = (stats.current_streak or 0) + 1
+    elif last is None or day > last:
+        stats.current_streak = 1
+    stats.longest_streak = max(stats.longest_streak or 0, stats.current_streak or 0)
+    if last is None or day > last:
+        stats.last_attempt_date = day
+
+
+def _day(created_at: Optional[datetime]) -> date:
+    if created_at is None:
+        return datetime.now(timezone.utc).date()
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+
+def _empty(user_id: int) -> dict:
+    return {"user_id": user_id, "attempts": 0, "total_questions": 0, "correct_answers": 0,
+            "accuracy_sum": 0.0, "time_per_question_sum": 0.0, "topics": {},
+            "current_streak": 0, "longest_streak": 0}
+
+
+async def _replay(db, stats: UserStats):
+    """Fold every recorded attempt of the user into an empty stats row."""
+    result = await db.execute(
+        select(QuizAttempt.topic, QuizAttempt.score, QuizAttempt.total_questions,
+               QuizAttempt.time_taken_seconds, QuizAttempt.created_at)
+        .filter(QuizAttempt.user_id == stats.user_id)
+        .order_by(QuizAttempt.id)
+    )
+    for topic, score, total, time_taken, created_at in result.all():
+        _apply(stats, topic, score, total, time_taken, _day(created_at))
+
+
+def _insert_ignore(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise RuntimeError(f"Upsert is not supported for the {dialect} dialect")
+    return dialect_insert(UserStats).on_conflict_do_nothing(index_elements=[UserStats.user_id])
+
+
+async def record_attempt(db, attempt: QuizAttempt):
+    """Fold a new (flushed, not yet committed) attempt into the user's stats row.
+
+    The row is created with INSERT ... ON CONFLICT DO NOTHING and then locked,
+    so two first submits never both insert it. Only the creator replays the
+    user's history, which already includes its own attempt. A concurrent
+    submit waits for that row and adds its attempt on top.
+    """
+    created = await db.execute(_insert_ignore(db.get_bind().dialect.name).values(**_empty(attempt.user_id)))
+    result = await db.execute(
+        select(UserStats).filter(UserStats.user_id == attempt.user_id).with_for_update()
+    )
+    stats = result.scalars().one()
+    if created.rowcount:
+        await _replay(db, stats)
+        return
+    _apply(stats, attempt.topic, attempt.score, attempt.total_questions,
+           attempt.time_taken_seconds, _day(None))
+
+
+async def get_stats(db, user_id: int) -> UserStats:
+    """The user's stats. Users without a row yet get them computed from their
+    attempts without writing; the next submit creates the row."""
+    result = await db.execute(select(UserStats).filter(UserStats.user_id == user_id))
+    stats = result.scalars().first()
+    if stats is None:
+        stats = UserStats(**_empty(user_id))
+        await _replay(db, stats)
+    return stats
+
+
+def stats_payload(stats: UserStats) -> dict:
+    attempts = stats.attempts or 0
+    today = datetime.now(timezone.utc).date()
+    # A streak only counts as current if the last attempt was today or yesterday
+    current = stats.current_streak or 0
+    if stats.last_attempt_date is None or stats.last_attempt_date < today - timedelta(days=1):
+        current = 0
+    topics = [
+        {
+            "topic": topic,
+            "attempts": t["attempts"],
+            "correct": t["correct"],
+            "total": t["total"],
+            "score": round(t["correct"] / t["total"] * 100) if t["total"] else 0
+        }
+        for topic, t in (stats.topics or {}).items()
+    ]
+    topics.sort(key=lambda t: t["score"], reverse=True)
+    return {
+        "user_id": stats.user_id,
+        "attempts": attempts,
+        "total_questions": stats.total_questions or 0,
+        "correct_answers": stats.correct_answers or 0,
+        "accuracy": round(stats.accuracy_sum / attempts, 1) if attempts else 0,
+        "average_time": round(stats.time_per_question_sum / attempts) if attempts else 0,
+        "current_streak": current,
+        "longest_streak": stats.longest_streak or 0,
+        "last_attempt_date": stats.last_attempt_date,
+        "topics": topics
+    }
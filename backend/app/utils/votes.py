@@ -0,0 +1,129 @@
+"""Vote counters updated in SQL instead of read-modify-write in Python.
+
+Comment and topic votes are a single `UPDATE ... SET votes = votes + :delta
+RETURNING ...`, so concurrent voters never overwrite each other and no row
+is loaded first. Poll tallies live in `poll_option_counts`, one row per
+(topic, option), bumped with an upsert. The first upsert for an option
+starts from the count stored in the topic's poll JSON, which carries
+tallies recorded before this table existed over without a migration.
+Reads merge the table into the poll JSON through `with_tallies()`.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import case, delete, func, update
+from sqlalchemy.future import select
+from ..models.models import Comment, TrendingTopic, PollOptionCount
+
+APPROVAL_THRESHOLD = 5    # approvals that put a topic live
+REMOVAL_THRESHOLD = 20    # corrections beyond which a topic is removed
+
+
+async def vote_comment(db, comment_id: int, direction: int) -> Optional[Tuple[int, int]]:
+    """(new vote total, target id), or None if the comment does not exist. Caller commits."""
+    result = await db.execute(
+        update(Comment)
+        .where(Comment.id == comment_id)
+        .values(votes=func.coalesce(Comment.votes, 0) + direction)
+        .returning(Comment.votes, Comment.target_id)
+    )
+    row = result.first()
+    return tuple(row) if row is not None else None
+
+
+async def vote_topic(db, topic_id: int, vote_type: str) -> Optional[dict]:
+    """Counters after the vote, or None if the topic does not exist. Caller commits.
+
+    `removed` is set when this correction pushed the topic past the removal threshold.
+    """
+    approvals = func.coalesce(TrendingTopic.approval_votes, 0)
+    corrections = func.coalesce(TrendingTopic.correction_votes, 0)
+    if vote_type == "approval":
+        values = {
+            "approval_votes": approvals + 1,
+            "is_live": case((approvals + 1 >= APPROVAL_THRESHOLD, True), else_=TrendingTopic.is_live),
+        }
+    else:
+        values = {"correction_votes": corrections + 1}
+    result = await db.execute(
+        update(TrendingTopic)
+        .where(TrendingTopic.id == topic_id)
+        .values(**values)
+        .returning(TrendingTopic.approval_votes, TrendingTopic.correction_votes, TrendingTopic.is_live)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    counts = {"approval_votes": row[0], "correction_votes": row[1], "is_live": bool(row[2]), "removed": False}
+    if vote_type != "approval" and (row[1] or 0) > REMOVAL_THRESHOLD:
+        # Conditional on the counter, so only one of several racing voters removes it
+        removed = await db.execute(
+            delete(TrendingTopic)
+            .where(TrendingTopic.id == topic_id, TrendingTopic.correction_votes > REMOVAL_THRESHOLD)
+        )
+        if removed.rowcount:
+            await delete_poll_tallies(db, topic_id)
+            counts["removed"] = True
+    return counts
+
+
+# ── Polls ─────────────────────────────────────────────────────────────────
+
+def _upsert_statement(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise RuntimeError(f"Upsert is not supported for the {dialect} dialect")
+    stmt = dialect_insert(PollOptionCount)
+    return stmt.on_conflict_do_update(
+        index_elements=[PollOptionCount.topic_id, PollOptionCount.option_id],
+        set_={"votes": PollOptionCount.votes + 1}
+    )
+
+
+async def record_poll_vote(db, topic_id: int, option: dict) -> int:
+    """Add one vote to `option` (an entry of the poll JSON); returns its new tally. Caller commits."""
+    stmt = _upsert_statement(db.get_bind().dialect.name).returning(PollOptionCount.votes)
+    result = await db.execute(stmt, {
+        "topic_id": topic_id,
+        "option_id": option["id"],
+        "votes": (option.get("votes") or 0) + 1,
+    })
+    return result.scalar()
+
+
+async def poll_tallies(db, topic_id: int) -> Dict[str, int]:
+    result = await db.execute(
+        select(PollOptionCount.option_id, PollOptionCount.votes).filter(PollOptionCount.topic_id == topic_id)
+    )
+    return dict(result.all())
+
+
+async def poll_tallies_for(db, topic_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """Tallies of several topics in one query: topic id -> option id -> votes."""
+    tallies: Dict[int, Dict[str, int]] = {}
+    topic_ids = list(topic_ids)
+    if not topic_ids:
+        return tallies
+    result = await db.execute(
+        select(PollOptionCount.topic_id, PollOptionCount.option_id, PollOptionCount.votes)
+        .filter(PollOptionCount.topic_id.in_(topic_ids))
+    )
+    for topic_id, option_id, count in result.all():
+        tallies.setdefault(topic_id, {})[option_id] = count
+    return tallies
+
+
+def with_tallies(poll: Optional[dict], tallies: Dict[str, int]) -> Optional[dict]:
+    """Copy of the poll JSON with each option's votes taken from the counts table."""
+    if not poll or "options" not in poll:
+        return poll
+    options = [
+        {**opt, "votes": tallies.get(opt.get("id"), opt.get("votes", 0))}
+        for opt in poll["options"]
+    ]
+    return {**poll, "options": options}
+
+
+async def delete_poll_tallies(db, topic_id: int):
+    await db.execute(delete(PollOptionCount).where(PollOptionCount.topic_id == topic_id))
@@ -35,25 +35,54 @@ const LiveSessionManager = () => {
     const [leaderboard, setLeaderboard] = useState(null)
     const [myScore, setMyScore] = useState(null)
     const [hostSessions, setHostSessions] = useState([])
+    const [streamedQuestions, setStreamedQuestions] = useState([])
     const pollingRef = useRef(null)
 
-    /* ── Polling ─────────────────────────────────────────────────────────── */
+    /* ── Live updates (WebSocket push, polling fallback) ──────────────── */
     useEffect(() => {
         clearInterval(pollingRef.current)
         if (!sessionData?.id) return
         if (!['host_waiting', 'student_waiting', 'host_active'].includes(mode)) return
 
-        pollingRef.current = setInterval(async () => {
-            try {
-                const res = await api.get(`/api/live/${sessionData.id}/status`)
-                setSessionData(prev => ({ ...prev, ...res.data }))
-                if (mode === 'student_waiting' && res.data.status === 'active') {
-                    setMode('student_active')
-                }
-            } catch (e) { /* ignore */ }
-        }, 3000)
+        const applyStatus = (data) => {
+            setSessionData(prev => ({ ...prev, ...data }))
+            if (mode === 'student_waiting' && data.status === 'active') {
+                setMode('student_active')
+            }
+        }
+
+        const startPolling = () => {
+            clearInterval(pollingRef.current)
+            pollingRef.current = setInterval(async () => {
+                try {
+                    const res = await api.get(`/api/live/${sessionData.id}/status`)
+                    applyStatus(res.data)
+                } catch (e) { /* ignore */ }
+            }, 3000)
+        }
+
+        let socket = null
+        let closedByUs = false
+        try {
+            const base = api.defaults.baseURL || window.location.origin
+            const wsUrl = `${base.replace(/^http/, 'ws')}/api/live/${sessionData.id}/ws`
+            socket = new WebSocket(wsUrl)
+            socket.onmessage = (evt) => {
+                try {
+                    const { type, user_id, ...data } = JSON.parse(evt.data)
+                    applyStatus(data)
+                } catch (e) { /* ignore */ }
+            }
+            socket.onclose = () => { if (!closedByUs) startPolling() }
+        } catch (e) {
+            startPolling()
+        }
 
-        return () => clearInterval(pollingRef.current)
+        return () => {
+            closedByUs = true
+            if (socket) socket.close()
+            clearInterval(pollingRef.current)
+        }
     }, [mode, sessionData?.id])
 
     useEffect(() => {
@@ -83,14 +112,45 @@ const LiveSessionManager = () => {
     }
 
     const handleCreateAdvanced = async (selections) => {
-        setLoading(true); setError('')
+        setLoading(true); setError(''); setStreamedQuestions([])
         try {
-            const res = await api.post('/api/live/create-advanced', {
-                host_id: user.id,
-                duration_minutes: selections.duration,
-                syllabus_selections: selections.points
+            // Streamed so questions show up as the AI finishes each one
+            const token = localStorage.getItem('token')
+            const res = await fetch(`${api.defaults.baseURL || ''}/api/live/create-advanced/stream`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    ...(token ? { Authorization: `Bearer ${token}` } : {})
+                },
+                body: JSON.stringify({
+                    host_id: user.id,
+                    duration_minutes: selections.duration,
+                    syllabus_selections: selections.points
+                })
             })
-            setSessionData(res.data)
+            if (!res.ok || !res.body) throw new Error('stream failed')
+
+            const reader = res.body.getReader()
+            const decoder = new TextDecoder()
+            let buffered = ''
+            let created = null
+            while (true) {
+                const { done, value } = await reader.read()
+                if (done) break
+                buffered += decoder.decode(value, { stream: true })
+                const lines = buffered.split('\n')
+                buffered = lines.pop()
+                for (const line of lines) {
+                    if (!line.trim()) continue
+                    const evt = JSON.parse(line)
+                    if (evt.type === 'question') setStreamedQuestions(prev => [...prev, evt.question])
+                    else if (evt.type === 'session') created = evt
+                    else if (evt.type === 'error') throw new Error(evt.detail)
+                }
+            }
+            if (!created) throw new Error('no session')
+            const { type, ...data } = created
+            setSessionData(data)
             setMode('host_waiting')
         } catch { setError('Failed to create advanced session.') }
         finally { setLoading(false) }
@@ -289,6 +349,7 @@ const LiveSessionManager = () => {
             onBack={() => setMode('host_select')}
             loading={loading}
             error={error}
+            streamedQuestions={streamedQuestions}
         />
     )
 
@@ -510,7 +571,7 @@ const LiveSessionManager = () => {
 }
 
 /* ── Advanced Session Form ─────────────────────────────────────────────── */
-const AdvancedSessionForm = ({ onSubmit, onBack, loading, error }) => {
+const AdvancedSessionForm = ({ onSubmit, onBack, loading, error, streamedQuestions = [] }) => {
     const [selected, setSelected] = useState({})
     const [duration, setDuration] = useState(30)
 
@@ -578,9 +639,14 @@ const AdvancedSessionForm = ({ onSubmit, onBack, loading, error }) => {
                         </div>
                     </div>
                     <button className="btn-primary" onClick={handleSubmit} disabled={loading || totalQ === 0}>
-                        {loading ? <><Loader2 className="spinner" size={16} /> Generating questions...</> : <><Zap size={16} /> Create AI Session</>}
+                        {loading ? <><Loader2 className="spinner" size={16} /> Generating questions... ({streamedQuestions.length}/{totalQ})</> : <><Zap size={16} /> Create AI Session</>}
                     </button>
                 </div>
+                {loading && streamedQuestions.length > 0 && (
+                    <ol className="adv-stream-preview">
+                        {streamedQuestions.map((q, i) => <li key={i}>{q.question}</li>)}
+                    </ol>
+                )}
                 <button className="btn-back" onClick={onBack}>← Back</button>
             </div>
         </div>
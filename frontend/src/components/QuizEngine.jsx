@@ -33,6 +33,7 @@ const QuizEngine = ({ unit = null, topic = null, sessionQuestions = null, sessio
             const params = {}
             if (unit) params.unit = unit
             if (topic) params.topic = topic
+            if (user) params.user_id = user.id
 
             api.get('/api/quizzes', { params }).then(res => {
                 setQuestions(res.data)
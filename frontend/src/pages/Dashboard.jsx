@@ -28,9 +28,13 @@ ChartJS.register(
     Filler
 )
 
+const HISTORY_PAGE_SIZE = 20;
+
 const Dashboard = () => {
     const { user } = useAuth();
     const [history, setHistory] = useState([]);
+    const [stats, setStats] = useState(null);
+    const [hasMoreHistory, setHasMoreHistory] = useState(false);
     const [news, setNews] = useState([]);
     const [loading, setLoading] = useState(true);
     const [activeTab, setActiveTab] = useState('overview');
@@ -38,16 +42,30 @@ const Dashboard = () => {
     useEffect(() => {
         if (user) {
             Promise.all([
+                fetchStats(),
                 fetchHistory(),
                 fetchNews()
             ]).finally(() => setLoading(false));
         }
     }, [user]);
 
-    const fetchHistory = async () => {
+    const fetchStats = async () => {
         try {
-            const res = await api.get(`/api/quizzes/history/${user.id}`);
-            setHistory(res.data);
+            const res = await api.get(`/api/quizzes/stats/${user.id}`);
+            setStats(res.data);
+        } catch (error) {
+            console.error("Error fetching stats", error);
+        }
+    }
+
+    // History comes in pages, newest first; older pages are fetched on demand
+    const fetchHistory = async (beforeId = null) => {
+        try {
+            const params = { limit: HISTORY_PAGE_SIZE };
+            if (beforeId) params.before_id = beforeId;
+            const res = await api.get(`/api/quizzes/history/${user.id}`, { params });
+            setHistory(prev => beforeId ? [...prev, ...res.data] : res.data);
+            setHasMoreHistory(res.data.length === HISTORY_PAGE_SIZE);
         } catch (error) {
             console.error("Error fetching history", error);
         }
@@ -62,21 +80,17 @@ const Dashboard = () => {
         }
     }
 
-    // Aggregate data from backend history
-    const accuracy = history.length > 0
-        ? (history.reduce((acc, curr) => acc + (curr.score / curr.total_questions) * 100, 0) / history.length).toFixed(1)
-        : 0;
-
-    const avgTime = history.length > 0
-        ? (history.reduce((acc, curr) => acc + (curr.time_taken_seconds / curr.total_questions), 0) / history.length).toFixed(0)
-        : 0;
+    // Totals are maintained server-side; the chart shows the most recent page of attempts
+    const accuracy = stats ? stats.accuracy.toFixed(1) : 0;
+    const avgTime = stats ? stats.average_time : 0;
+    const recentAttempts = history.slice(0, HISTORY_PAGE_SIZE);
 
     const chartData = {
-        labels: history.map((_, i) => `Attempt ${i + 1}`).reverse(),
+        labels: recentAttempts.map((_, i) => `Attempt ${i + 1}`).reverse(),
         datasets: [
             {
                 label: 'Accuracy %',
-                data: history.map(h => (h.score / h.total_questions) * 100).reverse(),
+                data: recentAttempts.map(h => (h.score / h.total_questions) * 100).reverse(),
                 borderColor: '#764ba2',
                 backgroundColor: 'rgba(118, 75, 162, 0.1)',
                 fill: true,
@@ -85,17 +99,9 @@ const Dashboard = () => {
         ],
     };
 
-    const topicMastery = Object.entries(
-        history.reduce((acc, curr) => {
-            if (!acc[curr.topic]) acc[curr.topic] = { total: 0, correct: 0 };
-            acc[curr.topic].total += curr.total_questions;
-            acc[curr.topic].correct += curr.score;
-            return acc;
-        }, {})
-    ).map(([name, stats]) => ({
-        name,
-        score: Math.round((stats.correct / stats.total) * 100)
-    })).sort((a, b) => b.score - a.score).slice(0, 5);
+    const topicMastery = (stats?.topics || [])
+        .map(t => ({ name: t.topic, score: t.score }))
+        .slice(0, 5);
 
     if (loading) return (
         <div className="flex items-center justify-center p-24">
@@ -133,7 +139,7 @@ const Dashboard = () => {
                     {[
                         { icon: <Target className="text-indigo-500" />, label: 'Accuracy', val: `${accuracy}%`, delay: 0.1 },
                         { icon: <Clock className="text-amber-500" />, label: 'Avg Time', val: `${avgTime}s`, delay: 0.2 },
-                        { icon: <Award className="text-emerald-500" />, label: 'Total Quizzes', val: history.length, delay: 0.3 }
+                        { icon: <Award className="text-emerald-500" />, label: 'Total Quizzes', val: stats?.attempts ?? history.length, delay: 0.3 }
                     ].map((s, i) => (
                         <motion.div
                             key={i}
@@ -303,6 +309,14 @@ const Dashboard = () => {
                                     </div>
                                 )}
                             </div>
+                            {hasMoreHistory && (
+                                <button
+                                    className="btn-secondary"
+                                    onClick={() => fetchHistory(history[history.length - 1].id)}
+                                >
+                                    Load older attempts
+                                </button>
+                            )}
                         </div>
                     </motion.div>
                 )}
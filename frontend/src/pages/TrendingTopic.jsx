@@ -6,6 +6,8 @@ import { useAuth } from '../context/AuthContext'
 
 const TrendingTopic = () => {
     const [topics, setTopics] = useState([])
+    const [nextCursor, setNextCursor] = useState(null)
+    const [details, setDetails] = useState({}) // { topicId: full topic }
     const [loading, setLoading] = useState(true)
     const [showSuggestModal, setShowSuggestModal] = useState(false)
     const [suggestLoading, setSuggestLoading] = useState(false)
@@ -95,15 +97,37 @@ const TrendingTopic = () => {
         return <div className="article-wrapper">{elements}</div>;
     };
 
-    const fetchTopics = async () => {
+    // The list only carries summaries; article, poll and MCQs come from the detail endpoint
+    const fetchTopics = async (cursor = null) => {
         try {
-            const res = await api.get('/api/trending')
-            setTopics(res.data)
+            const res = await api.get('/api/trending/feed', { params: cursor ? { cursor } : {} })
+            setTopics(prev => cursor ? [...prev, ...res.data] : res.data)
+            setNextCursor(res.headers['x-next-cursor'] || null)
         } finally {
             setLoading(false)
         }
     }
 
+    const fetchDetail = async (topicId) => {
+        try {
+            const res = await api.get(`/api/trending/${topicId}`)
+            setDetails(prev => ({ ...prev, [topicId]: res.data }))
+        } catch (err) {
+            console.error('Failed to load case study:', err)
+        }
+    }
+
+    const toggleArticle = (topicId) => {
+        if (expandedTopic === topicId) {
+            setExpandedTopic(null)
+        } else {
+            setExpandedTopic(topicId)
+            if (!details[topicId]) {
+                fetchDetail(topicId)
+            }
+        }
+    }
+
     const fetchComments = async (topicId) => {
         setCommentsLoading(prev => ({ ...prev, [topicId]: true }))
         try {
@@ -171,7 +195,7 @@ const TrendingTopic = () => {
                 user_id: user.id,
                 option_id: optionId
             })
-            fetchTopics()
+            fetchDetail(topicId)
         } catch (err) {
             console.error(err)
         }
@@ -253,7 +277,7 @@ const TrendingTopic = () => {
                                 {comments[topic.id]?.length ?? (topic.comments?.length || 0)} Insights
                                 {expandedInsights === topic.id ? <ChevronUp size={14} /> : <ChevronDown size={14} />}
                             </span>
-                            <button className="btn-text" onClick={() => setExpandedTopic(expandedTopic === topic.id ? null : topic.id)}>
+                            <button className="btn-text" onClick={() => toggleArticle(topic.id)}>
                                 {expandedTopic === topic.id ? 'Close Article' : 'Read Case Study'}
                             </button>
                         </div>
@@ -330,7 +354,10 @@ const TrendingTopic = () => {
 
                         {/* ── Article Expand ── */}
                         <AnimatePresence>
-                            {expandedTopic === topic.id && (
+                            {expandedTopic === topic.id && !details[topic.id] && (
+                                <div className="insights-loading"><Loader2 className="spinner" size={20} /> Loading case study...</div>
+                            )}
+                            {expandedTopic === topic.id && details[topic.id] && (
                                 <motion.div
                                     initial={{ height: 0, opacity: 0 }}
                                     animate={{ height: 'auto', opacity: 1 }}
@@ -338,21 +365,21 @@ const TrendingTopic = () => {
                                     className="topic-article-body"
                                 >
                                     <div className="article-main">
-                                        {renderFormattedContent(topic.article_content)}
+                                        {renderFormattedContent(details[topic.id].article_content)}
                                     </div>
 
-                                    {topic.real_world_example && (
+                                    {details[topic.id].real_world_example && (
                                         <div className="real-world-box">
                                             <h5><Sparkles size={14} /> Real World Example</h5>
-                                            <p>{topic.real_world_example}</p>
+                                            <p>{details[topic.id].real_world_example}</p>
                                         </div>
                                     )}
 
-                                    {topic.poll && topic.poll.options && (
+                                    {details[topic.id].poll && details[topic.id].poll.options && (
                                         <div className="trend-poll">
-                                            <h4>{topic.poll.question}</h4>
+                                            <h4>{details[topic.id].poll.question}</h4>
                                             <div className="poll-options">
-                                                {topic.poll.options.map(opt => (
+                                                {details[topic.id].poll.options.map(opt => (
                                                     <button
                                                         key={opt.id}
                                                         className="poll-option-btn"
@@ -366,10 +393,10 @@ const TrendingTopic = () => {
                                         </div>
                                     )}
 
-                                    {topic.mcqs && topic.mcqs.length > 0 && (
+                                    {details[topic.id].mcqs && details[topic.id].mcqs.length > 0 && (
                                         <div className="trend-mcqs">
                                             <h4>Check Your Understanding</h4>
-                                            {topic.mcqs.map(mcq => (
+                                            {details[topic.id].mcqs.map(mcq => (
                                                 <div key={mcq.id} className="trend-mcq-item">
                                                     <p className="q-text">{mcq.question}</p>
                                                     <div className="q-options">
@@ -405,6 +432,11 @@ const TrendingTopic = () => {
                         <button className="btn-secondary" onClick={() => setShowSuggestModal(true)}>Suggest Topic</button>
                     </div>
                 )}
+                {nextCursor && (
+                    <button className="btn-secondary" onClick={() => fetchTopics(nextCursor)}>
+                        Load more topics
+                    </button>
+                )}
             </div>
 
             <AnimatePresence>